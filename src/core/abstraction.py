@@ -0,0 +1,286 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+import argparse
+import os
+import numpy as np
+from .ranges import expand_range
+from .equity_calculator import board_runouts, parse_spot
+from .isomorphism import SUIT_PERMUTATIONS
+from . import fast_evaluator
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+STREETS = {'flop': 3, 'turn': 4, 'river': 5}
+
+DEFAULT_BINS = 20
+MAX_RUNOUTS = 2000  # Runouts enumerated before the distribution is sampled
+
+# Rows (runout, opponent combo) scored per vectorized pass
+_CHUNK = fast_evaluator.BATCH_CHUNK
+
+
+@dataclass
+class HandStrengthDistribution:
+    """Distribution of a hand's river hand strength over the remaining runouts.
+
+    Hand strength on a complete board is the weighted share of opponent
+    combos the hand beats, ties counting half. EHS is its mean and EHS²
+    its mean square, which rewards hands whose strength is volatile
+    (draws) over hands with the same EHS that never improve.
+    """
+    histogram: np.ndarray  # Share of runouts in each of `bins` equal-width strength bins
+    ehs: float
+    ehs2: float
+    runouts: int
+    exact: bool  # True when every runout was enumerated
+
+
+def river_strengths(hand_cards: List[int], board_cards: List[int], runouts: np.ndarray,
+                    combos: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Hand strength against live opponent combos on each completed board."""
+    count = len(runouts)
+    boards = np.hstack([np.broadcast_to(np.array(board_cards, dtype=np.int8),
+                                        (count, len(board_cards))), runouts])
+    evaluator = fast_evaluator.BoardEvaluator(boards)
+    hero = evaluator.evaluate(np.broadcast_to(np.array(hand_cards, dtype=np.int8), (count, 2)),
+                              np.arange(count))
+    runout_masks = (np.int64(1) << runouts.astype(np.int64)).sum(axis=1)
+    combo_masks = (np.int64(1) << combos.astype(np.int64)).sum(axis=1)
+
+    strengths = np.empty(count)
+    block = max(1, _CHUNK // len(combos))
+    for start in range(0, count, block):
+        stop = min(start + block, count)
+        live = (runout_masks[start:stop, None] & combo_masks[None, :]) == 0
+        board_idx, combo_idx = np.nonzero(live)
+        villain = evaluator.evaluate(combos[combo_idx], start + board_idx)
+        hero_scores = hero[start + board_idx]
+        points = weights[combo_idx] * ((hero_scores > villain) + (hero_scores == villain) / 2)
+        live_weights = live * weights[None, :]
+        strengths[start:stop] = np.bincount(board_idx, points, stop - start) / \
+            np.maximum(live_weights.sum(axis=1), 1e-12)
+    return strengths
+
+
+def strength_distribution(hand, board=None, opponent_range: Optional[Dict[str, float]] = None,
+                          bins: int = DEFAULT_BINS, max_runouts: int = MAX_RUNOUTS,
+                          seed: Optional[int] = None) -> HandStrengthDistribution:
+    """Histogram of final hand strength over runouts, with EHS and EHS².
+
+    Runouts are enumerated when there are at most `max_runouts` of them
+    (every turn and river, and flops against small ranges) and sampled
+    otherwise.
+    """
+    hand_cards, board_cards = parse_spot(hand, board)
+    combos, weights = expand_range(opponent_range, hand_cards + board_cards)
+    if not len(combos):
+        raise ValueError("Opponent range has no combos left after card removal")
+    runouts, exact = board_runouts(hand_cards + board_cards, 5 - len(board_cards), max_runouts, seed)
+
+    strengths = river_strengths(hand_cards, board_cards, runouts, combos, weights)
+    histogram = np.histogram(strengths, bins=bins, range=(0.0, 1.0))[0] / len(strengths)
+    return HandStrengthDistribution(
+        histogram=histogram,
+        ehs=float(strengths.mean()),
+        ehs2=float((strengths ** 2).mean()),
+        runouts=len(strengths),
+        exact=exact
+    )
+
+
+def situation_codes(cards: np.ndarray, hole: int = 2) -> np.ndarray:
+    """Suit-isomorphic integer code of each (N, hole + board) row of hole cards and board.
+
+    Hole cards and board are each unordered, so every suit relabelling of
+    a situation packs to the same base-52 code.
+    """
+    cards = np.asarray(cards, dtype=np.int64)
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        permuted = (cards & ~3) | np.asarray(perm)[cards & 3]
+        permuted = np.hstack([np.sort(permuted[:, :hole], axis=1)[:, ::-1],
+                              np.sort(permuted[:, hole:], axis=1)[:, ::-1]])
+        code = np.zeros(len(cards), dtype=np.int64)
+        for column in range(cards.shape[1]):
+            code = code * 52 + permuted[:, column]
+        best = code if best is None else np.minimum(best, code)
+    return best
+
+
+def kmeans(features: np.ndarray, k: int, rng: np.random.Generator,
+           iterations: int = 50) -> Tuple[np.ndarray, np.ndarray]:
+    """Lloyd's k-means with k-means++ seeding.
+
+    Returns:
+        Tuple of (centroids, labels).
+    """
+    count = len(features)
+    if not 1 <= k <= count:
+        raise ValueError("k must be between 1 and the number of points")
+    centroids = [features[rng.integers(count)]]
+    distances = ((features - centroids[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        probabilities = distances / distances.sum() if distances.sum() else None
+        centroids.append(features[rng.choice(count, p=probabilities)])
+        distances = np.minimum(distances, ((features - centroids[-1]) ** 2).sum(axis=1))
+    centroids = np.array(centroids)
+
+    labels = np.full(count, -1)
+    for _ in range(iterations):
+        new_labels = _nearest(features, centroids)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for cluster in range(k):
+            members = features[labels == cluster]
+            if len(members):
+                centroids[cluster] = members.mean(axis=0)
+    return centroids, labels
+
+
+def _nearest(features: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest centroid to each feature row."""
+    distances = (features ** 2).sum(axis=1)[:, None] - 2 * features @ centroids.T + \
+        (centroids ** 2).sum(axis=1)[None, :]
+    return distances.argmin(axis=1)
+
+
+def _features(distribution: HandStrengthDistribution) -> np.ndarray:
+    """Cumulative histogram; squared distance between these tracks earth mover's distance."""
+    return np.cumsum(distribution.histogram)
+
+
+class BucketTable:
+    """Bucket index per canonical situation of one street, with the cluster centroids."""
+
+    def __init__(self, path: str):
+        with np.load(path) as data:
+            self.street = str(data['street'])
+            self.bins = int(data['bins'])
+            self.codes = data['codes']
+            self.buckets = data['buckets']
+            self.centroids = data['centroids']
+        self.path = path
+
+    @property
+    def num_buckets(self) -> int:
+        return len(self.centroids)
+
+    def bucket(self, hand, board) -> int:
+        """Bucket of a hand on a board of this table's street.
+
+        Situations the build did not cover are assigned to the nearest
+        centroid of their strength distribution.
+        """
+        hand_cards, board_cards = parse_spot(hand, board)
+        if len(board_cards) != STREETS[self.street]:
+            raise ValueError(f"Expected a {self.street} board")
+        code = situation_codes(np.array([hand_cards + board_cards]))[0]
+        idx = np.searchsorted(self.codes, code)
+        if idx < len(self.codes) and self.codes[idx] == code:
+            return int(self.buckets[idx])
+        features = _features(strength_distribution(hand_cards, board_cards, bins=self.bins))
+        return int(_nearest(features[None, :], self.centroids)[0])
+
+
+def bucket_path(street: str) -> str:
+    """Default location of a street's bucket file."""
+    return os.path.join(DATA_DIR, f'buckets_{street}.npz')
+
+
+@lru_cache(maxsize=4)
+def load_buckets(street: str, path: Optional[str] = None) -> Optional[BucketTable]:
+    """Open a street's bucket table, or return None if it was never built."""
+    path = path or bucket_path(street)
+    if not os.path.exists(path):
+        return None
+    return BucketTable(path)
+
+
+def _canonical_flop_situations() -> np.ndarray:
+    """One representative (hole cards + flop) row per suit-isomorphic flop situation."""
+    # Every situation maps onto one of the 1,755 canonical flops, so only
+    # hands on those flops need to be enumerated
+    flops = np.array(list(combinations(range(52), 3)))
+    _, first = np.unique(situation_codes(flops, hole=0), return_index=True)
+    hands = np.array(list(combinations(range(52), 2)))
+    rows = []
+    for flop in flops[first]:
+        live = hands[~np.isin(hands, flop).any(axis=1)]
+        rows.append(np.hstack([live, np.broadcast_to(flop, (len(live), 3))]))
+    cards = np.vstack(rows)
+    _, first = np.unique(situation_codes(cards), return_index=True)
+    return cards[np.sort(first)]
+
+
+def _sample_situations(street: str, count: int, rng: np.random.Generator) -> np.ndarray:
+    """Random distinct canonical situations of a street, as card rows."""
+    size = 2 + STREETS[street]
+    cards = np.argsort(rng.random((count, 52)), axis=1)[:, :size]
+    _, first = np.unique(situation_codes(cards), return_index=True)
+    return cards[np.sort(first)]
+
+
+def build_buckets(street: str, k: int, path: Optional[str] = None,
+                  num_situations: Optional[int] = None, bins: int = DEFAULT_BINS,
+                  max_runouts: int = 200, seed: Optional[int] = None,
+                  progress: Optional[Callable[[int, int], None]] = None) -> BucketTable:
+    """Cluster a street's situations by strength distribution and store their buckets.
+
+    With `num_situations` unset every canonical flop situation (1,286,792)
+    is bucketed, which takes days of CPU; turn and river have too many
+    situations to enumerate, so a random sample of that size is clustered
+    and lookups outside it fall back to the nearest centroid.
+    """
+    if street not in STREETS:
+        raise ValueError(f"Unknown street: {street}")
+    rng = np.random.default_rng(seed)
+    if num_situations is None:
+        if street != 'flop':
+            raise ValueError("Only flop situations can be enumerated; pass num_situations")
+        situations = _canonical_flop_situations()
+    else:
+        situations = _sample_situations(street, num_situations, rng)
+
+    features = np.empty((len(situations), bins))
+    for idx, row in enumerate(situations.tolist()):
+        distribution = strength_distribution(row[:2], row[2:], bins=bins,
+                                             max_runouts=max_runouts, seed=idx)
+        features[idx] = _features(distribution)
+        if progress is not None:
+            progress(idx + 1, len(situations))
+    centroids, labels = kmeans(features, k, rng)
+
+    codes = situation_codes(situations)
+    order = np.argsort(codes)
+    path = path or bucket_path(street)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        np.savez(f, street=street, bins=bins, codes=codes[order],
+                 buckets=labels[order].astype(np.uint8 if k <= 256 else np.uint16),
+                 centroids=centroids.astype(np.float32))
+    load_buckets.cache_clear()
+    return BucketTable(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bucket situations by hand-strength distribution")
+    parser.add_argument('street', choices=sorted(STREETS))
+    parser.add_argument('--buckets', type=int, default=50)
+    parser.add_argument('--situations', type=int, default=None,
+                        help="Random situations to cluster (default: every flop situation)")
+    parser.add_argument('--runouts', type=int, default=200,
+                        help="Runouts sampled per flop situation")
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    def report(done: int, total: int) -> None:
+        print(f"\r{done}/{total} situations", end='', flush=True)
+
+    build_buckets(args.street, args.buckets, args.output, args.situations,
+                  max_runouts=args.runouts, seed=args.seed, progress=report)
+    print()
@@ -0,0 +1,278 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+import os
+import sqlite3
+import threading
+import weakref
+
+
+@dataclass
+class CacheStats:
+    """Running counters for a cache."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    writes: int = 0
+    flushes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CacheStore(ABC):
+    """Persistent key -> JSON-serializable dict store behind an LRUCache.
+
+    Subclasses implement lookups, batched writes and warm loading of the
+    most recently written entries.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the stored value for `key`, or None."""
+
+    @abstractmethod
+    def put_many(self, items: Iterable[Tuple[str, Dict]]) -> None:
+        """Write a batch of entries, replacing existing keys."""
+
+    @abstractmethod
+    def recent(self, limit: int) -> List[Tuple[str, Dict]]:
+        """Return up to `limit` entries, most recently written first."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Delete every entry."""
+
+    def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+
+class SQLiteStore(CacheStore):
+    """Indexed store in a single SQLite table, safe for concurrent processes.
+
+    WAL journaling lets readers in other processes (e.g. gunicorn workers)
+    proceed while one process commits a batch.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache "
+                               "(key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_many(self, items: Iterable[Tuple[str, Dict]]) -> None:
+        rows = [(key, json.dumps(value)) for key, value in items]
+        with self._lock, self._conn:
+            # REPLACE deletes and reinserts, so rowid order tracks write recency
+            self._conn.executemany("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", rows)
+
+    def recent(self, limit: int) -> List[Tuple[str, Dict]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM cache ORDER BY rowid DESC LIMIT ?",
+                                      (limit,)).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class AppendOnlyStore(CacheStore):
+    """JSON-lines log with an in-memory offset index; the last write of a key wins.
+
+    Writes only ever append, so a flush costs the size of the batch rather
+    than the size of the cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._offsets: Dict[str, int] = {}
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    if line.endswith(b'\n'):  # Skip a torn final write
+                        self._index(json.loads(line)[0], offset)
+                    offset += len(line)
+
+    def _index(self, key: str, offset: int) -> None:
+        # Re-inserting keeps the dict ordered by each key's latest write
+        self._offsets.pop(key, None)
+        self._offsets[key] = offset
+
+    def _read_at(self, offset: int) -> Dict:
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())[1]
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            offset = self._offsets.get(key)
+            return None if offset is None else self._read_at(offset)
+
+    def put_many(self, items: Iterable[Tuple[str, Dict]]) -> None:
+        with self._lock, open(self.path, 'ab') as f:
+            offset = f.tell()
+            for key, value in items:
+                line = (json.dumps([key, value]) + '\n').encode()
+                f.write(line)
+                self._index(key, offset)
+                offset += len(line)
+
+    def recent(self, limit: int) -> List[Tuple[str, Dict]]:
+        with self._lock:
+            keys = list(self._offsets)[::-1][:limit]
+            return [(key, self._read_at(self._offsets[key])) for key in keys]
+
+    def clear(self) -> None:
+        with self._lock:
+            open(self.path, 'wb').close()
+            self._offsets.clear()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+
+def _flush_pending(store: Optional[CacheStore], pending: Dict[str, Dict]) -> None:
+    """Write buffered entries to the store; also run when a cache is collected or at exit."""
+    if store is not None and pending:
+        store.put_many(list(pending.items()))
+        pending.clear()
+
+
+class LRUCache:
+    """Size-bounded in-memory LRU in front of an optional persistent store.
+
+    Writes are buffered and flushed to the store in batches; lookups that
+    miss memory fall through to the store. Pending writes are flushed when
+    the cache is garbage collected or the interpreter exits.
+    """
+
+    def __init__(self, store: Optional[CacheStore] = None, max_entries: int = 4096,
+                 flush_every: int = 32, warm_entries: Optional[int] = None):
+        """Initialize the cache, warm loading recent entries from the store.
+
+        Args:
+            store: Persistent backend, or None for a memory-only cache.
+            max_entries: Most entries kept in memory before the least
+                recently used are evicted.
+            flush_every: Pending writes that trigger a batched flush.
+            warm_entries: Entries loaded from the store at startup
+                (defaults to max_entries).
+        """
+        if max_entries < 1 or flush_every < 1:
+            raise ValueError("max_entries and flush_every must be positive")
+        self.store = store
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.stats = CacheStats()
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.RLock()
+        self._finalizer = weakref.finalize(self, _flush_pending, store, self._pending)
+
+        if store is not None:
+            warm = max_entries if warm_entries is None else min(warm_entries, max_entries)
+            for key, value in reversed(store.recent(warm)):
+                self._entries[key] = value
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached value for `key`, or None, updating hit/miss counters."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return self._entries[key]
+            value = self._pending.get(key)
+            if value is None and self.store is not None:
+                value = self.store.get(key)
+            if value is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self._remember(key, value)
+            return value
+
+    def put(self, key: str, value: Dict) -> None:
+        """Store a value, flushing to the store once enough writes are pending."""
+        with self._lock:
+            self._remember(key, value)
+            self.stats.writes += 1
+            if self.store is not None:
+                self._pending.pop(key, None)  # Keep flush order equal to write order
+                self._pending[key] = value
+                if len(self._pending) >= self.flush_every:
+                    self.flush()
+
+    def _remember(self, key: str, value: Dict) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def flush(self) -> None:
+        """Write all pending entries to the store in one batch."""
+        with self._lock:
+            if self._pending:
+                _flush_pending(self.store, self._pending)
+                self.stats.flushes += 1
+
+    def clear(self) -> None:
+        """Drop every entry from memory, the pending buffer and the store."""
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            if self.store is not None:
+                self.store.clear()
+
+    def close(self) -> None:
+        """Flush pending writes and release the store."""
+        with self._lock:
+            self.flush()
+            self._finalizer.detach()
+            if self.store is not None:
+                self.store.close()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries or key in self._pending or \
+                (self.store is not None and self.store.get(key) is not None)
+
+    def __len__(self) -> int:
+        """Number of entries held in memory."""
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
@@ -0,0 +1,131 @@
+from typing import Dict, Iterable, List, Union
+import re
+
+# A card is encoded as rank_index * 4 + suit_index, giving ids 0..51.
+# Rank indices run 2..A (0..12) and suit indices run c, d, h, s (0..3),
+# so `card >> 2` is the rank and `card & 3` is the suit. A set of cards
+# can also be held as a 52-bit mask with bit `card` set.
+RANKS = '23456789TJQKA'
+SUITS = 'cdhs'
+NUM_CARDS = 52
+FULL_DECK_MASK = (1 << NUM_CARDS) - 1
+
+_RANK_INDEX: Dict[str, int] = {rank: idx for idx, rank in enumerate(RANKS)}
+_RANK_INDEX.update({rank.lower(): idx for idx, rank in enumerate(RANKS)})
+_RANK_INDEX['10'] = _RANK_INDEX['T']
+
+_SUIT_INDEX: Dict[str, int] = {suit: idx for idx, suit in enumerate(SUITS)}
+_SUIT_INDEX.update({suit.upper(): idx for idx, suit in enumerate(SUITS)})
+_SUIT_INDEX.update({'♣': 0, '♦': 1, '♥': 2, '♠': 3})
+
+_CARD_PATTERN = re.compile(r'(10|[2-9TJQKAtjqka])([cdhsCDHS♣♦♥♠])')
+
+
+class IntCard(int):
+    """A card encoded as an interned int in 0..51."""
+
+    __slots__ = ()
+
+    def __new__(cls, value: int) -> 'IntCard':
+        if not 0 <= value < NUM_CARDS:
+            raise ValueError(f"Card id must be in 0..51, got {value}")
+        return _DECK[value]
+
+    @classmethod
+    def from_string(cls, card_str: str) -> 'IntCard':
+        """Create a card from a string like 'As', 'Kh' or '10d'."""
+        try:
+            rank = _RANK_INDEX[card_str[:-1]]
+            suit = _SUIT_INDEX[card_str[-1]]
+        except (KeyError, IndexError):
+            raise ValueError(f"Invalid card: {card_str!r}")
+        return _DECK[rank * 4 + suit]
+
+    @property
+    def rank(self) -> int:
+        """Rank index, 0 for a deuce up to 12 for an ace."""
+        return self >> 2
+
+    @property
+    def suit(self) -> int:
+        """Suit index in the order c, d, h, s."""
+        return self & 3
+
+    @property
+    def mask(self) -> int:
+        """Single-bit mask for this card."""
+        return 1 << self
+
+    def __str__(self) -> str:
+        return _NAMES[self]
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+_DECK = tuple(int.__new__(IntCard, card) for card in range(NUM_CARDS))
+_NAMES = tuple(RANKS[card >> 2] + SUITS[card & 3] for card in range(NUM_CARDS))
+FULL_DECK: List[IntCard] = list(_DECK)
+
+CardLike = Union[IntCard, int, str, dict, object]
+
+
+def encode_card(card: CardLike) -> IntCard:
+    """Convert any supported card representation to its IntCard.
+
+    Accepts IntCard/int ids, strings like 'As' or '10♠', the web layer's
+    {'rank', 'suit'} dicts, and the Card classes from both `poker` and
+    `hand_evaluator` (anything with Enum `rank` and `suit` attributes).
+    """
+    if isinstance(card, int):
+        return _DECK[card]
+    if isinstance(card, str):
+        return IntCard.from_string(card)
+    if isinstance(card, dict):
+        rank, suit = card.get('rank'), card.get('suit')
+    else:
+        rank = getattr(getattr(card, 'rank', None), 'value', None)
+        suit = getattr(getattr(card, 'suit', None), 'value', None)
+    try:
+        return _DECK[_RANK_INDEX[rank] * 4 + _SUIT_INDEX[suit]]
+    except (KeyError, TypeError):
+        raise ValueError(f"Invalid card: {card!r}")
+
+
+def encode_cards(cards: Iterable[CardLike]) -> List[IntCard]:
+    """Convert a sequence of cards to IntCards."""
+    return [encode_card(card) for card in cards]
+
+
+def parse_cards(text: str) -> List[IntCard]:
+    """Parse cards from a string like 'AhKs', 'Ah Ks' or 'Ah,Ks'."""
+    if not text:
+        return []
+    compact = re.sub(r'[\s,]+', '', text)
+    matches = _CARD_PATTERN.findall(compact)
+    if ''.join(rank + suit for rank, suit in matches) != compact:
+        raise ValueError(f"Invalid cards: {text!r}")
+    return [_DECK[_RANK_INDEX[rank] * 4 + _SUIT_INDEX[suit]] for rank, suit in matches]
+
+
+def cards_to_mask(cards: Iterable[CardLike]) -> int:
+    """Build a 52-bit mask with one bit set per card."""
+    mask = 0
+    for card in cards:
+        mask |= 1 << encode_card(card)
+    return mask
+
+
+def mask_to_cards(mask: int) -> List[IntCard]:
+    """List the cards whose bits are set in a mask, lowest id first."""
+    cards = []
+    while mask:
+        low = mask & -mask
+        cards.append(_DECK[low.bit_length() - 1])
+        mask ^= low
+    return cards
+
+
+def cards_to_string(cards: Iterable[CardLike]) -> str:
+    """Format cards as a space-separated string like 'As Kh'."""
+    return " ".join(str(encode_card(card)) for card in cards)
@@ -1,8 +1,54 @@
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
-import json
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass, asdict, replace
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import comb, sqrt
 import os
-from .poker import Card, Deck, Hand, Board, create_deck
+import time
+import numpy as np
+from .poker import Card, Hand, Board
+from .cards import IntCard, encode_cards, parse_cards
+from .hand_evaluator import HandEvaluator
+from .ranges import COMBO_INDEX, WeightedRange, is_random_range, weighted_range
+from .isomorphism import invert_permutation, permute_cards, spot_key
+from .cache import CacheStore, LRUCache, SQLiteStore
+from .preflop_table import DEFAULT_TABLE_PATH, EQUITY_SCALE, load_preflop_table
+from .outs import score_outs
+from . import fast_evaluator
+
+def to_codes(cards: Union[Hand, Board, str, Sequence, None]) -> List[IntCard]:
+    """Convert a Hand, Board, card string or card list to IntCards."""
+    if cards is None:
+        return []
+    if isinstance(cards, str):
+        return parse_cards(cards)
+    return encode_cards(getattr(cards, 'cards', cards))
+
+def parse_spot(hand, board) -> Tuple[List[IntCard], List[IntCard]]:
+    """Encode and validate hole cards and board."""
+    hand_cards = to_codes(hand)
+    board_cards = to_codes(board)
+    if len(hand_cards) != 2:
+        raise ValueError("A poker hand must contain exactly 2 cards")
+    if len(board_cards) not in (0, 3, 4, 5):
+        raise ValueError("Board must have 0, 3, 4, or 5 cards")
+    if len(set(hand_cards + board_cards)) != len(hand_cards) + len(board_cards):
+        raise ValueError("Hand and board share a card")
+    return hand_cards, board_cards
+
+def board_runouts(dead: Sequence[int], missing: int, max_runouts: Optional[int] = None,
+                  seed: Optional[int] = None) -> Tuple[np.ndarray, bool]:
+    """Runouts of `missing` cards from the live deck, and whether they are all of them.
+    
+    Every runout is enumerated unless there are more than `max_runouts`,
+    in which case that many are sampled.
+    """
+    deck = np.array([card for card in range(52) if card not in set(dead)], dtype=np.int8)
+    if max_runouts is None or comb(len(deck), missing) <= max_runouts:
+        runout_list = list(combinations(deck.tolist(), missing))
+        return np.array(runout_list, dtype=np.int8).reshape(len(runout_list), missing), True
+    keys = np.random.default_rng(seed).random((max_runouts, len(deck)))
+    return deck[np.argpartition(keys, missing - 1, axis=1)[:, :missing]], False
 
 @dataclass
 class EquityResult:
@@ -10,133 +56,1122 @@ class EquityResult:
     hand_strength: float
     outs: List[Card]
     hand_type: str
+    exact: bool = False  # True when every runout and combo was enumerated
+    samples: int = 0  # Matchups enumerated or simulated
+    tie_rate: float = 0.0
+    std_error: float = 0.0  # Standard error of the equity estimate
+    variance: float = 0.0  # Per-sample variance of the estimator (std_error² x samples)
+
+@dataclass
+class MultiwayEquityResult:
+    equities: List[float]  # Pot share of hero, then of each opponent
+    tie_rate: float  # Share of samples where hero split the pot
+    std_error: float  # Standard error of hero's equity
+    samples: int
+    
+    @property
+    def equity(self) -> float:
+        return self.equities[0]
+
+@dataclass
+class RangeEquityResult:
+    combos: np.ndarray  # (M1, 2) live combos of the first range
+    opponent_combos: np.ndarray  # (M2, 2) live combos of the second range
+    weights: np.ndarray
+    opponent_weights: np.ndarray
+    matrix: np.ndarray  # (M1, M2) equity of combo i against combo j, NaN if they share a card
+    combo_equities: np.ndarray  # Equity of each first-range combo against the second range
+    opponent_combo_equities: np.ndarray
+    equity: float  # Aggregate equity of the first range
+    opponent_equity: float
+    exact: bool = False  # True when every runout was enumerated (or looked up)
+    runouts: int = 0  # Runouts scored per combo pair, at most
+
+@dataclass
+class EquityTrajectory:
+    streets: List[str]  # Streets dealt on the board, from 'flop' on
+    equities: List[float]  # Equity on each of those streets along the board
+    turn_cards: List[IntCard]  # Every card that can fall on the turn
+    turn_equities: np.ndarray  # Equity once each turn card has fallen
+    turn_probabilities: np.ndarray  # Chance of each turn card given the range
+    exact: bool = False  # True when every runout and combo was enumerated
+    samples: int = 0
+    std_error: float = 0.0  # Standard error of the flop equity
+
+@dataclass
+class EquityTally:
+    """Weighted win/tie counts that can be merged across simulation batches.
+    
+    Variance-reduced batches are not a sum of independent 1 / 0.5 / 0
+    outcomes, so they carry `residual_variance`: the variance of the
+    batch's won + tied / 2 around its own equity times its total. Batches
+    are independent, so these add up across a run.
+    """
+    won: float = 0.0
+    tied: float = 0.0
+    total: float = 0.0
+    samples: int = 0
+    residual_variance: Optional[float] = None
+    
+    def add(self, other: 'EquityTally') -> None:
+        """Merge another tally into this one."""
+        self.won += other.won
+        self.tied += other.tied
+        self.total += other.total
+        self.samples += other.samples
+        if other.residual_variance is not None:
+            self.residual_variance = (self.residual_variance or 0.0) + other.residual_variance
+    
+    @property
+    def equity(self) -> float:
+        return float((self.won + self.tied / 2) / self.total) if self.total else 0.0
+    
+    @property
+    def tie_rate(self) -> float:
+        return float(self.tied / self.total) if self.total else 0.0
+    
+    @property
+    def std_error(self) -> float:
+        """Standard error of the equity, treating each sample as a 1 / 0.5 / 0 outcome
+        unless the batches recorded their own residual variance."""
+        if self.samples < 2:
+            return 0.0
+        if self.residual_variance is not None:
+            return sqrt(self.residual_variance) / self.total
+        mean = self.equity
+        second_moment = (self.won + self.tied / 4) / self.total
+        variance = max(second_moment - mean * mean, 0.0) * self.samples / (self.samples - 1)
+        return sqrt(variance / self.samples)
+
+def _sobol_directions(degree_one: bool) -> np.ndarray:
+    """32-bit direction numbers of the first (x) or second (x + 1) Sobol dimension."""
+    m = [1]
+    for _ in range(31):
+        m.append((2 * m[-1]) ^ m[-1] if degree_one else 1)
+    return np.array([value << (31 - bit) for bit, value in enumerate(m)], dtype=np.uint64)
+
+_SOBOL_DIRECTIONS = (_sobol_directions(False), _sobol_directions(True))
+
+def _sobol_points(count: int, dimension: int) -> np.ndarray:
+    """First `count` points of a Sobol dimension as 32-bit integers."""
+    index = np.arange(count, dtype=np.uint64)
+    points = np.zeros(count, dtype=np.uint64)
+    for bit, direction in enumerate(_SOBOL_DIRECTIONS[dimension]):
+        points ^= np.where((index >> np.uint64(bit)) & np.uint64(1), direction, np.uint64(0))
+    return points
+
+def _shifted_uniforms(points: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+    """Uniforms in (0, 1) from points XOR-ed with one shift per replicate row, flattened."""
+    return (((points[None, :] ^ shifts).ravel()).astype(np.float64) + 0.5) / 2.0 ** 32
 
 class EquityCalculator:
-    def __init__(self, cache_path: str):
-        """Initialize equity calculator with a path to the equity cache."""
+    MODES = ('auto', 'exact', 'monte_carlo')
+    SAMPLINGS = ('uniform', 'stratified', 'antithetic', 'sobol')
+    SIMULATION_CHUNK = 65536  # Samples drawn and scored per vectorized pass
+    SHARD_SIZE = 50000  # Samples per independently seeded simulation shard
+    MIN_ADAPTIVE_SAMPLES = 256  # Samples before a standard error is trusted
+    MAX_OPPONENTS = 8
+    MAX_REDRAWS = 1000  # Redraw rounds before opponent ranges are deemed incompatible
+    MAX_RANGE_RUNOUTS = 2000  # Runouts enumerated for range vs range before sampling
+    RANGE_BLOCK = 1 << 22  # (runout, combo, combo) cells compared per vectorized pass
+    SOBOL_REPLICATES = 8  # Independently shifted point sets per quasi-random batch
+    # fast_evaluator categories by name, spelled as HandRank members
+    HAND_TYPES = ('high_card', 'pair', 'two_pair', 'three_of_a_kind', 'straight', 'flush',
+                  'full_house', 'four_of_a_kind', 'straight_flush')
+    
+    def __init__(self, cache_path: str, iterations: int = 10000,
+                 max_enumerations: int = 300000, max_samples: int = 1000000,
+                 cache_store: Optional[CacheStore] = None, cache_size: int = 4096,
+                 preflop_table_path: Optional[str] = DEFAULT_TABLE_PATH):
+        """Initialize equity calculator with a path to the equity cache.
+        
+        Args:
+            cache_path: Path of the equity cache. Results persist in an
+                SQLite database next to it (a '.json' suffix is replaced
+                by '.sqlite3').
+            iterations: Monte Carlo samples per calculation.
+            max_enumerations: Largest number of (runout, opponent combo)
+                matchups 'auto' mode will enumerate exactly before it
+                falls back to sampling.
+            max_samples: Upper bound on samples for adaptive runs
+                (target_stderr / max_time_ms).
+            cache_store: Persistent cache backend, overriding the SQLite
+                store at cache_path.
+            cache_size: Results kept in the in-memory LRU.
+            preflop_table_path: Prebuilt preflop equity table used for
+                boardless spots when it exists; None disables it.
+        """
         self.cache_path = cache_path
-        self.cache = self._load_cache()
+        self.iterations = iterations
+        self.max_enumerations = max_enumerations
+        self.max_samples = max_samples
+        self.hand_evaluator = HandEvaluator()
+        self.cache = self._load_cache(cache_store, cache_size)
+        self.preflop_table = load_preflop_table(preflop_table_path) if preflop_table_path else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers = 0
+    
+    def __getstate__(self) -> Dict:
+        """Leave the cache, preflop table and process pool behind when sent to a worker."""
+        state = self.__dict__.copy()
+        state['cache'] = None
+        state['preflop_table'] = None
+        state['_executor'] = None
+        state['_executor_workers'] = 0
+        return state
+    
+    def _get_executor(self, workers: int) -> ProcessPoolExecutor:
+        """Return a process pool with `workers` processes, reusing it across calls."""
+        if self._executor is None or self._executor_workers != workers:
+            self.shutdown()
+            self._executor = ProcessPoolExecutor(max_workers=workers,
+                                                 initializer=fast_evaluator.get_array_tables)
+            self._executor_workers = workers
+        return self._executor
+    
+    def shutdown(self) -> None:
+        """Stop the simulation process pool, if one was started, and flush the cache."""
+        if self.cache is not None:
+            self.cache.flush()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_workers = 0
     
-    def _load_cache(self) -> Dict:
-        """Load equity calculations from cache."""
-        if not os.path.exists(self.cache_path):
-            return {}
+    def _load_cache(self, store: Optional[CacheStore], size: int) -> LRUCache:
+        """Open the persistent cache and warm the LRU with its newest entries."""
+        if store is None:
+            root, ext = os.path.splitext(self.cache_path)
+            store = SQLiteStore((root if ext == '.json' else self.cache_path) + '.sqlite3')
+        return LRUCache(store, max_entries=size)
+    
+    def _get_cache_key(self, hand_cards: List[int], opponent_range: Dict[str, float],
+                      board_cards: List[int]) -> Tuple[str, Tuple[int, ...]]:
+        """Generate a suit-isomorphic cache key for the current calculation.
         
-        with open(self.cache_path, 'r') as f:
-            return json.load(f)
+        Returns the key and the suit map from the actual cards to the
+        canonical ones, so suit-specific results can be translated back.
+        """
+        return spot_key([hand_cards, board_cards], opponent_range)
     
-    def _save_cache(self) -> None:
-        """Save equity calculations to cache."""
-        with open(self.cache_path, 'w') as f:
-            json.dump(self.cache, f)
+    def _sampled_key(self, cache_key: str, estimator: str, sampling: str,
+                     seed: Optional[int]) -> str:
+        """Cache key for a sampled result, which depends on how it was sampled.
+        
+        Exact results are stored under the spot's own key and answer any
+        request; estimates are only reused for the same estimator,
+        sampling strategy and seed.
+        """
+        return f"{cache_key}|{estimator}:{sampling}:{seed}"
     
-    def _get_cache_key(self, hand: Hand, opponent_range: Dict[str, float], 
-                      board: Optional[Board] = None) -> str:
-        """Generate a cache key for the current calculation."""
-        hand_str = str(hand)
-        range_str = json.dumps(opponent_range)
-        board_str = str(board) if board else ""
-        return f"{hand_str}:{range_str}:{board_str}"
+    def count_enumerations(self, hand_cards: Sequence[int], board_cards: Sequence[int],
+                           num_combos: int) -> int:
+        """Number of (runout, opponent combo) matchups exact mode would score."""
+        unseen = 52 - len(hand_cards) - len(board_cards)
+        return comb(unseen, 5 - len(board_cards)) * num_combos
     
     def calculate_equity(self, hand: Hand, opponent_range: Dict[str, float],
-                        board: Optional[Board] = None) -> EquityResult:
-        """Calculate equity against an opponent's range."""
-        cache_key = self._get_cache_key(hand, opponent_range, board)
-        
-        if cache_key in self.cache:
-            return EquityResult(**self.cache[cache_key])
-        
-        # Create a deck excluding known cards
-        known_cards = hand.cards
-        if board:
-            known_cards.extend(board.cards)
-        deck = create_deck(known_cards)
-        
-        # Run Monte Carlo simulation
-        iterations = 10000
-        wins = 0
-        ties = 0
-        total_strength = 0
-        
-        for _ in range(iterations):
-            # Draw remaining board cards if needed
-            current_board = board.cards if board else []
-            if len(current_board) < 5:
-                remaining_cards = deck.draw_multiple(5 - len(current_board))
-                current_board.extend(remaining_cards)
-            
-            # Calculate hand strength
-            hand_strength = self._calculate_hand_strength(hand.cards, current_board)
-            total_strength += hand_strength
-            
-            # Compare against opponent's range
-            opponent_hand = self._draw_opponent_hand(deck, opponent_range)
-            if opponent_hand:
-                opponent_strength = self._calculate_hand_strength(opponent_hand.cards, current_board)
-                if hand_strength > opponent_strength:
-                    wins += 1
-                elif hand_strength == opponent_strength:
-                    ties += 0.5
-        
-        # Calculate results
-        equity = (wins + ties) / iterations
-        avg_strength = total_strength / iterations
-        outs = self._calculate_outs(hand.cards, current_board)
-        hand_type = self._get_hand_type(hand.cards, current_board)
-        
-        result = EquityResult(
+                        board: Optional[Board] = None, mode: str = 'auto',
+                        seed: Optional[int] = None,
+                        workers: Optional[int] = None,
+                        target_stderr: Optional[float] = None,
+                        max_time_ms: Optional[float] = None,
+                        sampling: str = 'uniform') -> EquityResult:
+        """Calculate equity against an opponent's range.
+        
+        Args:
+            hand: Hero's hole cards (Hand, card string or card list).
+            opponent_range: Weighted hand classes, e.g. from GtoSolver.get_range.
+            board: Community cards, if any.
+            mode: 'exact' enumerates every remaining board and opponent
+                combo, 'monte_carlo' samples, and 'auto' enumerates when
+                the matchup count fits within max_enumerations.
+            seed: Seed for the Monte Carlo random generator. Sampling is
+                split into fixed-size shards, each with its own child seed,
+                so a seeded result does not depend on `workers`.
+            workers: Number of processes to simulate shards on (e.g.
+                os.cpu_count()); None or 1 runs them in this process.
+            target_stderr: Sample in batches until the equity's standard
+                error drops to this value instead of running a fixed
+                number of iterations.
+            max_time_ms: Stop sampling once this much time has passed.
+                May be combined with target_stderr; the result's
+                std_error and samples report the precision reached.
+            sampling: How Monte Carlo samples are drawn. 'uniform' draws
+                combo and runout independently. 'stratified' splits the
+                samples over the next board card in proportion to its
+                probability, with at least two per card, so it may draw a
+                few more than asked. 'antithetic' draws samples in pairs
+                from mirrored uniforms u and 1 - u, matching a weak combo
+                with a strong one and a runout with its opposite deal
+                order; odd counts round down to even. 'sobol' picks the
+                combo and next card from randomly shifted Sobol points,
+                rounding each batch down to SOBOL_REPLICATES times a power
+                of two. The result's samples is the count actually drawn
+                and its variance is the per-sample variance reached.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown equity mode: {mode}")
+        if sampling not in self.SAMPLINGS:
+            raise ValueError(f"Unknown sampling strategy: {sampling}")
+        hand_cards, board_cards = parse_spot(hand, board)
+        
+        # A sampled table only answers requests that accept an estimate
+        if not board_cards and self.preflop_table is not None and \
+                (mode == 'auto' or mode == 'exact' and self.preflop_table.exact) and \
+                (target_stderr is None or self.preflop_table.std_error <= target_stderr):
+            return self._lookup_preflop(hand_cards, opponent_range)
+        
+        cache_key, suit_map = self._get_cache_key(hand_cards, opponent_range, board_cards)
+        adaptive = target_stderr is not None or max_time_ms is not None
+        sampled_key = None if mode == 'exact' else self._sampled_key(
+            cache_key, 'adaptive' if adaptive else f'fixed{self.iterations}', sampling, seed)
+        # Explicit Monte Carlo requests want an estimate, not a cached exact answer
+        cached = self._get_cached(None if mode == 'monte_carlo' else cache_key, suit_map,
+                                  target_stderr, sampled_key)
+        if cached is not None:
+            return cached
+        
+        opponent = weighted_range(opponent_range, hand_cards + board_cards)
+        
+        enumerations = self.count_enumerations(hand_cards, board_cards, len(opponent.combos))
+        exact = mode == 'exact' or (mode == 'auto' and enumerations <= self.max_enumerations)
+        if exact:
+            tally = self._enumerate_equity(hand_cards, board_cards, opponent.combos, opponent.weights)
+        elif adaptive:
+            tally = self._simulate_adaptive(hand_cards, board_cards, opponent, seed,
+                                            target_stderr, max_time_ms, sampling)
+        else:
+            tally = self._simulate_sharded(hand_cards, board_cards, opponent,
+                                           self.iterations, seed, workers, sampling)
+        
+        result = self._build_result(hand_cards, board_cards, opponent, tally, exact)
+        self._put_cached(cache_key, suit_map, result, sampled_key)
+        return result
+    
+    def stream_equity(self, hand: Hand, opponent_range: Dict[str, float],
+                      board: Optional[Board] = None, seed: Optional[int] = None,
+                      target_stderr: Optional[float] = None,
+                      max_time_ms: Optional[float] = None,
+                      sampling: str = 'uniform') -> Iterator[EquityResult]:
+        """Yield progressively more precise equity estimates until convergence.
+        
+        Sampling runs in growing batches as in calculate_equity with a
+        target_stderr, and each batch yields an EquityResult whose equity,
+        std_error and samples reflect everything sampled so far; the last
+        one yielded is final and cached. Spots answered by the preflop
+        table, the cache or exact enumeration yield a single result.
+        Without a target or time budget sampling stops at `iterations`.
+        """
+        if sampling not in self.SAMPLINGS:
+            raise ValueError(f"Unknown sampling strategy: {sampling}")
+        hand_cards, board_cards = parse_spot(hand, board)
+        if not board_cards and self.preflop_table is not None and \
+                (target_stderr is None or self.preflop_table.std_error <= target_stderr):
+            yield self._lookup_preflop(hand_cards, opponent_range)
+            return
+        
+        cache_key, suit_map = self._get_cache_key(hand_cards, opponent_range, board_cards)
+        sampled_key = self._sampled_key(cache_key, 'adaptive' if target_stderr or max_time_ms
+                                        else f'stream{self.iterations}', sampling, seed)
+        cached = self._get_cached(cache_key, suit_map, target_stderr, sampled_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        opponent = weighted_range(opponent_range, hand_cards + board_cards)
+        if self.count_enumerations(hand_cards, board_cards, len(opponent.combos)) <= self.max_enumerations:
+            tally = self._enumerate_equity(hand_cards, board_cards, opponent.combos, opponent.weights)
+            result = self._build_result(hand_cards, board_cards, opponent, tally, True)
+            self._put_cached(cache_key, suit_map, result, sampled_key)
+            yield result
+            return
+        
+        max_samples = self.max_samples if target_stderr or max_time_ms else self.iterations
+        result = last = None
+        for tally in self._iter_adaptive(hand_cards, board_cards, opponent, seed,
+                                         target_stderr, max_time_ms, max_samples, sampling):
+            if result is None:
+                # Strength and outs do not change with sampling, so the first
+                # estimate goes out before they are worked out
+                yield self._update_estimate(EquityResult(
+                    equity=0.0, hand_strength=0.0, outs=[],
+                    hand_type=self._get_hand_type(hand_cards, board_cards)), tally)
+                result = self._build_result(hand_cards, board_cards, opponent, tally, False)
+            else:
+                result = last = self._update_estimate(result, tally)
+                if not board_cards:
+                    result.hand_strength = tally.equity  # Preflop strength is the equity
+                yield result
+        if last is not result:
+            yield result
+        self._put_cached(cache_key, suit_map, result, sampled_key)
+    
+    def calculate_multiway_equity(self, hand: Hand,
+                                  opponent_ranges: Sequence[Optional[Dict[str, float]]],
+                                  board: Optional[Board] = None,
+                                  iterations: Optional[int] = None,
+                                  seed: Optional[int] = None,
+                                  workers: Optional[int] = None) -> MultiwayEquityResult:
+        """Monte Carlo equity of hero against up to MAX_OPPONENTS independent ranges.
+        
+        Every sample deals all opponents and the runout in one vectorized
+        draw and scores all players in one evaluator pass, so the cost
+        grows linearly with the number of players. A pot split k ways
+        gives each winner 1/k.
+        
+        Args:
+            hand: Hero's hole cards.
+            opponent_ranges: One weighted range per opponent (None or
+                "random" for any two cards).
+            board: Community cards, if any.
+            iterations: Samples to draw (defaults to self.iterations).
+            seed: Seed for the random generator. As in calculate_equity,
+                a seeded result does not depend on `workers`.
+            workers: Number of processes to simulate shards on; None or 1
+                runs them in this process.
+        """
+        hand_cards, board_cards = parse_spot(hand, board)
+        if not 1 <= len(opponent_ranges) <= self.MAX_OPPONENTS:
+            raise ValueError(f"Multiway equity needs 1 to {self.MAX_OPPONENTS} opponent ranges")
+        # Weighted ranges are dealt by rejection; random hands then come straight
+        # off the shuffled deck along with the runout, which needs no redraws
+        weighted = [idx for idx, opponent_range in enumerate(opponent_ranges)
+                    if not is_random_range(opponent_range)]
+        opponents = [weighted_range(opponent_ranges[idx], hand_cards + board_cards)
+                     for idx in weighted]
+        seats = weighted + [idx for idx in range(len(opponent_ranges)) if idx not in weighted]
+        
+        iterations = iterations or self.iterations
+        shard_sizes = [min(self.SHARD_SIZE, iterations - start)
+                       for start in range(0, iterations, self.SHARD_SIZE)]
+        seeds = np.random.SeedSequence(seed).spawn(len(shard_sizes))
+        shards = [(hand_cards, board_cards, opponents, seats, size, shard_seed)
+                  for size, shard_seed in zip(shard_sizes, seeds)]
+        if workers and workers > 1 and len(shards) > 1:
+            results = self._get_executor(workers).map(self._simulate_multiway_shard, shards)
+        else:
+            results = map(self._simulate_multiway_shard, shards)
+        
+        shares = np.zeros(len(opponent_ranges) + 1)
+        hero_squares = 0.0
+        hero_ties = 0
+        for shard_shares, shard_squares, shard_ties in results:
+            shares += shard_shares
+            hero_squares += shard_squares
+            hero_ties += shard_ties
+        
+        equities = shares / iterations
+        variance = max(hero_squares / iterations - equities[0] ** 2, 0.0)
+        return MultiwayEquityResult(
+            equities=[float(equity) for equity in equities],
+            tie_rate=hero_ties / iterations,
+            std_error=sqrt(variance / iterations),
+            samples=iterations
+        )
+    
+    def _simulate_multiway_shard(self, shard: tuple) -> Tuple[np.ndarray, float, int]:
+        """Run one multiway shard: pot shares per seat, hero's squared shares and split pots."""
+        hand_cards, board_cards, opponents, seats, iterations, seed = shard
+        num_random = len(seats) - len(opponents)
+        columns = np.argsort(np.repeat(seats, 2) * 2 + np.tile([0, 1], len(seats)))
+        dead = set(hand_cards) | set(board_cards)
+        deck = np.array([card for card in range(52) if card not in dead], dtype=np.int8)
+        board = np.array(board_cards, dtype=np.int8)
+        rng = np.random.default_rng(seed)
+        
+        players = len(seats) + 1
+        chunk = max(1, self.SIMULATION_CHUNK // players)
+        shares = np.zeros(players)
+        hero_squares = 0.0
+        hero_ties = 0
+        for start in range(0, iterations, chunk):
+            count = min(chunk, iterations - start)
+            holes = self._draw_opponents(rng, opponents, count)
+            dealt = self._deal_cards(rng, deck, holes, 2 * num_random + 5 - len(board_cards),
+                                     ordered=True)
+            holes = np.hstack([holes, dealt[:, :2 * num_random]])[:, columns]
+            boards = np.hstack([np.broadcast_to(board, (count, len(board))),
+                                dealt[:, 2 * num_random:]])
+            scores = self._score_players(hand_cards, holes, boards)
+            winners = scores == scores.max(axis=1, keepdims=True)
+            split = winners / winners.sum(axis=1, keepdims=True)
+            shares += split.sum(axis=0)
+            hero_squares += float((split[:, 0] ** 2).sum())
+            hero_ties += int(np.count_nonzero(split[:, 0] * (split[:, 0] < 1)))
+        return shares, hero_squares, hero_ties
+    
+    def calculate_equity_trajectory(self, hand: Hand, opponent_range: Dict[str, float],
+                                    board: Board, seed: Optional[int] = None) -> EquityTrajectory:
+        """Equity on the flop, on each possible turn, and along the board's own runout.
+        
+        One pass scores every (runout, combo) matchup from the flop (or
+        `iterations` sampled ones when that exceeds max_enumerations). The
+        flop equity averages all of them; a turn card's equity averages
+        the runouts containing it, each runout counting half towards each
+        of its two cards since either may come first. The river equity is
+        scored directly on the full board.
+        
+        Args:
+            hand: Hero's hole cards.
+            opponent_range: Weighted hand classes, or None for a random hand.
+            board: Three to five community cards; the flop starts the curve.
+            seed: Seed for the random generator when sampling.
+        """
+        hand_cards, board_cards = parse_spot(hand, board)
+        if len(board_cards) < 3:
+            raise ValueError("An equity trajectory needs at least the flop")
+        flop = board_cards[:3]
+        opponent = weighted_range(opponent_range, hand_cards + flop)
+        deck = np.array([card for card in range(52) if card not in hand_cards + flop], dtype=np.int8)
+        
+        exact = self.count_enumerations(hand_cards, flop, len(opponent.combos)) <= self.max_enumerations
+        if exact:
+            runouts, _ = board_runouts(hand_cards + flop, 2)
+            runout_masks = (np.int64(1) << runouts.astype(np.int64)).sum(axis=1)
+            combo_masks = (np.int64(1) << opponent.combos.astype(np.int64)).sum(axis=1)
+            runout_idx, combo_idx = np.nonzero((runout_masks[:, None] & combo_masks[None, :]) == 0)
+            opponents, runouts = opponent.combos[combo_idx], runouts[runout_idx]
+            weights = opponent.weights[combo_idx]
+        else:
+            rng = np.random.default_rng(seed)
+            opponents = opponent.sample(rng, self.iterations)
+            runouts = self._deal_cards(rng, deck, opponents, 2)
+            weights = np.ones(len(opponents))
+        boards = np.hstack([np.tile(np.array(flop, dtype=np.int8), (len(runouts), 1)), runouts])
+        outcomes = self._outcomes(hand_cards, opponents, boards)
+        
+        # Each runout counts half for each of its cards as the turn
+        deck_position = np.full(52, -1, dtype=np.int64)
+        deck_position[deck] = np.arange(len(deck))
+        turn_idx = deck_position[runouts.ravel()]
+        turn_weights = np.bincount(turn_idx, np.repeat(weights, 2), len(deck))
+        turn_points = np.bincount(turn_idx, np.repeat(weights * outcomes, 2), len(deck))
+        turn_equities = turn_points / np.maximum(turn_weights, 1e-12)
+        
+        flop_equity = float(weights @ outcomes / weights.sum())
+        if exact:
+            std_error = 0.0
+        else:
+            std_error = float(outcomes.std(ddof=1) / np.sqrt(len(outcomes)))
+        streets, equities = ['flop'], [flop_equity]
+        if len(board_cards) >= 4:
+            streets.append('turn')
+            equities.append(float(turn_equities[deck_position[board_cards[3]]]))
+        if len(board_cards) == 5:
+            river = weighted_range(opponent_range, hand_cards + board_cards)
+            streets.append('river')
+            equities.append(self._enumerate_equity(hand_cards, board_cards,
+                                                   river.combos, river.weights).equity)
+        
+        return EquityTrajectory(
+            streets=streets,
+            equities=equities,
+            turn_cards=[IntCard(int(card)) for card in deck],
+            turn_equities=turn_equities,
+            turn_probabilities=turn_weights / turn_weights.sum(),
+            exact=exact,
+            samples=len(outcomes),
+            std_error=std_error
+        )
+    
+    def calculate_range_equity(self, hero_range: Optional[Dict[str, float]],
+                               opponent_range: Optional[Dict[str, float]],
+                               board: Optional[Board] = None,
+                               max_runouts: Optional[int] = None,
+                               seed: Optional[int] = None,
+                               workers: Optional[int] = None) -> RangeEquityResult:
+        """Combo-by-combo equity of one weighted range against another on a board.
+        
+        Every combo of both ranges is scored once per runout and all pairs
+        are compared in vectorized blocks. Runouts are enumerated when
+        there are at most `max_runouts` of them (every flop, turn and river
+        with the default) and otherwise sampled. Preflop spots use the
+        preflop equity table when one has been built.
+        
+        Pairs are weighted by the product of their combo weights, and pairs
+        that share a card are left out, so aggregate equities account for
+        card removal between the ranges. With `workers` above 1 the
+        runouts are split across that many processes.
+        """
+        board_cards = to_codes(board)
+        if len(board_cards) not in (0, 3, 4, 5):
+            raise ValueError("Board must have 0, 3, 4, or 5 cards")
+        if len(set(board_cards)) != len(board_cards):
+            raise ValueError("Board has a repeated card")
+        hero = weighted_range(hero_range, board_cards)
+        villain = weighted_range(opponent_range, board_cards)
+        hero_masks = (np.int64(1) << hero.combos.astype(np.int64)).sum(axis=1)
+        villain_masks = (np.int64(1) << villain.combos.astype(np.int64)).sum(axis=1)
+        
+        if not board_cards and self.preflop_table is not None:
+            hero_index = COMBO_INDEX[hero.combos[:, 0], hero.combos[:, 1]]
+            villain_index = COMBO_INDEX[villain.combos[:, 0], villain.combos[:, 1]]
+            matrix = self.preflop_table.combos[np.ix_(hero_index, villain_index)] / EQUITY_SCALE
+            exact, runouts = self.preflop_table.exact, 0
+        else:
+            runout_cards, exact = board_runouts(board_cards, 5 - len(board_cards),
+                                                max_runouts or self.MAX_RANGE_RUNOUTS, seed)
+            matrix = self._compare_ranges(board_cards, runout_cards, hero.combos, villain.combos,
+                                          workers)
+            runouts = len(runout_cards)
+        matrix[(hero_masks[:, None] & villain_masks[None, :]) != 0] = np.nan
+        
+        pair_weights = np.where(np.isnan(matrix), 0.0, hero.weights[:, None] * villain.weights[None, :])
+        won = np.where(np.isnan(matrix), 0.0, matrix) * pair_weights
+        total = pair_weights.sum()
+        if not total:
+            raise ValueError("Ranges have no non-conflicting combo pairs")
+        with np.errstate(invalid='ignore', divide='ignore'):
+            combo_equities = won.sum(axis=1) / pair_weights.sum(axis=1)
+            opponent_combo_equities = 1.0 - won.sum(axis=0) / pair_weights.sum(axis=0)
+        equity = float(won.sum() / total)
+        
+        return RangeEquityResult(
+            combos=hero.combos,
+            opponent_combos=villain.combos,
+            weights=hero.weights,
+            opponent_weights=villain.weights,
+            matrix=matrix,
+            combo_equities=combo_equities,
+            opponent_combo_equities=opponent_combo_equities,
             equity=equity,
-            hand_strength=avg_strength,
-            outs=outs,
-            hand_type=hand_type
+            opponent_equity=1.0 - equity,
+            exact=exact,
+            runouts=runouts
         )
+    
+    def _compare_ranges(self, board_cards: List[int], runouts: np.ndarray,
+                        hero_combos: np.ndarray, villain_combos: np.ndarray,
+                        workers: Optional[int] = None) -> np.ndarray:
+        """Average pairwise showdown result (ties half) over the runouts each pair allows."""
+        parts = workers if workers and workers > 1 and len(runouts) > 1 else 1
+        shards = [(board_cards, part, hero_combos, villain_combos)
+                  for part in np.array_split(runouts, min(parts, len(runouts)))]
+        if parts > 1:
+            results = self._get_executor(workers).map(self._range_points, shards)
+        else:
+            results = map(self._range_points, shards)
+        points, allowed = 0, 0.0
+        for shard_points, shard_allowed in results:
+            points = points + shard_points
+            allowed = allowed + shard_allowed
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return points / (2 * allowed)
+    
+    def _range_points(self, shard: tuple) -> Tuple[np.ndarray, np.ndarray]:
+        """Showdown points (2 per win, 1 per tie) and allowed runouts for every combo pair."""
+        board_cards, runouts, hero_combos, villain_combos = shard
+        count = len(runouts)
+        boards = np.hstack([np.broadcast_to(np.array(board_cards, dtype=np.int8),
+                                            (count, len(board_cards))), runouts])
+        runout_masks = (np.int64(1) << runouts.astype(np.int64)).sum(axis=1)
+        evaluator = fast_evaluator.BoardEvaluator(boards)
         
-        # Cache the result
-        self.cache[cache_key] = {
-            'equity': equity,
-            'hand_strength': avg_strength,
-            'outs': [str(card) for card in outs],
-            'hand_type': hand_type
-        }
-        self._save_cache()
+        def score(combos, dead_score):
+            masks = (np.int64(1) << combos.astype(np.int64)).sum(axis=1)
+            live = (runout_masks[:, None] & masks[None, :]) == 0
+            board_idx, combo_idx = np.nonzero(live)
+            scores = np.full((count, len(combos)), dead_score, dtype=np.int32)
+            scores[board_idx, combo_idx] = evaluator.evaluate(combos[combo_idx], board_idx)
+            return scores, live
         
-        return result
+        # A combo that collides with a runout scores below (hero) or above
+        # (villain) every hand, so the pair earns no points from that runout
+        hero_scores, hero_live = score(hero_combos, -1)
+        villain_scores, villain_live = score(villain_combos, np.iinfo(np.int32).max)
+        
+        points = np.zeros((len(hero_combos), len(villain_combos)), dtype=np.int64)
+        allowed = hero_live.T.astype(np.float64) @ villain_live.astype(np.float64)
+        block = max(1, self.RANGE_BLOCK // (len(hero_combos) * len(villain_combos)))
+        for start in range(0, count, block):
+            hero_block = hero_scores[start:start + block, :, None]
+            villain_block = villain_scores[start:start + block, None, :]
+            points += np.count_nonzero(hero_block > villain_block, axis=0)
+            points += np.count_nonzero(hero_block >= villain_block, axis=0)
+        return points, allowed
     
-    def _calculate_hand_strength(self, hand_cards: List[Card], 
-                               board_cards: List[Card]) -> float:
-        """Calculate the strength of a hand."""
-        # This is a simplified version. In a real implementation,
-        # you would want to use a proper hand evaluator that considers
-        # all possible poker hand rankings.
-        all_cards = hand_cards + board_cards
-        return len(set(card.rank for card in all_cards)) / 13
-    
-    def _draw_opponent_hand(self, deck: Deck, 
-                          opponent_range: Dict[str, float]) -> Optional[Hand]:
-        """Draw a hand from the opponent's range."""
-        # This is a simplified version. In a real implementation,
-        # you would want to properly sample from the range based on
-        # the frequencies provided.
-        if not opponent_range:
+    def _draw_opponents(self, rng: np.random.Generator, opponents: List[WeightedRange],
+                        count: int) -> np.ndarray:
+        """Draw `count` rows of non-conflicting hole cards, two columns per opponent.
+        
+        Rows where two opponents share a card are redrawn whole, which
+        samples the joint deal conditioned on no conflicts.
+        """
+        holes = np.empty((count, 2 * len(opponents)), dtype=np.int8)
+        pending = np.arange(count if opponents else 0)
+        for _ in range(self.MAX_REDRAWS):
+            if not len(pending):
+                return holes
+            drawn = np.hstack([opponent.sample(rng, len(pending)) for opponent in opponents])
+            ordered = np.sort(drawn, axis=1)
+            clash = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+            holes[pending[~clash]] = drawn[~clash]
+            pending = pending[clash]
+        if not len(pending):
+            return holes
+        raise ValueError("Opponent ranges cannot be dealt without sharing cards")
+    
+    def _score_players(self, hand_cards: List[int], holes: np.ndarray,
+                       boards: np.ndarray) -> np.ndarray:
+        """Score hero and every opponent on each board in one batch, as (count, players)."""
+        count = len(boards)
+        hero = np.broadcast_to(np.array(hand_cards, dtype=np.int8), (count, 2))
+        hands = [hero] + [holes[:, col:col + 2] for col in range(0, holes.shape[1], 2)]
+        evaluator = fast_evaluator.BoardEvaluator(boards)
+        scores = evaluator.evaluate(np.vstack(hands), np.tile(np.arange(count), len(hands)))
+        return scores.reshape(len(hands), count).T
+    
+    def _update_estimate(self, result: EquityResult, tally: EquityTally) -> EquityResult:
+        """Copy of a result carrying the equity estimate from `tally`."""
+        return replace(result, equity=tally.equity, samples=tally.samples,
+                       tie_rate=tally.tie_rate, std_error=tally.std_error,
+                       variance=tally.std_error ** 2 * tally.samples)
+    
+    def _get_cached(self, cache_key: Optional[str], suit_map: Tuple[int, ...], target_stderr: Optional[float],
+                    sampled_key: Optional[str] = None) -> Optional[EquityResult]:
+        """Cached result for a spot, with outs mapped back to the spot's suits.
+        
+        An exact result under the spot's key is preferred; otherwise an
+        estimate under `sampled_key` is used if it is precise enough.
+        """
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+        if cached is None or not cached.get('exact'):
+            cached = self.cache.get(sampled_key) if sampled_key is not None else None
+        if cached is None:
+            return None
+        cached = EquityResult(**cached)
+        if target_stderr is not None and cached.std_error > target_stderr:
             return None
+        cached.outs = permute_cards(parse_cards(" ".join(cached.outs)), invert_permutation(suit_map))
+        return cached
+    
+    def _put_cached(self, cache_key: str, suit_map: Tuple[int, ...], result: EquityResult,
+                    sampled_key: Optional[str] = None) -> None:
+        """Cache a result with its outs stored in canonical suits.
         
-        # For now, just draw two random cards
-        cards = deck.draw_multiple(2)
-        if len(cards) == 2:
-            return Hand(cards)
-        return None
-    
-    def _calculate_outs(self, hand_cards: List[Card], 
-                       board_cards: List[Card]) -> List[Card]:
-        """Calculate the number of outs for a hand."""
-        # This is a simplified version. In a real implementation,
-        # you would want to calculate actual outs based on the
-        # current hand and board texture.
-        return []
+        Estimates go under `sampled_key`, or are not cached without one.
+        """
+        key = cache_key if result.exact else sampled_key
+        if key is None:
+            return
+        cached = asdict(result)
+        cached['outs'] = [str(card) for card in permute_cards(encode_cards(result.outs), suit_map)]
+        self.cache.put(key, cached)
+    
+    def _build_result(self, hand_cards: List[int], board_cards: List[int],
+                      opponent: WeightedRange, tally: EquityTally, exact: bool) -> EquityResult:
+        """Combine an equity tally with the hand's current strength, outs and type."""
+        hand_strength = self._calculate_current_strength(hand_cards, board_cards, opponent.combos,
+                                                         opponent.weights, tally.equity)
+        outs = self._calculate_outs(hand_cards, board_cards, opponent.combos, opponent.weights)
+        hand_type = self._get_hand_type(hand_cards, board_cards)
+        
+        return EquityResult(
+            equity=tally.equity,
+            hand_strength=hand_strength,
+            outs=outs,
+            hand_type=hand_type,
+            exact=exact,
+            samples=tally.samples,
+            tie_rate=tally.tie_rate,
+            std_error=0.0 if exact else tally.std_error,
+            variance=0.0 if exact else tally.std_error ** 2 * tally.samples
+        )
+    
+    def _lookup_preflop(self, hand_cards: List[int],
+                        opponent_range: Dict[str, float]) -> EquityResult:
+        """Answer a boardless spot from the preflop equity table."""
+        equity = self.preflop_table.hand_vs_range(hand_cards, opponent_range)
+        return EquityResult(
+            equity=equity,
+            hand_strength=equity,
+            outs=[],
+            hand_type=self._get_hand_type(hand_cards, []),
+            exact=self.preflop_table.exact,
+            std_error=self.preflop_table.std_error
+        )
+    
+    def _enumerate_equity(self, hand_cards: List[int], board_cards: List[int],
+                          combos: np.ndarray, weights: np.ndarray) -> EquityTally:
+        """Exact equity over every remaining board and live opponent combo."""
+        runouts, _ = board_runouts(hand_cards + board_cards, 5 - len(board_cards))
+        boards = np.hstack([np.tile(np.array(board_cards, dtype=np.int8), (len(runouts), 1)), runouts])
+        evaluator = fast_evaluator.BoardEvaluator(boards)
+        hero_scores = evaluator.evaluate(np.tile(np.array(hand_cards), (len(boards), 1)),
+                                         np.arange(len(boards)))
+        
+        runout_masks = (np.int64(1) << runouts.astype(np.int64)).sum(axis=1)
+        combo_masks = (np.int64(1) << combos.astype(np.int64)).sum(axis=1)
+        
+        # Score runouts in blocks so the (runout, combo) grid stays small
+        block = max(1, fast_evaluator.BATCH_CHUNK // len(combos))
+        tally = EquityTally()
+        for start in range(0, len(boards), block):
+            live = (runout_masks[start:start + block, None] & combo_masks[None, :]) == 0
+            board_idx, combo_idx = np.nonzero(live)
+            board_idx += start
+            opponent_scores = evaluator.evaluate(combos[combo_idx], board_idx)
+            hero = hero_scores[board_idx]
+            matchup_weights = weights[combo_idx]
+            tally.add(EquityTally(
+                won=float(matchup_weights[hero > opponent_scores].sum()),
+                tied=float(matchup_weights[hero == opponent_scores].sum()),
+                total=float(matchup_weights.sum()),
+                samples=len(combo_idx)
+            ))
+        return tally
+    
+    def _simulate_sharded(self, hand_cards: List[int], board_cards: List[int],
+                          opponent: WeightedRange, iterations: int,
+                          seed: Optional[int], workers: Optional[int],
+                          sampling: str = 'uniform') -> EquityTally:
+        """Split a simulation into seeded shards, run them, and merge in shard order."""
+        shard_sizes = [min(self.SHARD_SIZE, iterations - start)
+                       for start in range(0, iterations, self.SHARD_SIZE)]
+        seeds = np.random.SeedSequence(seed).spawn(len(shard_sizes))
+        shards = [(hand_cards, board_cards, opponent, size, shard_seed, sampling)
+                  for size, shard_seed in zip(shard_sizes, seeds)]
+        
+        if workers and workers > 1 and len(shards) > 1:
+            results = self._get_executor(workers).map(self._simulate_shard, shards)
+        else:
+            results = map(self._simulate_shard, shards)
+        
+        tally = EquityTally()
+        for shard_tally in results:
+            tally.add(shard_tally)
+        return tally
+    
+    def _simulate_adaptive(self, hand_cards: List[int], board_cards: List[int],
+                           opponent: WeightedRange, seed: Optional[int],
+                           target_stderr: Optional[float],
+                           max_time_ms: Optional[float],
+                           sampling: str = 'uniform') -> EquityTally:
+        """Sample in growing batches until the precision target or time budget is met."""
+        tally = EquityTally()
+        for tally in self._iter_adaptive(hand_cards, board_cards, opponent, seed,
+                                         target_stderr, max_time_ms, self.max_samples, sampling):
+            pass
+        return tally
+    
+    def _iter_adaptive(self, hand_cards: List[int], board_cards: List[int],
+                       opponent: WeightedRange, seed: Optional[int],
+                       target_stderr: Optional[float], max_time_ms: Optional[float],
+                       max_samples: int, sampling: str = 'uniform') -> Iterator[EquityTally]:
+        """Yield the running tally after each sampling batch until a stop condition.
+        
+        Each batch size is projected from the current standard error
+        (which shrinks with the square root of the sample count), so
+        lopsided spots stop after a few hundred samples while close
+        ones keep going.
+        """
+        seed_sequence = np.random.SeedSequence(seed)
+        deadline = time.perf_counter() + max_time_ms / 1000 if max_time_ms is not None else None
+        tally = EquityTally()
+        batch = self.MIN_ADAPTIVE_SAMPLES
+        while True:
+            rng = np.random.default_rng(seed_sequence.spawn(1)[0])
+            batch = min(batch, max_samples - tally.samples)
+            tally.add(self._simulate_equity(hand_cards, board_cards, opponent, batch, rng, sampling))
+            yield tally
+            
+            if tally.samples >= max_samples:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if target_stderr is not None:
+                std_error = tally.std_error
+                if std_error <= target_stderr:
+                    break
+                needed = tally.samples * (std_error / target_stderr) ** 2
+                batch = int(needed) - tally.samples + 1
+            else:
+                batch = tally.samples
+            batch = max(self.MIN_ADAPTIVE_SAMPLES, min(batch, self.SIMULATION_CHUNK))
+    
+    def _simulate_shard(self, shard: tuple) -> EquityTally:
+        """Run one simulation shard with its own random stream."""
+        hand_cards, board_cards, opponent, iterations, seed, sampling = shard
+        return self._simulate_equity(hand_cards, board_cards, opponent,
+                                     iterations, np.random.default_rng(seed), sampling)
+    
+    def _simulate_equity(self, hand_cards: List[int], board_cards: List[int],
+                         opponent: WeightedRange, iterations: int,
+                         rng: np.random.Generator, sampling: str = 'uniform') -> EquityTally:
+        """Monte Carlo equity from vectorized opponent combo and runout draws."""
+        dead = set(hand_cards) | set(board_cards)
+        deck = np.array([card for card in range(52) if card not in dead], dtype=np.int8)
+        draw = {
+            'uniform': self._sample_uniform,
+            'stratified': self._sample_stratified,
+            'antithetic': self._sample_antithetic,
+            'sobol': self._sample_sobol
+        }[sampling]
+        
+        tally = EquityTally()
+        for start in range(0, iterations, self.SIMULATION_CHUNK):
+            count = min(self.SIMULATION_CHUNK, iterations - start)
+            tally.add(draw(hand_cards, board_cards, opponent, deck, count, rng))
+        return tally
+    
+    def _sample_uniform(self, hand_cards: List[int], board_cards: List[int],
+                        opponent: WeightedRange, deck: np.ndarray, count: int,
+                        rng: np.random.Generator) -> EquityTally:
+        """Independent combo and runout draws."""
+        opponents = opponent.sample(rng, count)
+        boards = self._draw_boards(rng, deck, board_cards, opponents)
+        return self._score_matchups(hand_cards, opponents, boards)
+    
+    def _sample_stratified(self, hand_cards: List[int], board_cards: List[int],
+                           opponent: WeightedRange, deck: np.ndarray, count: int,
+                           rng: np.random.Generator) -> EquityTally:
+        """Samples split over the next board card in proportion to its probability.
+        
+        Card removal makes the next card's distribution follow the range:
+        card t falls with probability proportional to the weight of the
+        combos that do not hold it. Each stratum gets its share of the
+        samples (at least two, so its variance can be estimated) and the
+        stratum means are recombined with those probabilities.
+        """
+        if len(board_cards) == 5:
+            return self._sample_uniform(hand_cards, board_cards, opponent, deck, count, rng)
+        combo_masks = (np.int64(1) << opponent.combos.astype(np.int64)).sum(axis=1)
+        holds = (combo_masks[None, :] >> deck.astype(np.int64)[:, None]) & 1
+        probability = ((1 - holds) * opponent.weights[None, :]).sum(axis=1)
+        probability /= probability.sum()
+        sizes = np.maximum(2, np.round(probability * count).astype(np.int64))
+        
+        strata = np.repeat(np.arange(len(deck)), sizes)
+        first_cards = deck[strata]
+        opponents = self._sample_excluding(rng, opponent, first_cards)
+        excluded = np.hstack([opponents, first_cards[:, None]])
+        missing = 4 - len(board_cards)
+        boards = [np.tile(np.array(board_cards, dtype=np.int8), (len(strata), 1)), first_cards[:, None]]
+        if missing:
+            boards.append(self._deal_cards(rng, deck, excluded, missing))
+        outcomes = self._outcomes(hand_cards, opponents, np.hstack(boards))
+        
+        won = np.bincount(strata, outcomes == 1.0, len(deck)) / sizes
+        tied = np.bincount(strata, outcomes == 0.5, len(deck)) / sizes
+        means = won + tied / 2
+        squares = np.bincount(strata, outcomes ** 2, len(deck)) / sizes
+        stratum_variance = (squares - means ** 2) * sizes / (sizes - 1)
+        samples = len(strata)
+        return EquityTally(
+            won=float(probability @ won) * samples,
+            tied=float(probability @ tied) * samples,
+            total=float(samples),
+            samples=samples,
+            residual_variance=float((probability ** 2 * stratum_variance / sizes).sum()) * samples ** 2
+        )
+    
+    def _sample_antithetic(self, hand_cards: List[int], board_cards: List[int],
+                           opponent: WeightedRange, deck: np.ndarray, count: int,
+                           rng: np.random.Generator) -> EquityTally:
+        """Sample pairs whose halves are drawn from mirrored uniforms.
+        
+        Combos are ordered weakest to strongest on the board and picked by
+        inverse CDF from u and 1 - u, so a pair matches hero against one
+        weak and one strong holding. Runouts are dealt from deal keys k and
+        1 - k, so the second half gets the cards the first was least likely
+        to see. Each half is an exact draw on its own; only the pairing is
+        correlated, and the pair means are treated as the samples.
+        """
+        pairs = max(2, count // 2)
+        order = self._strength_order(board_cards, opponent.combos)
+        cumulative = np.cumsum(opponent.weights[order])
+        uniforms = rng.random(pairs)
+        opponents = np.vstack([self._pick_combos(opponent.combos, order, cumulative, uniforms),
+                               self._pick_combos(opponent.combos, order, cumulative, 1.0 - uniforms)])
+        boards = np.tile(np.array(board_cards, dtype=np.int8), (2 * pairs, 1))
+        missing = 5 - len(board_cards)
+        if missing:
+            keys = rng.random((pairs, len(deck)))
+            boards = np.hstack([boards, self._deal_cards(rng, deck, opponents, missing,
+                                                         keys=np.vstack([keys, 1.0 - keys]))])
+        outcomes = self._outcomes(hand_cards, opponents, boards)
+        pair_means = (outcomes[:pairs] + outcomes[pairs:]) / 2
+        samples = 2 * pairs
+        return EquityTally(
+            won=float(np.count_nonzero(outcomes == 1.0)),
+            tied=float(np.count_nonzero(outcomes == 0.5)),
+            total=float(samples),
+            samples=samples,
+            residual_variance=float(pair_means.var(ddof=1)) * pairs * 4
+        )
+    
+    def _sample_sobol(self, hand_cards: List[int], board_cards: List[int],
+                      opponent: WeightedRange, deck: np.ndarray, count: int,
+                      rng: np.random.Generator) -> EquityTally:
+        """Combo and next board card from two-dimensional Sobol points.
+        
+        A power-of-two run of Sobol points puts one point in every
+        dyadic box of that size, so combos (ordered by strength) are
+        drawn almost exactly by weight and each combo meets an even
+        spread of next cards; later cards are dealt at random. Each
+        replicate applies its own random digital shift, which keeps every
+        point uniform, and the spread of the replicate means gives the
+        variance.
+        """
+        replicates = self.SOBOL_REPLICATES
+        points = 1 << max(1, int(np.log2(max(count // replicates, 2))))
+        shifts = rng.integers(0, 1 << 32, size=(2, replicates, 1), dtype=np.uint64)
+        combo_uniforms = _shifted_uniforms(_sobol_points(points, 0), shifts[0])
+        card_uniforms = _shifted_uniforms(_sobol_points(points, 1), shifts[1])
+        
+        order = self._strength_order(board_cards, opponent.combos)
+        opponents = self._pick_combos(opponent.combos, order,
+                                      np.cumsum(opponent.weights[order]), combo_uniforms)
+        samples = len(opponents)
+        boards = [np.tile(np.array(board_cards, dtype=np.int8), (samples, 1))]
+        missing = 5 - len(board_cards)
+        if missing:
+            # The next card is the u-th of the deck cards the combo leaves
+            deck_position = np.full(52, -1, dtype=np.int64)
+            deck_position[deck] = np.arange(len(deck))
+            held = np.sort(deck_position[opponents], axis=1)
+            position = (card_uniforms * (len(deck) - 2)).astype(np.int64)
+            position += position >= held[:, 0]
+            position += position >= held[:, 1]
+            next_cards = deck[position]
+            boards.append(next_cards[:, None])
+            if missing > 1:
+                excluded = np.hstack([opponents, next_cards[:, None]])
+                boards.append(self._deal_cards(rng, deck, excluded, missing - 1))
+        outcomes = self._outcomes(hand_cards, opponents, np.hstack(boards))
+        
+        replicate_means = outcomes.reshape(replicates, points).mean(axis=1)
+        return EquityTally(
+            won=float(np.count_nonzero(outcomes == 1.0)),
+            tied=float(np.count_nonzero(outcomes == 0.5)),
+            total=float(samples),
+            samples=samples,
+            residual_variance=float(replicate_means.var(ddof=1)) / replicates * samples ** 2
+        )
+    
+    def _strength_order(self, board_cards: List[int], combos: np.ndarray) -> np.ndarray:
+        """Combo indices from weakest to strongest on the board (by pair and ranks preflop)."""
+        if board_cards:
+            scores = fast_evaluator.BoardEvaluator(board_cards).evaluate(combos)
+        else:
+            ranks = combos.astype(np.int64) >> 2
+            scores = (ranks[:, 0] == ranks[:, 1]) * 169 + ranks.max(axis=1) * 13 + ranks.min(axis=1)
+        return np.argsort(scores, kind='stable')
+    
+    def _pick_combos(self, combos: np.ndarray, order: np.ndarray, cumulative: np.ndarray,
+                     uniforms: np.ndarray) -> np.ndarray:
+        """Inverse-CDF combo draw for each uniform, over combos taken in `order`."""
+        picks = np.searchsorted(cumulative, uniforms * cumulative[-1], side='right')
+        return combos[order[np.minimum(picks, len(order) - 1)]]
+    
+    def _sample_excluding(self, rng: np.random.Generator, opponent: WeightedRange,
+                          cards: np.ndarray) -> np.ndarray:
+        """Draw one combo per entry of `cards` by weight, redrawing combos that hold it."""
+        opponents = opponent.sample(rng, len(cards))
+        pending = np.flatnonzero((opponents == cards[:, None]).any(axis=1))
+        for _ in range(self.MAX_REDRAWS):
+            if not len(pending):
+                return opponents
+            opponents[pending] = opponent.sample(rng, len(pending))
+            pending = pending[(opponents[pending] == cards[pending, None]).any(axis=1)]
+        raise ValueError("Opponent range cannot avoid the sampled board card")
+    
+    def _outcomes(self, hand_cards: List[int], opponents: np.ndarray,
+                  boards: np.ndarray) -> np.ndarray:
+        """Hero's 1 / 0.5 / 0 result against each sampled combo and board."""
+        hero_scores, opponent_scores = self._score_heads_up(hand_cards, opponents, boards)
+        return (hero_scores > opponent_scores) + (hero_scores == opponent_scores) / 2
+    
+    def _draw_boards(self, rng: np.random.Generator, deck: np.ndarray,
+                     board_cards: List[int], opponents: np.ndarray) -> np.ndarray:
+        """Complete the board for each row of sampled opponent cards in one vectorized draw."""
+        count = len(opponents)
+        missing = 5 - len(board_cards)
+        known = np.tile(np.array(board_cards, dtype=np.int8), (count, 1))
+        if missing == 0:
+            return known
+        return np.hstack([known, self._deal_cards(rng, deck, opponents, missing)])
+    
+    def _deal_cards(self, rng: np.random.Generator, deck: np.ndarray, excluded: np.ndarray,
+                    size: int, ordered: bool = False,
+                    keys: Optional[np.ndarray] = None) -> np.ndarray:
+        """Deal `size` distinct deck cards per row, skipping that row's excluded cards.
+        
+        Each row gets uniform random sort keys over the live deck; the
+        excluded cards are pushed to the end and the smallest keys are
+        dealt, so no per-sample deck is built. With `ordered` the dealt
+        cards come out in key order, so consecutive slices of a row are
+        exchangeable (as needed when they go to different players).
+        Precomputed `keys` (one uniform per deck card and row) may be
+        passed in instead of drawing fresh ones.
+        """
+        count = len(excluded)
+        deck_position = np.full(52, -1, dtype=np.int64)
+        deck_position[deck] = np.arange(len(deck))
+        keys = rng.random((count, len(deck))) if keys is None else keys.copy()
+        rows = np.arange(count)[:, None]
+        keys[rows, deck_position[excluded]] = 2.0
+        picks = np.argpartition(keys, size - 1, axis=1)[:, :size]
+        if ordered:
+            picks = np.take_along_axis(picks, np.argsort(keys[rows, picks], axis=1), axis=1)
+        return deck[picks]
+    
+    def _score_matchups(self, hand_cards: List[int], opponents: np.ndarray,
+                        boards: np.ndarray) -> EquityTally:
+        """Tally hero's results against sampled opponent hands on sampled boards."""
+        hero_scores, opponent_scores = self._score_heads_up(hand_cards, opponents, boards)
+        return EquityTally(
+            won=float(np.count_nonzero(hero_scores > opponent_scores)),
+            tied=float(np.count_nonzero(hero_scores == opponent_scores)),
+            total=float(len(boards)),
+            samples=len(boards)
+        )
+    
+    def _score_heads_up(self, hand_cards: List[int], opponents: np.ndarray,
+                        boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Hero and opponent strengths on each board, sharing one board evaluator."""
+        count = len(boards)
+        evaluator = fast_evaluator.BoardEvaluator(boards)
+        board_idx = np.tile(np.arange(count), 2)
+        scores = evaluator.evaluate(np.vstack([np.tile(np.array(hand_cards), (count, 1)), opponents]),
+                                    board_idx)
+        return scores[:count], scores[count:]
+    
+    def _calculate_current_strength(self, hand_cards: List[int], board_cards: List[int],
+                                    combos: np.ndarray, weights: np.ndarray,
+                                    equity: float) -> float:
+        """Share of the range the hand beats on the current board (ties count half).
+        
+        Preflop there is no made hand yet, so the equity is used instead.
+        """
+        if len(board_cards) < 3:
+            return equity
+        hero = fast_evaluator.evaluate_cards(hand_cards + board_cards)
+        opponents = fast_evaluator.BoardEvaluator(board_cards).evaluate(combos)
+        beaten = weights[hero > opponents].sum() + weights[hero == opponents].sum() / 2
+        return float(beaten / weights.sum())
+    
+    def _calculate_outs(self, hand_cards: List[int], board_cards: List[int],
+                        combos: np.ndarray, weights: np.ndarray) -> List[IntCard]:
+        """Next-card outs against the live opponent combos (none preflop or on the river)."""
+        return score_outs(hand_cards, board_cards, combos, weights).outs
     
-    def _get_hand_type(self, hand_cards: List[Card], 
-                      board_cards: List[Card]) -> str:
-        """Get the type of hand (e.g., 'pair', 'two pair', etc.)."""
-        # This is a simplified version. In a real implementation,
-        # you would want to properly evaluate the hand type.
-        return "high card" 
\ No newline at end of file
+    def _get_hand_type(self, hand_cards: List[int], board_cards: List[int]) -> str:
+        """Type of the hand made so far, named as in HandRank ('pair', 'two_pair', ...)."""
+        cards = list(hand_cards) + list(board_cards)
+        if len(cards) >= 5:
+            strength = fast_evaluator.evaluate_cards(cards)
+            category = fast_evaluator.strength_category(strength)
+            if category == fast_evaluator.STRAIGHT_FLUSH and \
+                    fast_evaluator.strength_ranks(strength)[0] == fast_evaluator.ACE:
+                return 'royal_flush'
+        else:
+            # Fewer than five cards can only pair up
+            ranks = np.bincount(np.array(cards, dtype=np.int64) >> 2, minlength=13)
+            pairs = int((ranks == 2).sum())
+            category = fast_evaluator.FOUR_OF_A_KIND if ranks.max() == 4 else \
+                fast_evaluator.THREE_OF_A_KIND if ranks.max() == 3 else \
+                fast_evaluator.TWO_PAIR if pairs >= 2 else \
+                fast_evaluator.PAIR if pairs else fast_evaluator.HIGH_CARD
+        return self.HAND_TYPES[category]
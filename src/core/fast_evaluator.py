@@ -0,0 +1,344 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Hand strength is a single int that totally orders 5-7 card hands:
+#   category << 20 | up to five 4-bit rank indices, most significant first.
+# The rank nibbles hold the distinct rank groups in comparison order, e.g.
+# (trips, kicker, kicker) for three of a kind or (high card,) for a straight.
+HIGH_CARD = 0
+PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+
+CATEGORY_SHIFT = 20
+ACE = 12
+WHEEL_HIGH = 3  # A-2-3-4-5 plays as a five-high straight
+
+# Each rank contributes 5 ** rank to a hand's rank key, so the key encodes
+# the count of every rank (at most 4) as a base-5 number.
+POW5 = [5 ** rank for rank in range(13)]
+
+_WHEEL_MASK = (1 << ACE) | 0b1111
+_STRAIGHT_MASKS = [(0b11111 << (high - 4), high) for high in range(ACE, WHEEL_HIGH, -1)]
+_STRAIGHT_MASKS.append((_WHEEL_MASK, WHEEL_HIGH))
+
+_flush_table: Optional[List[int]] = None
+_rank_table: Optional[Dict[int, int]] = None
+_array_tables: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+
+# evaluate_batch splits rank keys into ranks 2-8 and ranks 9-A
+LOW_RANKS = 7
+LOW_KEY_SPAN = 5 ** LOW_RANKS
+HIGH_KEY_SPAN = 5 ** (13 - LOW_RANKS)
+
+# Rows scored per vectorized pass in evaluate_batch, bounding temporaries
+BATCH_CHUNK = 1 << 18
+
+
+def pack_strength(category: int, ranks: Sequence[int]) -> int:
+    """Pack a category and its rank groups into a strength integer."""
+    strength = category
+    for idx in range(5):
+        strength = (strength << 4) | (ranks[idx] if idx < len(ranks) else 0)
+    return strength
+
+
+def strength_category(strength: int) -> int:
+    """Return the hand category (HIGH_CARD..STRAIGHT_FLUSH) of a strength."""
+    return strength >> CATEGORY_SHIFT
+
+
+def strength_ranks(strength: int) -> List[int]:
+    """Return the five packed rank nibbles of a strength, highest first."""
+    return [(strength >> shift) & 0xF for shift in (16, 12, 8, 4, 0)]
+
+
+def _straight_high(rank_mask: int) -> int:
+    """Return the high rank of the best straight in a rank mask, or -1."""
+    for mask, high in _STRAIGHT_MASKS:
+        if rank_mask & mask == mask:
+            return high
+    return -1
+
+
+def _top_ranks(rank_mask: int, count: int) -> List[int]:
+    """Return the `count` highest ranks set in a rank mask."""
+    ranks = []
+    for rank in range(ACE, -1, -1):
+        if rank_mask >> rank & 1:
+            ranks.append(rank)
+            if len(ranks) == count:
+                break
+    return ranks
+
+
+def _build_flush_table() -> List[int]:
+    """Best flush or straight flush for every 13-bit suited rank mask."""
+    table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count('1') < 5:
+            continue
+        high = _straight_high(mask)
+        if high >= 0:
+            table[mask] = pack_strength(STRAIGHT_FLUSH, [high])
+        else:
+            table[mask] = pack_strength(FLUSH, _top_ranks(mask, 5))
+    return table
+
+
+def _score_rank_counts(counts: Sequence[int]) -> int:
+    """Best non-flush strength for a hand given its per-rank counts."""
+    by_count: List[List[int]] = [[], [], [], [], []]
+    rank_mask = 0
+    for rank in range(ACE, -1, -1):
+        count = counts[rank]
+        if count:
+            by_count[count].append(rank)
+            rank_mask |= 1 << rank
+
+    if by_count[4]:
+        quad = by_count[4][0]
+        kicker = _top_ranks(rank_mask & ~(1 << quad), 1)
+        return pack_strength(FOUR_OF_A_KIND, [quad] + kicker)
+
+    if by_count[3]:
+        trips = by_count[3][0]
+        pairs = sorted(by_count[3][1:] + by_count[2], reverse=True)
+        if pairs:
+            return pack_strength(FULL_HOUSE, [trips, pairs[0]])
+
+    high = _straight_high(rank_mask)
+    if high >= 0:
+        return pack_strength(STRAIGHT, [high])
+
+    if by_count[3]:
+        trips = by_count[3][0]
+        return pack_strength(THREE_OF_A_KIND, [trips] + _top_ranks(rank_mask & ~(1 << trips), 2))
+
+    if len(by_count[2]) >= 2:
+        high_pair, low_pair = by_count[2][:2]
+        kicker = _top_ranks(rank_mask & ~(1 << high_pair) & ~(1 << low_pair), 1)
+        return pack_strength(TWO_PAIR, [high_pair, low_pair] + kicker)
+
+    if by_count[2]:
+        pair = by_count[2][0]
+        return pack_strength(PAIR, [pair] + _top_ranks(rank_mask & ~(1 << pair), 3))
+
+    return pack_strength(HIGH_CARD, _top_ranks(rank_mask, 5))
+
+
+def _build_rank_table() -> Dict[int, int]:
+    """Best non-flush strength for every 5-7 card rank multiset, by rank key."""
+    table = {}
+    counts = [0] * 13
+
+    def fill(rank: int, remaining: int, key: int, size: int) -> None:
+        if rank == 13:
+            if size >= 5:
+                table[key] = _score_rank_counts(counts)
+            return
+        for count in range(min(4, remaining) + 1):
+            counts[rank] = count
+            fill(rank + 1, remaining - count, key + count * POW5[rank], size + count)
+        counts[rank] = 0
+
+    fill(0, 7, 0, 0)
+    return table
+
+
+def get_tables() -> Tuple[List[int], Dict[int, int]]:
+    """Return the (flush, rank) lookup tables, building them on first use."""
+    global _flush_table, _rank_table
+    if _rank_table is None:
+        _flush_table = _build_flush_table()
+        _rank_table = _build_rank_table()
+    return _flush_table, _rank_table
+
+
+def evaluate_cards(cards: Iterable[int]) -> int:
+    """Score 5-7 integer-encoded cards as a single comparable strength."""
+    flush_table, rank_table = get_tables()
+    key = 0
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        rank = card >> 2
+        key += POW5[rank]
+        suit_masks[card & 3] |= 1 << rank
+    try:
+        strength = rank_table[key]
+    except KeyError:
+        raise ValueError("Need 5 to 7 distinct cards to evaluate a hand")
+    for mask in suit_masks:
+        flush = flush_table[mask]
+        if flush > strength:
+            strength = flush
+    return strength
+
+
+def _digit_sums(keys: np.ndarray, digits: int) -> np.ndarray:
+    """Sum the base-5 digits of each key, i.e. the number of cards it counts."""
+    sums = np.zeros_like(keys)
+    for _ in range(digits):
+        sums += keys % 5
+        keys = keys // 5
+    return sums
+
+
+def _build_array_tables() -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Lay the rank table out densely for two-level vectorized indexing.
+
+    A rank key splits into a low part (ranks 2-8) and a high part (ranks
+    9-A). High parts are ordered by card count, so the high parts that
+    complete a given low part to 5-7 cards form one contiguous run; the
+    dense index is then `low_base[low] + high_pos[high]`.
+    """
+    flush_table, rank_table = get_tables()
+
+    high_keys = np.arange(HIGH_KEY_SPAN, dtype=np.int64)
+    high_sizes = _digit_sums(high_keys, 13 - LOW_RANKS)
+    valid_high = high_sizes <= 7
+    high_order = np.lexsort((high_keys[valid_high], high_sizes[valid_high]))
+    ordered_high = high_keys[valid_high][high_order]
+    high_pos = np.zeros(HIGH_KEY_SPAN, dtype=np.int64)
+    high_pos[ordered_high] = np.arange(len(ordered_high))
+    size_start = np.searchsorted(high_sizes[ordered_high], np.arange(9))
+
+    low_keys = np.arange(LOW_KEY_SPAN, dtype=np.int64)
+    low_sizes = _digit_sums(low_keys, LOW_RANKS)
+    low_base = np.zeros(LOW_KEY_SPAN, dtype=np.int64)
+    base = 0
+    for low in np.flatnonzero(low_sizes <= 7):
+        size = low_sizes[low]
+        first = size_start[max(0, 5 - size)]
+        low_base[low] = base - first
+        base += size_start[8 - size] - first
+
+    keys = np.fromiter(rank_table.keys(), dtype=np.int64, count=len(rank_table))
+    values = np.fromiter(rank_table.values(), dtype=np.int32, count=len(rank_table))
+    dense = np.zeros(base, dtype=np.int32)
+    dense[low_base[keys % LOW_KEY_SPAN] + high_pos[keys // LOW_KEY_SPAN]] = values
+    return np.asarray(flush_table, dtype=np.int32), low_base, high_pos, dense
+
+
+def get_array_tables() -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return (flush table, low base, high position, dense rank table) arrays."""
+    global _array_tables
+    if _array_tables is None:
+        _array_tables = _build_array_tables()
+    return _array_tables
+
+
+_POW5_ARRAY = np.asarray(POW5, dtype=np.int64)
+
+
+def evaluate_batch(cards: np.ndarray) -> np.ndarray:
+    """Score an (N, k) array of distinct encoded cards, 5 <= k <= 7, as N strengths.
+
+    Rows are scored with vectorized table lookups only: the base-5 rank key
+    resolves through two small index tables into the dense rank table, and
+    per-suit rank masks index the flush table directly.
+    """
+    cards = np.asarray(cards)
+    if cards.ndim != 2 or not 5 <= cards.shape[1] <= 7:
+        raise ValueError("Expected an (N, 5..7) array of encoded cards")
+    result = np.empty(cards.shape[0], dtype=np.int32)
+    for start in range(0, cards.shape[0], BATCH_CHUNK):
+        chunk = cards[start:start + BATCH_CHUNK]
+        result[start:start + len(chunk)] = _evaluate_chunk(chunk)
+    return result
+
+
+def _evaluate_chunk(cards: np.ndarray) -> np.ndarray:
+    """Score one chunk of evaluate_batch rows."""
+    flush_table, low_base, high_pos, dense = get_array_tables()
+    ranks = cards >> 2
+    suits = cards & 3
+
+    high_keys, low_keys = np.divmod(_POW5_ARRAY[ranks].sum(axis=1), LOW_KEY_SPAN)
+    strengths = dense[low_base[low_keys] + high_pos[high_keys]]
+
+    # Cards are distinct, so summing one bit per card at offset 13 * suit
+    # yields all four suited rank masks packed into a single int64.
+    packed = np.left_shift(1, ranks + 13 * suits, dtype=np.int64).sum(axis=1)
+    for suit in range(4):
+        suit_masks = (packed >> (13 * suit)) & 0x1FFF
+        np.maximum(strengths, flush_table[suit_masks], out=strengths)
+    return strengths
+
+
+# Each card's contribution to the low (ranks 2-8) and high (ranks 9-A) part
+# of a rank key, so hole cards can be added to a board's precomputed parts
+_CARD_RANKS = np.arange(52, dtype=np.int64) >> 2
+_LOW_ADD = np.where(_CARD_RANKS < LOW_RANKS, _POW5_ARRAY[_CARD_RANKS], 0)
+_HIGH_ADD = np.where(_CARD_RANKS >= LOW_RANKS, _POW5_ARRAY[_CARD_RANKS] // LOW_KEY_SPAN, 0)
+
+
+class BoardEvaluator:
+    """Scores two-card holdings on fixed boards, with each board's state built once.
+
+    A board's low and high rank-key parts are summed up front, so a
+    holding adds two table entries per part before the dense lookup. Only
+    a suit with three or more board cards can make a flush with two hole
+    cards, and at most one suit of a 3-5 card board can, so each board
+    keeps that suit and its rank mask and every other board skips the
+    flush check entirely.
+    """
+
+    def __init__(self, boards: np.ndarray):
+        """Precompute state for one (k,) board or a (B, k) array of boards, 3 <= k <= 5."""
+        boards = np.asarray(boards, dtype=np.int64)
+        if boards.ndim == 1:
+            boards = boards[None, :]
+        if boards.ndim != 2 or not 3 <= boards.shape[1] <= 5:
+            raise ValueError("Expected boards of 3 to 5 encoded cards")
+        self.boards = boards
+        self.low_keys = _LOW_ADD[boards].sum(axis=1)
+        self.high_keys = _HIGH_ADD[boards].sum(axis=1)
+        suits = boards & 3
+        counts = (suits[:, :, None] == np.arange(4)).sum(axis=1)
+        self.flush_suits = np.where(counts.max(axis=1) >= 3, counts.argmax(axis=1), -1)
+        self.flush_masks = np.where(suits == self.flush_suits[:, None],
+                                    np.left_shift(1, boards >> 2), 0).sum(axis=1)
+
+    def __len__(self) -> int:
+        return len(self.boards)
+
+    def evaluate(self, holes: np.ndarray, board_idx: Optional[np.ndarray] = None) -> np.ndarray:
+        """Score (N, 2) hole cards, row i on board `board_idx[i]` (the first board if omitted).
+
+        Hole cards must not repeat a card of their board.
+        """
+        holes = np.asarray(holes, dtype=np.int64)
+        if holes.ndim != 2 or holes.shape[1] != 2:
+            raise ValueError("Expected an (N, 2) array of hole cards")
+        if board_idx is None:
+            board_idx = np.zeros(len(holes), dtype=np.int64)
+        result = np.empty(len(holes), dtype=np.int32)
+        for start in range(0, len(holes), BATCH_CHUNK):
+            stop = start + BATCH_CHUNK
+            result[start:start + len(holes[start:stop])] = self._evaluate_chunk(
+                holes[start:stop], np.asarray(board_idx[start:stop]))
+        return result
+
+    def _evaluate_chunk(self, holes: np.ndarray, board_idx: np.ndarray) -> np.ndarray:
+        """Score one chunk of evaluate rows."""
+        flush_table, low_base, high_pos, dense = get_array_tables()
+        first, second = holes[:, 0], holes[:, 1]
+        low = self.low_keys[board_idx] + _LOW_ADD[first] + _LOW_ADD[second]
+        high = self.high_keys[board_idx] + _HIGH_ADD[first] + _HIGH_ADD[second]
+        strengths = dense[low_base[low] + high_pos[high]]
+
+        rows = np.flatnonzero(self.flush_suits[board_idx] >= 0)
+        if len(rows):
+            suit = self.flush_suits[board_idx[rows]]
+            first, second = first[rows], second[rows]
+            masks = self.flush_masks[board_idx[rows]] | \
+                np.where(first & 3 == suit, np.left_shift(1, first >> 2), 0) | \
+                np.where(second & 3 == suit, np.left_shift(1, second >> 2), 0)
+            strengths[rows] = np.maximum(strengths[rows], flush_table[masks])
+        return strengths
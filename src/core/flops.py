@@ -0,0 +1,218 @@
+from typing import Dict, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+from .cards import IntCard, encode_cards, parse_cards
+from .ranges import ALL_COMBOS, COMBO_INDEX, COMBO_MASKS, expand_range, is_random_range, is_suit_symmetric
+from .abstraction import situation_codes
+from . import fast_evaluator
+
+# Every flop is one of 1,755 suit-isomorphic classes. FLOP_CARDS holds one
+# representative per class (cards high to low) and FLOP_ID maps any three
+# distinct cards, in any order, to their class id; entries with a repeated
+# card hold -1.
+_ALL_FLOPS = np.array(list(combinations(range(52), 3)), dtype=np.int64)
+_CODES = situation_codes(_ALL_FLOPS, hole=0)
+_, _FIRST, _CLASS = np.unique(_CODES, return_index=True, return_inverse=True)
+FLOP_CARDS = np.sort(_ALL_FLOPS[_FIRST], axis=1)[:, ::-1].astype(np.int8)
+FLOP_COUNTS = np.bincount(_CLASS).astype(np.int16)  # Raw flops in each class
+NUM_FLOPS = len(FLOP_CARDS)
+
+FLOP_ID = np.full((52, 52, 52), -1, dtype=np.int16)
+for _order in ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0)):
+    _columns = _ALL_FLOPS[:, _order]
+    FLOP_ID[_columns[:, 0], _columns[:, 1], _columns[:, 2]] = _CLASS
+
+# Unordered rank pairs a player could hold, used to count straight-making holdings
+_RANK_PAIRS = np.array(list(combinations(range(13), 2)))
+_STRAIGHT_WINDOWS = [np.arange(high - 4, high + 1) % 13 for high in range(3, 13)]
+
+
+def _straight_holdings(ranks: np.ndarray) -> np.ndarray:
+    """Number of unpaired two-rank holdings that make a straight with each (N, 3) rank row."""
+    present = np.zeros((len(ranks), 13), dtype=bool)
+    present[np.arange(len(ranks))[:, None], ranks] = True
+    makes = np.zeros((len(ranks), len(_RANK_PAIRS)), dtype=bool)
+    for window in _STRAIGHT_WINDOWS:
+        covered = present[:, window].sum(axis=1)
+        held = np.isin(_RANK_PAIRS, window).all(axis=1) & \
+            ~present[:, _RANK_PAIRS[:, 0]] & ~present[:, _RANK_PAIRS[:, 1]]
+        makes |= (covered == 3)[:, None] & held
+    return makes.sum(axis=1)
+
+
+_RANKS = FLOP_CARDS.astype(np.int64) >> 2
+_SUIT_COUNTS = np.array([len(set(row)) for row in (FLOP_CARDS & 3).tolist()])
+_RANK_COUNTS = np.array([len(set(row)) for row in _RANKS.tolist()])
+_HOLDINGS = _straight_holdings(_RANKS)
+
+
+@dataclass(frozen=True)
+class FlopTexture:
+    """Static texture of one canonical flop."""
+    flop_id: int
+    cards: Tuple[IntCard, IntCard, IntCard]  # Canonical representative, high to low
+    high_card: int       # Rank index of the top card, 0 for a deuce up to 12 for an ace
+    paired: bool         # At least two cards share a rank (trips included)
+    trips: bool
+    monotone: bool       # One suit: a flush is already possible
+    two_tone: bool       # Two suits: a flush draw is possible
+    rainbow: bool
+    connectedness: int   # Unpaired rank holdings that make a straight on this flop
+    frequency: int       # Raw flops (out of 22,100) in this class
+
+    @property
+    def straight_possible(self) -> bool:
+        return self.connectedness > 0
+
+    @property
+    def wet(self) -> bool:
+        """Coordinated enough that draws shape play (two-tone or straight-ready)."""
+        return not self.rainbow or self.connectedness > 0
+
+
+@dataclass
+class RangeAdvantage:
+    """How two ranges hit one flop, before any further cards.
+
+    Card removal between the two ranges is ignored; each range only loses
+    the combos that share a card with the flop.
+    """
+    equity: float           # Chance a combo of the first range is currently ahead, ties half
+    strong_share: float     # Share of the first range with two pair or better
+    opponent_strong_share: float
+    overpair_share: float   # Share of the first range with a pocket pair above the board
+    opponent_overpair_share: float
+
+
+def flop_id(flop: Union[str, Sequence]) -> int:
+    """Canonical id (0..1754) of a flop given as a string or three cards."""
+    cards = parse_cards(flop) if isinstance(flop, str) else encode_cards(flop)
+    if len(cards) != 3:
+        raise ValueError("A flop must contain exactly 3 cards")
+    idx = int(FLOP_ID[cards[0], cards[1], cards[2]])
+    if idx < 0:
+        raise ValueError("Flop cards must be distinct")
+    return idx
+
+
+@lru_cache(maxsize=None)
+def flop_texture(idx: int) -> FlopTexture:
+    """Texture of the flop class with id `idx`."""
+    if not 0 <= idx < NUM_FLOPS:
+        raise ValueError(f"Flop id must be in 0..{NUM_FLOPS - 1}, got {idx}")
+    return FlopTexture(
+        flop_id=idx,
+        cards=tuple(IntCard(int(card)) for card in FLOP_CARDS[idx]),
+        high_card=int(_RANKS[idx, 0]),
+        paired=bool(_RANK_COUNTS[idx] < 3),
+        trips=bool(_RANK_COUNTS[idx] == 1),
+        monotone=bool(_SUIT_COUNTS[idx] == 1),
+        two_tone=bool(_SUIT_COUNTS[idx] == 2),
+        rainbow=bool(_SUIT_COUNTS[idx] == 3),
+        connectedness=int(_HOLDINGS[idx]),
+        frequency=int(FLOP_COUNTS[idx])
+    )
+
+
+def board_texture(flop: Union[str, Sequence]) -> FlopTexture:
+    """Texture of a flop given as a string or three cards."""
+    return flop_texture(flop_id(flop))
+
+
+@lru_cache(maxsize=1)
+def _flop_scores() -> np.ndarray:
+    """(NUM_FLOPS, 1326) strength of every combo on every canonical flop."""
+    live = (COMBO_MASKS[None, :] & _flop_masks(FLOP_CARDS)[:, None]) == 0
+    flop_idx, combo_idx = np.nonzero(live)
+    scores = np.full(live.shape, -1, dtype=np.int64)
+    scores[flop_idx, combo_idx] = fast_evaluator.BoardEvaluator(FLOP_CARDS).evaluate(
+        ALL_COMBOS[combo_idx], flop_idx)
+    return scores.reshape(NUM_FLOPS, len(ALL_COMBOS))
+
+
+def _flop_masks(flops: np.ndarray) -> np.ndarray:
+    return (np.int64(1) << flops.astype(np.int64)).sum(axis=1)
+
+
+def _range_weights(opponent_range: Optional[Dict[str, float]]) -> np.ndarray:
+    """Range weights laid out over ALL_COMBOS."""
+    combos, weights = expand_range(opponent_range)
+    dense = np.zeros(len(ALL_COMBOS))
+    dense[COMBO_INDEX[combos[:, 0], combos[:, 1]]] = weights
+    return dense
+
+
+def _advantage(scores: np.ndarray, flops: np.ndarray, weights: np.ndarray,
+               opponent_weights: np.ndarray) -> np.ndarray:
+    """(F, 5) RangeAdvantage fields for each flop row of `scores`."""
+    live = scores >= 0
+    first, second = live * weights, live * opponent_weights
+    # A flop that removes every combo of a range leaves its row NaN
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return _shares(scores, flops, first, second, first.sum(axis=1), second.sum(axis=1))
+
+
+def _shares(scores: np.ndarray, flops: np.ndarray, first: np.ndarray, second: np.ndarray,
+            first_total: np.ndarray, second_total: np.ndarray) -> np.ndarray:
+    """RangeAdvantage fields from live range weights and their per-flop totals."""
+    # Weight of the second range strictly below and equal to each score, one
+    # flattened searchsorted over scores offset per flop
+    offsets = np.arange(len(scores))[:, None] << 28
+    keyed = (scores + 1 + offsets).ravel()
+    order = np.argsort(keyed, kind='stable')
+    cumulative = np.concatenate([[0.0], np.cumsum(second.ravel()[order])])
+    sorted_keys = keyed[order]
+    below = cumulative[np.searchsorted(sorted_keys, keyed, 'left')].reshape(scores.shape)
+    through = cumulative[np.searchsorted(sorted_keys, keyed, 'right')].reshape(scores.shape)
+    base = cumulative[np.searchsorted(sorted_keys, offsets[:, 0], 'left')][:, None]
+    ahead = (below - base + (through - below) / 2) / second_total[:, None]
+    equity = (first * ahead).sum(axis=1) / first_total
+
+    strong = scores >> fast_evaluator.CATEGORY_SHIFT >= fast_evaluator.TWO_PAIR
+    pocket = ALL_COMBOS[:, 0] >> 2 == ALL_COMBOS[:, 1] >> 2
+    overpair = pocket[None, :] & ((ALL_COMBOS[:, 0] >> 2)[None, :] > (flops.max(axis=1) >> 2)[:, None])
+    return np.stack([
+        equity,
+        (first * strong).sum(axis=1) / first_total,
+        (second * strong).sum(axis=1) / second_total,
+        (first * overpair).sum(axis=1) / first_total,
+        (second * overpair).sum(axis=1) / second_total
+    ], axis=1)
+
+
+def _range_key(opponent_range: Optional[Dict[str, float]]) -> Tuple[Tuple[str, float], ...]:
+    """Hashable form of a range; random ranges map to the empty tuple."""
+    return () if is_random_range(opponent_range) else tuple(sorted(opponent_range.items()))
+
+
+@lru_cache(maxsize=64)
+def _advantage_table(range_key: Tuple, opponent_key: Tuple) -> np.ndarray:
+    """(NUM_FLOPS, 5) advantage of one suit-symmetric range pair on every flop."""
+    return _advantage(_flop_scores(), FLOP_CARDS, _range_weights(dict(range_key) or None),
+                      _range_weights(dict(opponent_key) or None))
+
+
+def range_advantage(flop: Union[str, Sequence], hero_range: Optional[Dict[str, float]],
+                    opponent_range: Optional[Dict[str, float]] = None) -> RangeAdvantage:
+    """How `hero_range` hits a flop compared with `opponent_range`.
+
+    Ranges of hand classes ('AKs', 'QQ') are suit-symmetric, so their stats
+    are computed once for all 1,755 flops and looked up by flop id. Ranges
+    naming suited combos are scored on the actual flop instead.
+    """
+    cards = parse_cards(flop) if isinstance(flop, str) else encode_cards(flop)
+    idx = flop_id(cards)
+    if is_suit_symmetric(hero_range) and is_suit_symmetric(opponent_range):
+        row = _advantage_table(_range_key(hero_range), _range_key(opponent_range))[idx]
+    else:
+        flops = np.array([cards], dtype=np.int8)
+        live = (COMBO_MASKS & _flop_masks(flops)[0]) == 0
+        scores = np.full(len(ALL_COMBOS), -1, dtype=np.int64)
+        scores[live] = fast_evaluator.BoardEvaluator(flops[0]).evaluate(ALL_COMBOS[live])
+        row = _advantage(scores[None, :], flops, _range_weights(hero_range),
+                         _range_weights(opponent_range))[0]
+    if np.isnan(row).any():
+        raise ValueError("Range has no combos left after card removal")
+    return RangeAdvantage(*(float(value) for value in row))
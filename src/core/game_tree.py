@@ -0,0 +1,314 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+import numpy as np
+from .cards import parse_cards
+
+PREFLOP, FLOP, TURN, RIVER = 0, 1, 2, 3
+STREETS = {3: FLOP, 4: TURN, 5: RIVER}  # Board size -> street
+
+# Node kinds
+DECISION, FOLD, SHOWDOWN, CHANCE = 0, 1, 2, 3
+
+# Action codes stored per node for the action leading to it
+ACTIONS = ('', 'check', 'bet', 'call', 'raise', 'fold', 'all-in', 'deal')
+CHECK, BET, CALL, RAISE, FOLD_ACTION, ALL_IN, DEAL = range(1, 8)
+
+DEFAULT_POT = 6.5  # Single-raised pot in big blinds, when a spot has no bet sizes
+DEFAULT_MAX_NODES = 2_000_000
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Bytes per node across the GameTree arrays below
+NODE_BYTES = 4 + 1 + 1 + 1 + 8 + 1 + 16 + 4 + 2
+
+
+@dataclass(frozen=True)
+class BetSizing:
+    """Bet-size menu shared by every street.
+
+    Bets are fractions of the pot and raises fractions of the pot after
+    calling. A size that would leave less than `all_in_threshold` of the
+    stack behind becomes all-in.
+    """
+    bet_sizes: Tuple[float, ...] = (0.33, 0.75, 1.0)
+    raise_sizes: Tuple[float, ...] = (1.0,)
+    all_in: bool = True
+    max_raises: int = 3
+    all_in_threshold: float = 0.25
+
+
+@dataclass
+class TreeSize:
+    """Node counts and memory estimate of a tree, known before it is built."""
+    nodes: int             # One per betting sequence, the arrays GameTree holds
+    decision_nodes: int
+    terminals: int
+    chance_nodes: int
+    expanded_nodes: int    # Once every later street card is dealt out
+    expanded_edges: Tuple[int, int]  # Each player's actions after dealing
+
+    @property
+    def tree_bytes(self) -> int:
+        return self.nodes * NODE_BYTES
+
+    def solver_bytes(self, combos: Tuple[int, int] = (1326, 1326)) -> int:
+        """Float64 regrets and average strategy per edge, reach and value per node, for each range."""
+        return sum(8 * (2 * self.expanded_edges[player] + 2 * self.expanded_nodes) * combos[player]
+                   for player in (0, 1))
+
+
+@dataclass
+class GameTree:
+    """Heads-up betting tree laid out in flat arrays, breadth first.
+
+    Player 0 acts first on every street. Children of a node are contiguous
+    and every parent comes before its children. `invested` counts chips
+    each player has put in since the root; `amount` is the acting
+    player's street total after a bet, raise or call.
+    """
+    pot: float                # Chips in the middle at the root
+    stack: float              # Effective stack behind at the root
+    street: int
+    last_street: int
+    parent: np.ndarray        # int32, -1 at the root
+    player: np.ndarray        # int8 acting player, -1 at terminals and chance nodes
+    kind: np.ndarray          # int8 DECISION / FOLD / SHOWDOWN / CHANCE
+    action: np.ndarray        # int8 index into ACTIONS of the action leading here
+    amount: np.ndarray        # float64
+    node_street: np.ndarray   # int8
+    invested: np.ndarray      # (N, 2) float64
+    first_child: np.ndarray   # int32
+    num_children: np.ndarray  # int16
+    size: TreeSize
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    @property
+    def pots(self) -> np.ndarray:
+        return self.pot + self.invested.sum(axis=1)
+
+    @property
+    def stacks(self) -> np.ndarray:
+        return self.stack - self.invested
+
+    @property
+    def folder(self) -> np.ndarray:
+        """Player who folded into each node, -1 elsewhere."""
+        return np.where(self.kind == FOLD, self.player[np.maximum(self.parent, 0)], -1)
+
+    def children(self, node: int) -> range:
+        start = int(self.first_child[node])
+        return range(start, start + int(self.num_children[node]))
+
+    def label(self, node: int) -> str:
+        """Name of the action leading to `node`, with the size of bets and raises."""
+        name = ACTIONS[self.action[node]]
+        return f'{name} {self.amount[node]:g}' if self.action[node] in (BET, RAISE) else name
+
+    def actions(self, node: int = 0) -> List[str]:
+        return [self.label(child) for child in self.children(node)]
+
+    def child(self, node: int, label: str) -> int:
+        """Node reached by taking the action named `label` at `node`."""
+        for child in self.children(node):
+            if self.label(child) == label:
+                return child
+        raise ValueError(f"No action '{label}' at this node; expected one of {self.actions(node)}")
+
+
+def _expander(pot: float, stack: float, sizing: BetSizing, last_street: int):
+    """Successor function over betting states.
+
+    A state is (street, invested0, invested1, street_start, player, raises).
+    Each successor is (action code, street amount, kind, next state); the
+    next state of a terminal is None.
+    """
+    def amounts(invested, player, fractions):
+        other = invested[1 - player]
+        pot_after_call = pot + invested[0] + invested[1] + (other - invested[player])
+        totals = []
+        for fraction in fractions:
+            total = other + fraction * pot_after_call
+            if stack - total < sizing.all_in_threshold * stack:
+                total = stack
+            if other < total <= stack and total not in totals:
+                totals.append(total)
+        if sizing.all_in and other < stack and stack not in totals:
+            totals.append(stack)
+        return sorted(totals)
+
+    def street_over(street, invested, action, amount):
+        if street == last_street or max(invested) >= stack:
+            return (action, amount, SHOWDOWN, None)
+        return (action, amount, CHANCE, (street + 1, invested[0], invested[1], invested[0], 0, 0))
+
+    def successors(state):
+        street, invested0, invested1, start, player, raises = state
+        invested = (invested0, invested1)
+        other = 1 - player
+        moves = []
+        if invested0 == invested1:
+            if player == 1:
+                moves.append(street_over(street, invested, CHECK, 0.0))
+            else:
+                moves.append((CHECK, 0.0, DECISION, (street, invested0, invested1, start, 1, raises)))
+            for total in amounts(invested, player, sizing.bet_sizes):
+                after = (total, invested1) if player == 0 else (invested0, total)
+                moves.append((ALL_IN if total == stack else BET, total - start, DECISION,
+                              (street, after[0], after[1], start, other, raises)))
+            return moves
+        moves.append((FOLD_ACTION, 0.0, FOLD, None))
+        called = (invested[other],) * 2
+        moves.append(street_over(street, called, CALL, invested[other] - start))
+        if raises < sizing.max_raises and invested[other] < stack:
+            for total in amounts(invested, player, sizing.raise_sizes):
+                after = (total, invested1) if player == 0 else (invested0, total)
+                moves.append((ALL_IN if total == stack else RAISE, total - start, DECISION,
+                              (street, after[0], after[1], start, other, raises + 1)))
+        return moves
+
+    return successors
+
+
+def _check_stakes(pot: float, stack: float, street: int, last_street: int) -> None:
+    if pot <= 0 or stack < 0:
+        raise ValueError("Pot must be positive and stack non-negative")
+    if not FLOP <= street <= last_street <= RIVER:
+        raise ValueError("Trees start on the flop, turn or river and end no earlier")
+
+
+def estimate_tree(pot: float, stack: float, sizing: Optional[BetSizing] = None,
+                  street: int = RIVER, last_street: Optional[int] = None) -> TreeSize:
+    """Count a tree's nodes without building it.
+
+    Identical betting states are counted once, so this stays fast for
+    trees far too large to build.
+    """
+    sizing = sizing or BetSizing()
+    last_street = street if last_street is None else last_street
+    _check_stakes(pot, stack, street, last_street)
+    successors = _expander(pot, stack, sizing, last_street)
+    memo: Dict[Tuple, Tuple[int, ...]] = {}
+
+    def count(state) -> Tuple[int, ...]:
+        # (nodes, decisions, terminals, chance, expanded nodes, player 0 edges, player 1 edges)
+        if state not in memo:
+            totals = [1, 1, 0, 0, 1, 0, 0]
+            for _, _, kind, following in successors(state):
+                totals[5 + state[4]] += 1
+                if kind in (FOLD, SHOWDOWN):
+                    totals[0] += 1
+                    totals[2] += 1
+                    totals[4] += 1
+                    continue
+                below = count(following)
+                if kind == CHANCE:
+                    # One chance node, then the next street once per card that can fall
+                    cards = 52 - (following[0] + 1)
+                    totals[0] += 1 + below[0]
+                    totals[3] += 1
+                    totals[4] += 1 + cards * below[4]
+                    for idx in (1, 2, 3):
+                        totals[idx] += below[idx]
+                    totals[5] += cards * below[5]
+                    totals[6] += cards * below[6]
+                else:
+                    for idx in range(7):
+                        totals[idx] += below[idx]
+            memo[state] = tuple(totals)
+        return memo[state]
+
+    nodes, decisions, terminals, chance, expanded, edges0, edges1 = count((street, 0.0, 0.0, 0.0, 0, 0))
+    return TreeSize(nodes=nodes, decision_nodes=decisions, terminals=terminals, chance_nodes=chance,
+                    expanded_nodes=expanded, expanded_edges=(edges0, edges1))
+
+
+def build_tree(pot: float, stack: float, sizing: Optional[BetSizing] = None,
+               street: int = RIVER, last_street: Optional[int] = None,
+               max_nodes: int = DEFAULT_MAX_NODES, max_bytes: int = DEFAULT_MAX_BYTES,
+               combos: Tuple[int, int] = (1326, 1326)) -> GameTree:
+    """Expand the betting tree of one street, or through the river, under a bet-size menu.
+
+    The tree is sized first and rejected with a ValueError if its dealt-out
+    node count exceeds `max_nodes` or a solver over `combos` hands per
+    player would need more than `max_bytes`.
+    """
+    sizing = sizing or BetSizing()
+    last_street = street if last_street is None else last_street
+    size = estimate_tree(pot, stack, sizing, street, last_street)
+    if size.expanded_nodes > max_nodes:
+        raise ValueError(f"Tree has {size.expanded_nodes:,} nodes once dealt out, "
+                         f"over the budget of {max_nodes:,}")
+    memory = size.tree_bytes + size.solver_bytes(combos)
+    if memory > max_bytes:
+        raise ValueError(f"Solving this tree needs about {memory / (1 << 20):,.0f} MiB, "
+                         f"over the budget of {max_bytes / (1 << 20):,.0f} MiB")
+
+    successors = _expander(pot, stack, sizing, last_street)
+    parent, player, kind, action, amount = [-1], [0], [DECISION], [0], [0.0]
+    node_street, invested = [street], [(0.0, 0.0)]
+    first_child, num_children = [0] * size.nodes, [0] * size.nodes
+    states: List[Optional[Tuple]] = [(street, 0.0, 0.0, 0.0, 0, 0)]
+    node = 0
+    while node < len(states):
+        state = states[node]
+        if kind[node] == CHANCE:
+            moves = [(DEAL, 0.0, DECISION, state)]
+        else:
+            moves = [] if state is None else successors(state)
+        first_child[node], num_children[node] = len(parent), len(moves)
+        for code, street_amount, child_kind, following in moves:
+            parent.append(node)
+            kind.append(child_kind)
+            action.append(code)
+            amount.append(street_amount)
+            if child_kind == FOLD:
+                player.append(-1)
+                node_street.append(node_street[node])
+                invested.append(invested[node])
+                states.append(None)
+            elif child_kind == SHOWDOWN:
+                player.append(-1)
+                node_street.append(node_street[node])
+                total = invested[node][1 - player[node]]
+                invested.append((total, total) if code == CALL else invested[node])
+                states.append(None)
+            else:
+                player.append(-1 if child_kind == CHANCE else following[4])
+                node_street.append(following[0] - 1 if child_kind == CHANCE else following[0])
+                invested.append((following[1], following[2]))
+                states.append(following)
+        node += 1
+
+    return GameTree(
+        pot=float(pot), stack=float(stack), street=street, last_street=last_street,
+        parent=np.array(parent, dtype=np.int32), player=np.array(player, dtype=np.int8),
+        kind=np.array(kind, dtype=np.int8), action=np.array(action, dtype=np.int8),
+        amount=np.array(amount), node_street=np.array(node_street, dtype=np.int8),
+        invested=np.array(invested).reshape(-1, 2),
+        first_child=np.array(first_child, dtype=np.int32),
+        num_children=np.array(num_children, dtype=np.int16), size=size)
+
+
+def spot_stakes(action_history: Sequence, effective_stack: float) -> Tuple[float, float]:
+    """Pot and stack behind from a GameState history of (player, action, amount) entries.
+
+    The pot is the sum of sized entries, or DEFAULT_POT when there are
+    none; each player is assumed to have paid half of it.
+    """
+    sized = [entry for entry in action_history
+             if isinstance(entry, (list, tuple)) and len(entry) == 3 and entry[2]]
+    pot = sum(entry[2] for entry in sized) or DEFAULT_POT
+    return pot, max(effective_stack - pot / 2, 0)
+
+
+def tree_for_state(game_state, sizing: Optional[BetSizing] = None, all_streets: bool = False,
+                   **budget) -> GameTree:
+    """Tree of the GameState's current street, or of every street left when `all_streets`."""
+    board = game_state.board
+    size = len(parse_cards(board)) if isinstance(board, str) else len(getattr(board, 'cards', board) or [])
+    if size not in STREETS:
+        raise ValueError("Game trees need a flop, turn or river board")
+    street = STREETS[size]
+    pot, stack = spot_stakes(game_state.action_history, game_state.effective_stack)
+    return build_tree(pot, stack, sizing, street, RIVER if all_streets else street, **budget)
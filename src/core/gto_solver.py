@@ -1,10 +1,19 @@
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
-import json
 import os
 from .poker import Hand, Board
 from enum import Enum
 from .hand_evaluator import Card, Hand, HandEvaluator, HandRank
+from .cache import CacheStore, LRUCache, SQLiteStore
+from .cards import IntCard, encode_card, parse_cards
+from .isomorphism import canonical_key
+from .preflop_table import DEFAULT_TABLE_PATH, load_preflop_table
+from .outs import calculate_outs
+from .flops import board_texture, range_advantage
+from .ranges import hand_class
+from .river_solver import RiverSolver, build_river_tree
+from .game_tree import ALL_IN, BET, RAISE, spot_stakes
+from .push_fold import MAX_PUSH_FOLD_STACK, PREFLOP_ORDER, solve_push_fold
 import random
 
 @dataclass
@@ -17,6 +26,9 @@ class GameState:
     board: List[str]
     tournament: bool
 
+# Postflop acting order, first to act first
+POSTFLOP_ORDER = ['SB', 'BB', 'UTG', 'MP', 'CO', 'BTN']
+
 class Position(Enum):
     UTG = "UTG"  # Under the Gun
     MP = "MP"    # Middle Position
@@ -46,33 +58,63 @@ class GTOAdvice:
     ev: float  # Expected value
 
 class GtoSolver:
-    def __init__(self, solutions_path: str):
-        """Initialize GTO solver with a path to the solutions database."""
+    def __init__(self, solutions_path: str, solution_store: Optional[CacheStore] = None,
+                 cache_size: int = 4096):
+        """Initialize GTO solver with a path to the solutions database.
+        
+        Args:
+            solutions_path: Path of the solutions database. Solutions persist
+                in an SQLite database next to it (a '.json' suffix is replaced
+                by '.sqlite3').
+            solution_store: Persistent solution backend, overriding the
+                SQLite store at solutions_path.
+            cache_size: Solutions kept in the in-memory LRU.
+        """
         self.solutions_path = solutions_path
-        self.solutions = self._load_solutions()
+        self.solutions = self._load_solutions(solution_store, cache_size)
         self.hand_evaluator = HandEvaluator()
         self.preflop_ranges = self._load_preflop_ranges()
         self.postflop_strategies = self._load_postflop_strategies()
+        self.preflop_table_path = DEFAULT_TABLE_PATH
+        self.preflop_table = load_preflop_table(self.preflop_table_path)
     
-    def _load_solutions(self) -> Dict:
-        """Load GTO solutions from database."""
-        if not os.path.exists(self.solutions_path):
-            return {}
-        
-        with open(self.solutions_path, 'r') as f:
-            return json.load(f)
+    def _load_solutions(self, store: Optional[CacheStore], size: int) -> LRUCache:
+        """Open the solution store; solutions are read from it lazily on lookup."""
+        if store is None:
+            root, ext = os.path.splitext(self.solutions_path)
+            store = SQLiteStore((root if ext == '.json' else self.solutions_path) + '.sqlite3')
+        return LRUCache(store, max_entries=size, warm_entries=0)
+    
+    def flush(self) -> None:
+        """Write solutions computed since the last batch to the store."""
+        self.solutions.flush()
     
-    def _save_solutions(self) -> None:
-        """Save GTO solutions to database."""
-        with open(self.solutions_path, 'w') as f:
-            json.dump(self.solutions, f)
+    def _parse_spot_cards(self, cards) -> List[IntCard]:
+        """Parse GameState cards given as strings, card lists or Hand/Board objects."""
+        if not cards:
+            return []
+        if isinstance(cards, str):
+            return parse_cards(cards)
+        parsed = []
+        for card in getattr(cards, 'cards', cards):
+            parsed.extend(parse_cards(card) if isinstance(card, str) else [encode_card(card)])
+        return parsed
     
     def _get_solution_key(self, game_state: GameState) -> str:
-        """Generate a key for looking up solutions."""
-        hand = "".join(game_state.hand)
-        board = "".join(game_state.board) if game_state.board else ""
+        """Generate a suit-isomorphic spot id for looking up solutions.
+        
+        Besides the position and cards, the id covers the stack depth,
+        game type and action history, which all change the solution.
+        """
+        hand = self._parse_spot_cards(game_state.hand)
+        board = self._parse_spot_cards(game_state.board)
+        # The flop is unordered, but turn and river stay separate streets
+        streets = [street for street in (board[:3], board[3:4], board[4:5]) if street]
         position = game_state.position
-        return f"{position}_{hand}_{board}"
+        game = 'mtt' if game_state.tournament else 'cash'
+        history = ','.join(':'.join(str(part) for part in entry) if isinstance(entry, (list, tuple))
+                           else str(entry) for entry in game_state.action_history or [])
+        return f"{position}_{canonical_key([hand] + streets)}_{game_state.effective_stack}bb_{game}_{history}"
     
     def get_action(self, game_state: GameState) -> Tuple[str, float, float]:
         """
@@ -82,26 +124,34 @@ class GtoSolver:
             Tuple of (action, frequency, expected_value)
         """
         solution_key = self._get_solution_key(game_state)
-        
-        if solution_key in self.solutions:
-            solution = self.solutions[solution_key]
+        solution = self.solutions.get(solution_key)
+        if solution is not None:
             return solution['action'], solution['frequency'], solution['ev']
         
         # If no solution exists, calculate one
         action, frequency, ev = self._calculate_solution(game_state)
         
-        # Cache the solution
-        self.solutions[solution_key] = {
+        # Cache the solution; the store is written in batches
+        self.solutions.put(solution_key, {
             'action': action,
             'frequency': frequency,
             'ev': ev
-        }
-        self._save_solutions()
+        })
         
         return action, frequency, ev
     
     def _calculate_solution(self, game_state: GameState) -> Tuple[str, float, float]:
         """Calculate optimal action for a game state."""
+        board = self._parse_spot_cards(game_state.board)
+        solution = None
+        if len(board) == 5:
+            solution = self._solve_river_spot(game_state, board)
+        elif not board and game_state.tournament and game_state.effective_stack <= MAX_PUSH_FOLD_STACK \
+                and self.preflop_table is not None:
+            solution = self._solve_push_fold_spot(game_state)
+        if solution is not None:
+            return solution
+        
         # This is a simplified version. In a real implementation,
         # you would want to use a proper GTO solver that considers:
         # - Hand strength
@@ -128,6 +178,112 @@ class GtoSolver:
             else:
                 return 'bet', 0.6, 0.75
     
+    def _solve_push_fold_spot(self, game_state: GameState) -> Optional[Tuple[str, float, float]]:
+        """Answer a short-stacked tournament preflop spot from the push/fold equilibrium.
+        
+        The first entry that puts chips in must be an all-in, or a raise of
+        at least the effective stack, and is treated as the shove; without
+        one the hero is first in. Returns None for spots the push/fold model
+        does not cover, such as a smaller raise or limp before the hero or
+        the big blind facing no shove.
+        """
+        position = game_state.position
+        if position not in PREFLOP_ORDER:
+            return None
+        opener = next((entry for entry in game_state.action_history if isinstance(entry, (list, tuple))
+                       and len(entry) >= 2 and entry[1] not in ('fold', 'check')), None)
+        shover = None
+        if opener is not None:
+            amount = opener[2] if len(opener) == 3 and opener[2] else 0
+            if opener[0] not in PREFLOP_ORDER or not (
+                    opener[1] in ('all-in', 'shove') or amount >= game_state.effective_stack):
+                return None
+            shover = opener[0]
+        first = shover or position
+        if first == 'BB' or first == position and shover is not None \
+                or PREFLOP_ORDER.index(position) < PREFLOP_ORDER.index(first):
+            return None
+        solution = solve_push_fold(game_state.effective_stack, PREFLOP_ORDER[PREFLOP_ORDER.index(first):],
+                                   table_path=self.preflop_table_path)
+        return solution.decide(position, self._parse_spot_cards(game_state.hand), shover)
+    
+    def _solve_river_spot(self, game_state: GameState,
+                          board: List[IntCard]) -> Optional[Tuple[str, float, float]]:
+        """Solve a heads-up river between the hero's and first opponent's ranges.
+        
+        The pot is the sum of sized actions before the river, and the
+        river's own actions are followed through the betting tree, each bet
+        or raise taken as the nearest size in it. Returns None, without
+        solving, for seats outside POSTFLOP_ORDER or when that line does not
+        lead to a decision of the hero.
+        """
+        hand = self._parse_spot_cards(game_state.hand)
+        position = game_state.position
+        if position not in POSTFLOP_ORDER:
+            return None
+        opponents = game_state.opponents if isinstance(game_state.opponents, list) else []
+        opponent = opponents[0] if opponents and opponents[0] in POSTFLOP_ORDER else \
+            ('BTN' if position == 'BB' else 'BB')
+        rank = {seat: idx for idx, seat in enumerate(POSTFLOP_ORDER)}
+        hero_player = 0 if rank[position] < rank[opponent] else 1
+        
+        # Only solve once the river line is known to reach a decision of the hero
+        before, line = self._river_line(game_state.action_history)
+        pot, stack = spot_stakes(before, game_state.effective_stack)
+        tree = build_river_tree(pot, stack)
+        history = self._follow_line(tree, line, {position: hero_player, opponent: 1 - hero_player},
+                                    hero_player)
+        if history is None:
+            return None
+        
+        # Ranges cover the hero's own hand even when their preflop range would not
+        hero_range = dict(self.get_range(position, game_state.effective_stack))
+        hero_range.setdefault(hand_class(hand[0], hand[1]), 0.01)
+        ranges = [hero_range, self.get_range(opponent, game_state.effective_stack)]
+        if hero_player:
+            ranges.reverse()
+        solution = RiverSolver(board, ranges[0], ranges[1], tree).solve()
+        strategy = solution.strategy(hand, history)
+        action, frequency = max(strategy.items(), key=lambda item: item[1])
+        return action.split()[0], frequency, solution.ev(hand, hero_player, history + [action])
+    
+    @staticmethod
+    def _river_line(action_history: List) -> Tuple[List, List]:
+        """Split (player, action, amount) entries into those before the river and the river's own.
+        
+        Every earlier street closed on a call or on two checks, so the river
+        line is what follows the last call once check-check streets are
+        dropped. Folds are left out.
+        """
+        entries = [entry for entry in action_history
+                   if isinstance(entry, (list, tuple)) and len(entry) == 3 and entry[1] != 'fold']
+        start = max((idx + 1 for idx, entry in enumerate(entries) if entry[1] == 'call'), default=0)
+        while len(entries) - start >= 2 and entries[start][1] == entries[start + 1][1] == 'check':
+            start += 2
+        return entries[:start], entries[start:]
+    
+    @staticmethod
+    def _follow_line(tree, line: List, players: Dict[str, int], hero: int) -> Optional[List[str]]:
+        """Tree labels of a river line, or None unless it stays in the tree and ends on `hero`'s turn."""
+        node, history, street = 0, [], [0.0, 0.0]
+        for seat, action, amount in line:
+            player = players.get(seat)
+            if player is None or tree.player[node] != player:
+                return None
+            street[player] += amount or 0
+            if action in ('bet', 'raise', 'all-in', 'shove'):
+                # Amounts are chips added, tree sizes the player's river total
+                sized = [child for child in tree.children(node) if tree.action[child] in (BET, RAISE, ALL_IN)]
+                if not sized:
+                    return None
+                node = min(sized, key=lambda child: abs(tree.amount[child] - street[player]))
+            else:
+                node = next((child for child in tree.children(node) if tree.label(child) == action), None)
+                if node is None:
+                    return None
+            history.append(tree.label(node))
+        return history if tree.player[node] == hero else None
+    
     def get_range(self, position: str, stack_depth: int) -> Dict[str, float]:
         """Get optimal preflop range for a position and stack depth."""
         # This is a simplified version. In a real implementation,
@@ -171,6 +327,31 @@ class GtoSolver:
                 'AJs': 1.0, 'AJo': 0.9,
                 'ATs': 0.8, 'ATo': 0.7,
                 'A9s': 0.6, 'A8s': 0.5
+            },
+            'SB': {
+                'AA': 1.0, 'KK': 1.0, 'QQ': 1.0,
+                'JJ': 1.0, 'TT': 1.0, '99': 0.9,
+                '88': 0.8, '77': 0.7, '66': 0.6,
+                'AKs': 1.0, 'AKo': 1.0,
+                'AQs': 1.0, 'AQo': 1.0,
+                'AJs': 0.9, 'AJo': 0.8,
+                'ATs': 0.8, 'ATo': 0.6,
+                'KQs': 0.8, 'KQo': 0.6,
+                'KJs': 0.7, 'QJs': 0.7, 'JTs': 0.6
+            },
+            'BB': {
+                'AA': 1.0, 'KK': 1.0, 'QQ': 1.0,
+                'JJ': 1.0, 'TT': 1.0, '99': 1.0,
+                '88': 1.0, '77': 1.0, '66': 0.9,
+                '55': 0.9, '44': 0.8, '33': 0.8, '22': 0.7,
+                'AKs': 1.0, 'AKo': 1.0,
+                'AQs': 1.0, 'AQo': 1.0,
+                'AJs': 1.0, 'AJo': 1.0,
+                'ATs': 1.0, 'ATo': 0.9,
+                'A9s': 0.9, 'A8s': 0.8, 'A5s': 0.8,
+                'KQs': 1.0, 'KQo': 0.9, 'KJs': 0.9, 'KTs': 0.8,
+                'QJs': 0.9, 'QTs': 0.8, 'JTs': 0.9, 'T9s': 0.8,
+                '98s': 0.7, '87s': 0.6, '76s': 0.5
             }
         }
         
@@ -305,9 +486,16 @@ class GtoSolver:
         # Define position advantage
         position_advantage = position in ['BTN', 'CO']
         
-        # Board texture analysis (simplified)
-        flush_possible = len(set(card.suit for card in community_cards)) <= 3
-        straight_possible = self._is_straight_possible(community_cards)
+        # Board texture: the flop comes from the precomputed flop index, later
+        # streets add whether the turn and river completed anything
+        board = self._parse_spot_cards(community_cards)
+        texture = board_texture(board[:3])
+        if len(board) == 3:
+            flush_possible = not texture.rainbow
+            straight_possible = texture.straight_possible
+        else:
+            flush_possible = max(sum(1 for card in board if card.suit == suit) for suit in range(4)) >= 3
+            straight_possible = self._is_straight_possible(community_cards)
         
         # Generate advice
         explanation = ""
@@ -399,6 +587,15 @@ class GtoSolver:
                 ]
                 ev = -current_bet * 0.5
         
+        hero_range = self.get_range(position, int(stack))
+        if hero_range and len(board) == 3:
+            advantage = range_advantage(board, hero_range)
+            if advantage.equity > 0.6:
+                explanation += (f" This flop favors your {position} range: {advantage.equity:.0%} of it"
+                                " is ahead of a random hand, so you can bet it more often.")
+            elif advantage.equity < 0.5:
+                explanation += f" This flop misses much of your {position} range, so check it more often."
+        
         return {
             'actions': actions,
             'explanation': explanation,
@@ -471,6 +668,9 @@ class GtoSolver:
         if not hand or len(hand) < 2:
             return 0.0
         
+        if not community_cards and self.preflop_table is not None:
+            return self.preflop_table.hand_vs_range(hand[:2])
+        
         # Get hand strength (0-1 scale)
         strength = self._evaluate_hand_strength(hand + community_cards)
         
@@ -481,59 +681,30 @@ class GtoSolver:
         return max(0.0, min(1.0, equity))
     
     def calculate_odds(self, hand: List[Card], community_cards: List[Card]) -> dict:
-        """Calculate pot odds and outs for a hand."""
-        # Simplified version for demo purposes
-        
-        # Calculate random number of outs (0-15)
-        outs = random.randint(0, 15)
+        """Calculate outs against a random hand and the exact chance of hitting one.
         
-        # Calculate pot odds based on outs
-        # Rule of thumb: pot odds = outs * 4% (turn and river) or outs * 2% (river only)
-        if len(community_cards) <= 3:  # Preflop or flop
-            pot_odds = outs * 4
-        else:  # Turn
-            pot_odds = outs * 2
+        'pot_odds' is the percentage chance of hitting an out by the river
+        on the flop, or on the river card on the turn.
+        """
+        if not hand or len(hand) < 2:
+            return {'pot_odds': 0.0, 'outs': 0}
         
+        result = calculate_outs(hand[:2], community_cards)
         return {
-            'pot_odds': pot_odds,
-            'outs': outs
+            'pot_odds': result.by_river_probability * 100,
+            'outs': len(result.outs),
+            'clean_outs': [str(card) for card in result.clean_outs],
+            'tainted_outs': [str(card) for card in result.tainted_outs],
+            'next_card_probability': result.next_card_probability,
+            'by_river_probability': result.by_river_probability
         }
 
     def _is_straight_possible(self, community_cards: List[Card]) -> bool:
-        """Check if a straight is possible with the given community cards."""
+        """Check if some two hole cards complete a straight with the given community cards."""
         if len(community_cards) < 3:
             return False
-        
-        # Get numerical values of ranks
-        rank_values = {
-            Rank.TWO: 2,
-            Rank.THREE: 3,
-            Rank.FOUR: 4,
-            Rank.FIVE: 5,
-            Rank.SIX: 6,
-            Rank.SEVEN: 7,
-            Rank.EIGHT: 8,
-            Rank.NINE: 9,
-            Rank.TEN: 10,
-            Rank.JACK: 11,
-            Rank.QUEEN: 12,
-            Rank.KING: 13,
-            Rank.ACE: 14
-        }
-        
-        # Get unique ranks, sorted
-        ranks = sorted(set(rank_values[card.rank] for card in community_cards))
-        
-        # Check for consecutive cards or close enough for a straight draw
-        for i in range(len(ranks) - 1):
-            if ranks[i + 1] - ranks[i] <= 4:
-                return True
-                
-        # Check for A-2-3-4-5 possibility
-        if Rank.ACE in [card.rank for card in community_cards]:
-            low_straight = [2, 3, 4, 5]
-            for rank in low_straight:
-                if rank in ranks:
-                    return True
-                    
-        return False 
\ No newline at end of file
+        ranks = {card.rank for card in self._parse_spot_cards(community_cards)}
+        if 12 in ranks:
+            ranks.add(-1)  # The ace also plays low in A-2-3-4-5
+        # A straight needs three board ranks inside one five-rank window
+        return any(len(ranks & set(range(low, low + 5))) >= 3 for low in range(-1, 9))
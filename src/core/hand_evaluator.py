@@ -1,6 +1,9 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
+import numpy as np
+from .cards import IntCard, encode_card, encode_cards
+from . import fast_evaluator
 
 class Suit(Enum):
     SPADES = '♠'
@@ -61,9 +64,22 @@ class Card:
         else:
             self.rank = rank
 
+    @classmethod
+    def from_int(cls, card: int) -> 'Card':
+        """Create a card from its integer encoding."""
+        return cls(_SUIT_BY_INDEX[card & 3], _RANK_BY_INDEX[card >> 2])
+
+    def to_int(self) -> IntCard:
+        """Return the integer encoding of this card."""
+        return encode_card(self)
+
     def __str__(self) -> str:
         return f"{self.rank.value}{self.suit.value}"
 
+# Enum members in integer-encoding order (ranks 2..A, suits c, d, h, s)
+_RANK_BY_INDEX = list(Rank)
+_SUIT_BY_INDEX = [Suit.CLUBS, Suit.DIAMONDS, Suit.HEARTS, Suit.SPADES]
+
 class HandRank(Enum):
     HIGH_CARD = 1
     PAIR = 2
@@ -76,25 +92,69 @@ class HandRank(Enum):
     STRAIGHT_FLUSH = 9
     ROYAL_FLUSH = 10
 
+# Lookup evaluator categories mapped to hand ranks (royal flush is decoded
+# separately as an ace-high straight flush)
+_HAND_RANK_BY_CATEGORY = [
+    HandRank.HIGH_CARD,
+    HandRank.PAIR,
+    HandRank.TWO_PAIR,
+    HandRank.THREE_OF_A_KIND,
+    HandRank.STRAIGHT,
+    HandRank.FLUSH,
+    HandRank.FULL_HOUSE,
+    HandRank.FOUR_OF_A_KIND,
+    HandRank.STRAIGHT_FLUSH,
+]
+
 @dataclass
 class Hand:
     cards: List[Card]
     rank: HandRank
     kickers: List[Card]
+    strength: Optional[int] = None  # Comparable lookup score, if known
 
     def __str__(self) -> str:
         return f"{self.rank.name} - {', '.join(str(card) for card in self.cards)}"
 
 class HandEvaluator:
-    def __init__(self):
+    MODES = ('classic', 'lookup')
+
+    def __init__(self, mode: str = 'classic'):
+        """Initialize the evaluator.
+
+        Args:
+            mode: 'classic' tries each hand rank in turn; 'lookup' scores
+                hands with precomputed rank/flush tables and decodes the
+                score into a Hand only when one is requested.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown evaluator mode: {mode}")
+        self.mode = mode
         self.rank_values = {rank: idx for idx, rank in enumerate(Rank)}
         self.rank_values[Rank.ACE] = 14  # Ace high
 
+    def evaluate_strength(self, cards: List[Card]) -> int:
+        """Score 5-7 cards as one integer; higher always beats lower."""
+        if len(cards) < 5:
+            raise ValueError("Need at least 5 cards to evaluate a hand")
+        return fast_evaluator.evaluate_cards(encode_cards(cards))
+
+    def evaluate_batch(self, cards: np.ndarray) -> np.ndarray:
+        """Score an (N, 7) array of integer-encoded cards as N strengths.
+
+        Rows of 5 or 6 cards are accepted too. Strengths are directly
+        comparable with those from evaluate_strength.
+        """
+        return fast_evaluator.evaluate_batch(cards)
+
     def evaluate_hand(self, cards: List[Card]) -> Hand:
         """Evaluate the best possible hand from the given cards."""
         if len(cards) < 5:
             raise ValueError("Need at least 5 cards to evaluate a hand")
 
+        if self.mode == 'lookup':
+            return self.decode_strength(self.evaluate_strength(cards), cards)
+
         # Try each hand rank from highest to lowest
         evaluators = [
             self._evaluate_royal_flush,
@@ -241,8 +301,57 @@ class HandEvaluator:
             groups[card.suit].append(card)
         return groups
 
+    def decode_strength(self, strength: int, cards: List[Card]) -> Hand:
+        """Rebuild the Hand a lookup strength describes from the source cards."""
+        category = fast_evaluator.strength_category(strength)
+        groups = fast_evaluator.strength_ranks(strength)
+        coded = list(zip(encode_cards(cards), cards))
+
+        def take(rank: int, count: int, pool: List[Tuple[int, Card]]) -> List[Card]:
+            picked = [item for item in pool if item[0] >> 2 == rank][:count]
+            for item in picked:
+                pool.remove(item)
+            return [card for _, card in picked]
+
+        if category in (fast_evaluator.FLUSH, fast_evaluator.STRAIGHT_FLUSH):
+            suit_counts = [0, 0, 0, 0]
+            for code, _ in coded:
+                suit_counts[code & 3] += 1
+            flush_suit = suit_counts.index(max(suit_counts))
+            coded = [item for item in coded if item[0] & 3 == flush_suit]
+
+        if category in (fast_evaluator.STRAIGHT, fast_evaluator.STRAIGHT_FLUSH):
+            high = groups[0]
+            ranks = [fast_evaluator.ACE if rank < 0 else rank
+                     for rank in range(high, high - 5, -1)]
+            main = [card for rank in ranks for card in take(rank, 1, coded)]
+            kickers = []
+        elif category in (fast_evaluator.FLUSH, fast_evaluator.HIGH_CARD):
+            main = [card for rank in groups for card in take(rank, 1, coded)]
+            kickers = []
+        else:
+            sizes = {
+                fast_evaluator.FOUR_OF_A_KIND: [4],
+                fast_evaluator.FULL_HOUSE: [3, 2],
+                fast_evaluator.THREE_OF_A_KIND: [3],
+                fast_evaluator.TWO_PAIR: [2, 2],
+                fast_evaluator.PAIR: [2],
+            }[category]
+            main = [card for rank, size in zip(groups, sizes) for card in take(rank, size, coded)]
+            kicker_count = 5 - len(main)
+            kickers = [card for rank in groups[len(sizes):len(sizes) + kicker_count]
+                       for card in take(rank, 1, coded)]
+
+        rank = _HAND_RANK_BY_CATEGORY[category]
+        if category == fast_evaluator.STRAIGHT_FLUSH and groups[0] == fast_evaluator.ACE:
+            rank = HandRank.ROYAL_FLUSH
+        return Hand(main, rank, kickers, strength)
+
     def compare_hands(self, hand1: Hand, hand2: Hand) -> int:
         """Compare two hands and return 1 if hand1 wins, -1 if hand2 wins, 0 if tie."""
+        if hand1.strength is not None and hand2.strength is not None:
+            return (hand1.strength > hand2.strength) - (hand1.strength < hand2.strength)
+
         if hand1.rank.value != hand2.rank.value:
             return 1 if hand1.rank.value > hand2.rank.value else -1
 
@@ -0,0 +1,126 @@
+from typing import Optional, Sequence, Tuple
+from functools import lru_cache
+import numpy as np
+
+MAX_EXACT_PLAYERS = 10  # Largest field solved by the exact subset recursion
+SAMPLES = 20000  # Simulated finishing orders per stack configuration for larger fields
+_CHUNK = 1 << 21  # Subset reaches or simulated finishing orders per vectorized pass
+
+
+@lru_cache(maxsize=MAX_EXACT_PLAYERS + 1)
+def _subsets(players: int) -> Tuple[np.ndarray, Tuple[np.ndarray, ...]]:
+    """Membership matrix of every player subset and the subsets grouped by size."""
+    masks = np.arange(1 << players)
+    members = ((masks[None, :] >> np.arange(players)[:, None]) & 1).astype(np.float64)
+    sizes = members.sum(axis=0).astype(np.int64)
+    return members, tuple(masks[sizes == size] for size in range(players + 1))
+
+
+def _prepare(stacks, payouts) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """Validate stacks as a (configurations, players) array and pad payouts to the field."""
+    stacks = np.asarray(stacks, dtype=np.float64)
+    single = stacks.ndim == 1
+    stacks = np.atleast_2d(stacks)
+    payouts = np.asarray(payouts, dtype=np.float64).ravel()
+    if stacks.ndim != 2 or stacks.shape[1] < 1:
+        raise ValueError("Stacks must be a sequence of chip counts or a 2-D array of them")
+    if (stacks < 0).any() or not np.isfinite(stacks).all():
+        raise ValueError("Stacks must be finite and non-negative")
+    if not len(payouts) or (payouts < 0).any():
+        raise ValueError("Payouts must be a non-empty sequence of non-negative prizes")
+    players = stacks.shape[1]
+    payouts = np.pad(payouts[:players], (0, max(0, players - len(payouts))))
+    return stacks, payouts, single
+
+
+def _exact(stacks: np.ndarray, payouts: np.ndarray) -> np.ndarray:
+    """Malmuth-Harville equity by a recursion over the set of players already placed.
+
+    `reach[S]` is the chance the players in S take the top |S| places in
+    some order. The next place goes to each remaining player in
+    proportion to their chips, so every place costs one vectorized step
+    per player across all configurations. Busted players split the
+    places left once only they remain.
+    """
+    count, players = stacks.shape
+    rows = max(1, _CHUNK // (1 << players))
+    if count > rows:
+        return np.vstack([_exact(stacks[start:start + rows], payouts) for start in range(0, count, rows)])
+    members, layers = _subsets(players)
+    placed = stacks @ members  # Chips held by each subset
+    remaining = stacks.sum(axis=1, keepdims=True) - placed
+    reach = np.zeros((count, 1 << players))
+    reach[:, 0] = 1.0
+    equity = np.zeros((count, players))
+    for place in range(int(np.flatnonzero(payouts).max(initial=-1)) + 1):
+        layer = layers[place]
+        for player in range(players):
+            bit = 1 << player
+            subsets = layer[(layer & bit) == 0]
+            if not len(subsets):
+                continue
+            left = remaining[:, subsets]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                share = np.where(left > 0, stacks[:, player:player + 1] / left, 1.0 / (players - place))
+            step = reach[:, subsets] * share
+            reach[:, subsets | bit] += step
+            equity[:, player] += payouts[place] * step.sum(axis=1)
+    return equity
+
+
+def _simulated(stacks: np.ndarray, payouts: np.ndarray, samples: int,
+               rng: np.random.Generator) -> np.ndarray:
+    """Malmuth-Harville equity estimated from sampled finishing orders.
+
+    Sorting exponential draws divided by stack sizes yields finishing
+    orders with exactly the Malmuth-Harville probabilities, so each
+    sample costs one sort.
+    """
+    count, players = stacks.shape
+    equity = np.zeros((count, players))
+    rows = max(1, _CHUNK // (samples * players))
+    for start in range(0, count, rows):
+        chunk = stacks[start:start + rows, None, :]
+        draws = rng.standard_exponential((len(chunk), samples, players))
+        with np.errstate(divide='ignore'):
+            keys = np.where(chunk > 0, draws / chunk, np.inf)
+        # Busted players finish last, in random order among themselves
+        order = np.lexsort((draws, keys), axis=-1)
+        prizes = np.zeros((len(chunk), samples, players))
+        np.put_along_axis(prizes, order, np.broadcast_to(payouts, prizes.shape), axis=-1)
+        equity[start:start + rows] = prizes.mean(axis=1)
+    return equity
+
+
+def icm_equities(stacks, payouts: Sequence[float], samples: int = SAMPLES,
+                 seed: Optional[int] = None) -> np.ndarray:
+    """Prize equity of every player for a batch of stack configurations.
+
+    Args:
+        stacks: (configurations, players) chip counts, or one configuration.
+        payouts: Prize for each finishing place, first place first. Places
+            beyond the list pay nothing and extra prizes are ignored.
+        samples: Simulated finishing orders per configuration for fields
+            larger than MAX_EXACT_PLAYERS.
+        seed: Seed for the simulation.
+
+    Returns:
+        Equities with the shape of `stacks`, in the units of `payouts`.
+    """
+    stacks, payouts, single = _prepare(stacks, payouts)
+    if stacks.shape[1] <= MAX_EXACT_PLAYERS:
+        equity = _exact(stacks, payouts)
+    else:
+        if samples < 1:
+            raise ValueError("Samples must be positive")
+        equity = _simulated(stacks, payouts, samples, np.random.default_rng(seed))
+    return equity[0] if single else equity
+
+
+def icm_equity(stacks: Sequence[float], payouts: Sequence[float], samples: int = SAMPLES,
+               seed: Optional[int] = None) -> np.ndarray:
+    """Prize equity of each player for one set of chip stacks."""
+    stacks = np.asarray(stacks, dtype=np.float64)
+    if stacks.ndim != 1:
+        raise ValueError("Stacks must be a sequence of chip counts")
+    return icm_equities(stacks, payouts, samples, seed)
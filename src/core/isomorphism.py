@@ -0,0 +1,86 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from itertools import permutations
+import hashlib
+import json
+from .cards import IntCard, encode_card
+from .ranges import is_random_range, is_suit_symmetric
+
+# Relabelling suits never changes a hand's value, so two spots that differ
+# only by a suit permutation share one canonical form: the lexicographically
+# smallest relabelling of their card groups (each group sorted high to low).
+SUIT_PERMUTATIONS: List[Tuple[int, ...]] = list(permutations(range(4)))
+IDENTITY = SUIT_PERMUTATIONS[0]
+
+# _PERMUTED[i][card] is `card` with its suit relabelled by SUIT_PERMUTATIONS[i]
+_PERMUTED = [[(card & ~3) | perm[card & 3] for card in range(52)]
+             for perm in SUIT_PERMUTATIONS]
+
+CardGroups = Tuple[Tuple[int, ...], ...]
+
+
+def permute_cards(cards: Iterable[int], suit_map: Sequence[int]) -> List[IntCard]:
+    """Relabel each card's suit through `suit_map` (old suit -> new suit)."""
+    return [IntCard((card & ~3) | suit_map[card & 3]) for card in cards]
+
+
+def invert_permutation(suit_map: Sequence[int]) -> Tuple[int, ...]:
+    """Return the suit map that undoes `suit_map`."""
+    inverse = [0] * 4
+    for old, new in enumerate(suit_map):
+        inverse[new] = old
+    return tuple(inverse)
+
+
+def canonical_form(groups: Sequence[Sequence[int]]) -> Tuple[CardGroups, Tuple[int, ...]]:
+    """Map card groups to their suit-isomorphic canonical form.
+
+    Cards within a group are unordered (e.g. hole cards or the flop) while
+    the order of the groups themselves is kept.
+
+    Returns:
+        Tuple of (canonical groups, suit map) where the suit map sends the
+        original suits to the canonical ones.
+    """
+    coded = [[encode_card(card) for card in group] for group in groups]
+    best: Optional[CardGroups] = None
+    best_idx = 0
+    for idx, table in enumerate(_PERMUTED):
+        candidate = tuple(tuple(sorted((table[card] for card in group), reverse=True))
+                          for group in coded)
+        if best is None or candidate < best:
+            best, best_idx = candidate, idx
+    return best, SUIT_PERMUTATIONS[best_idx]
+
+
+def format_groups(groups: CardGroups) -> str:
+    """Format card groups as a compact key like 'AsKs|Qs7s2h'."""
+    return "|".join("".join(str(IntCard(card)) for card in group) for group in groups)
+
+
+def canonical_key(groups: Sequence[Sequence[int]]) -> str:
+    """Compact string key shared by every suit permutation of the groups."""
+    return format_groups(canonical_form(groups)[0])
+
+
+def range_digest(opponent_range: Optional[Dict[str, float]]) -> str:
+    """Short stable hash of a weighted range ('random' when no range is given)."""
+    if is_random_range(opponent_range):
+        return "random"
+    items = sorted((notation, round(float(weight), 6)) for notation, weight in opponent_range.items())
+    return hashlib.sha1(json.dumps(items).encode()).hexdigest()[:16]
+
+
+def spot_key(groups: Sequence[Sequence[int]],
+             opponent_range: Optional[Dict[str, float]]) -> Tuple[str, Tuple[int, ...]]:
+    """Cache key for a spot against a range, plus the suit map it used.
+
+    Explicit suited combos in the range break suit symmetry, so those
+    spots keep their original suits.
+    """
+    if not is_suit_symmetric(opponent_range):
+        coded = tuple(tuple(sorted((encode_card(card) for card in group), reverse=True))
+                      for group in groups)
+        canonical, suit_map = coded, IDENTITY
+    else:
+        canonical, suit_map = canonical_form(groups)
+    return f"{format_groups(canonical)}:{range_digest(opponent_range)}", suit_map
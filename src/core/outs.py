@@ -0,0 +1,122 @@
+from typing import Dict, List, Optional, Sequence
+from dataclasses import dataclass, field
+import numpy as np
+from .cards import IntCard, encode_cards
+from .ranges import expand_range
+from . import fast_evaluator
+
+
+@dataclass
+class OutsResult:
+    """Next-card outs for a hand against a range.
+
+    An out is an unseen card that lifts the hand's category further above
+    the one the board makes on its own, so the hole cards play in the
+    improvement, and raises its showdown share against the range. A clean out leaves no
+    range combo ahead; a tainted out still loses to part of the range.
+    """
+    outs: List[IntCard] = field(default_factory=list)
+    clean_outs: List[IntCard] = field(default_factory=list)
+    tainted_outs: List[IntCard] = field(default_factory=list)
+    unseen: int = 0
+    current_share: float = 0.0
+    next_card_probability: float = 0.0  # Chance the next card is an out
+    by_river_probability: float = 0.0   # Chance an out arrives by the river
+    card_shares: Dict[str, float] = field(default_factory=dict)
+
+
+def calculate_outs(hand: Sequence, board: Sequence,
+                   opponent_range: Optional[Dict[str, float]] = None) -> OutsResult:
+    """Find outs for two hole cards on a flop or turn against a weighted range.
+
+    Any other board size has no next street to draw to, so an empty result
+    is returned.
+    """
+    hand_cards, board_cards = encode_cards(hand), encode_cards(board)
+    combos, weights = expand_range(opponent_range, hand_cards + board_cards)
+    return score_outs(hand_cards, board_cards, combos, weights)
+
+
+def score_outs(hand_cards: List[int], board_cards: List[int],
+               combos: np.ndarray, weights: np.ndarray) -> OutsResult:
+    """Classify every unseen card against live range combos in one batched evaluation.
+
+    Args:
+        hand_cards: Two encoded hole cards.
+        board_cards: Three or four encoded board cards.
+        combos: (M, 2) live opponent combos, none sharing a known card.
+        weights: M combo weights.
+    """
+    if len(board_cards) not in (3, 4) or not len(combos):
+        return OutsResult()
+    known = list(hand_cards) + list(board_cards)
+    unseen = np.array([card for card in range(52) if card not in known], dtype=np.int8)
+    num_unseen, num_combos = len(unseen), len(combos)
+    board = np.array(board_cards, dtype=np.int8)
+
+    # Current street: hero and every combo on the board as it stands
+    current = fast_evaluator.evaluate_cards(known)
+    villain_now = fast_evaluator.BoardEvaluator(board).evaluate(combos)
+    current_share = float(_share(current > villain_now, current == villain_now, weights))
+
+    # Next street: one board per unseen card, scored for hero and every combo
+    # that does not hold that card (a combo holding it cannot be the opponent's)
+    combo_masks = (np.int64(1) << combos.astype(np.int64)).sum(axis=1)
+    live = (combo_masks[None, :] & (np.int64(1) << unseen.astype(np.int64))[:, None]) == 0
+    card_idx, combo_idx = np.nonzero(live)
+    boards = np.hstack([np.broadcast_to(board, (num_unseen, len(board))), unseen[:, None]])
+    evaluator = fast_evaluator.BoardEvaluator(boards)
+    hero = evaluator.evaluate(np.broadcast_to(np.array(hand_cards, dtype=np.int8), (num_unseen, 2)),
+                              np.arange(num_unseen))[:, None]
+    villain = np.zeros((num_unseen, num_combos), dtype=np.int32)
+    villain[card_idx, combo_idx] = evaluator.evaluate(combos[combo_idx], card_idx)
+    live_weights = live * weights[None, :]
+    shares = _share(hero > villain, hero == villain, live_weights)
+    behind = (live_weights * (hero < villain)).sum(axis=1) > 0
+
+    # A card that only pairs the board lifts every hand's category alike
+    lead_now = (current >> fast_evaluator.CATEGORY_SHIFT) - _board_categories(board[None, :])[0]
+    improved = (hero[:, 0] >> fast_evaluator.CATEGORY_SHIFT) - _board_categories(boards) > lead_now
+    is_out = improved & (shares > current_share)
+    outs = [IntCard(int(card)) for card in unseen[is_out]]
+    clean = [IntCard(int(card)) for card in unseen[is_out & ~behind]]
+    tainted = [IntCard(int(card)) for card in unseen[is_out & behind]]
+
+    hits = len(outs)
+    next_card = hits / num_unseen
+    if len(board_cards) == 3:
+        # Exact chance that at least one of the two remaining cards is an out
+        misses = (num_unseen - hits) * (num_unseen - hits - 1)
+        by_river = 1.0 - misses / (num_unseen * (num_unseen - 1))
+    else:
+        by_river = next_card
+
+    return OutsResult(
+        outs=outs,
+        clean_outs=clean,
+        tainted_outs=tainted,
+        unseen=num_unseen,
+        current_share=current_share,
+        next_card_probability=next_card,
+        by_river_probability=by_river,
+        card_shares={str(IntCard(int(card))): float(share) for card, share in zip(unseen, shares)}
+    )
+
+
+def _board_categories(boards: np.ndarray) -> np.ndarray:
+    """Hand category each (N, k) row of board cards makes without hole cards."""
+    if boards.shape[1] >= 5:
+        return fast_evaluator.evaluate_batch(boards) >> fast_evaluator.CATEGORY_SHIFT
+    # Fewer than five cards can only pair up
+    counts = np.zeros((len(boards), 13), dtype=np.int64)
+    np.add.at(counts, (np.arange(len(boards))[:, None], boards.astype(np.int64) >> 2), 1)
+    most, pairs = counts.max(axis=1), (counts == 2).sum(axis=1)
+    return np.select([most == 4, most == 3, pairs == 2, pairs == 1],
+                     [fast_evaluator.FOUR_OF_A_KIND, fast_evaluator.THREE_OF_A_KIND,
+                      fast_evaluator.TWO_PAIR, fast_evaluator.PAIR], fast_evaluator.HIGH_CARD)
+
+
+def _share(wins: np.ndarray, ties: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Weighted share of combos beaten (ties count half) along the last axis."""
+    beaten = (weights * (wins + ties / 2)).sum(axis=-1)
+    return beaten / np.maximum(weights.sum(axis=-1), 1e-12)
@@ -1,6 +1,7 @@
 from typing import List, Tuple, Optional
 from enum import Enum
 import random
+from .cards import IntCard, RANKS, SUITS, encode_card
 
 class Suit(Enum):
     HEARTS = 'h'
@@ -23,6 +24,9 @@ class Rank(Enum):
     KING = 'K'
     ACE = 'A'
 
+_RANK_BY_INDEX = [Rank(rank) for rank in RANKS]
+_SUIT_BY_INDEX = [Suit(suit) for suit in SUITS]
+
 class Card:
     def __init__(self, rank: Rank, suit: Suit):
         self.rank = rank
@@ -35,6 +39,15 @@ class Card:
         suit = Suit(card_str[1].lower())
         return cls(rank, suit)
     
+    @classmethod
+    def from_int(cls, card: int) -> 'Card':
+        """Create a card from its integer encoding."""
+        return cls(_RANK_BY_INDEX[card >> 2], _SUIT_BY_INDEX[card & 3])
+    
+    def to_int(self) -> IntCard:
+        """Return the integer encoding of this card."""
+        return encode_card(self)
+    
     def __str__(self) -> str:
         return f"{self.rank.value}{self.suit.value}"
     
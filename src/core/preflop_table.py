@@ -0,0 +1,251 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from functools import lru_cache
+from itertools import combinations
+import argparse
+import os
+import struct
+import numpy as np
+from .cards import RANKS, encode_cards, parse_cards
+from .ranges import ALL_COMBOS, COMBO_INDEX, COMBO_MASKS, expand_range, hand_class
+from .isomorphism import SUIT_PERMUTATIONS
+from . import fast_evaluator
+
+# Not shipped with the repo: build it once with `python -m src.core.preflop_table`
+# (add --samples 20000 for a sampled table in minutes). Until then preflop
+# equity is simulated, and GtoSolver's push/fold and preflop-table answers fall
+# back to their defaults.
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                  'data', 'preflop_equity.bin')
+
+# The 169 hand classes in grid order: row and column run A..2, pairs on the
+# diagonal, suited hands above it and offsuit hands below it.
+HAND_CLASSES: List[str] = [
+    RANKS[high] * 2 if high == low else
+    RANKS[max(high, low)] + RANKS[min(high, low)] + ('s' if high > low else 'o')
+    for high in range(12, -1, -1) for low in range(12, -1, -1)
+]
+CLASS_INDEX: Dict[str, int] = {name: idx for idx, name in enumerate(HAND_CLASSES)}
+
+# COMBO_CLASS[i] is the hand class index of ALL_COMBOS[i]
+COMBO_CLASS = np.array([CLASS_INDEX[hand_class(int(high), int(low))] for high, low in ALL_COMBOS],
+                       dtype=np.int16)
+
+# File layout: header, then the 1326x1326 combo matrix as uint16 equity
+# scaled by EQUITY_SCALE, then the 169x169 class matrix as float32.
+# Entry [i, j] is the all-in equity of combo (class) i against j with ties
+# split; combo pairs that share a card hold 0.
+_HEADER = struct.Struct('<4sHHI')
+_MAGIC = b'PFEQ'
+_VERSION = 1
+EQUITY_SCALE = 65535
+NUM_COMBOS = len(ALL_COMBOS)
+NUM_CLASSES = len(HAND_CLASSES)
+
+# Rows (matchups x samples) scored per vectorized pass when sampling
+_BUILD_CHUNK = 1 << 17
+
+
+def _hole_cards(hand) -> List[int]:
+    """Encode two hole cards given as a string ('AhKs') or a card sequence."""
+    cards = parse_cards(hand) if isinstance(hand, str) else encode_cards(hand)
+    if len(cards) != 2 or cards[0] == cards[1]:
+        raise ValueError("A poker hand must contain exactly 2 cards")
+    return cards
+
+
+class PreflopEquityTable:
+    """Memory-mapped heads-up preflop all-in equity between combos and classes."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            magic, version, exact, samples = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a preflop equity table: {path}")
+        self.path = path
+        self.exact = bool(exact)
+        self.samples = samples
+        self.combos = np.memmap(path, dtype=np.uint16, mode='r', offset=_HEADER.size,
+                                shape=(NUM_COMBOS, NUM_COMBOS))
+        self.classes = np.memmap(path, dtype=np.float32, mode='r',
+                                 offset=_HEADER.size + self.combos.nbytes,
+                                 shape=(NUM_CLASSES, NUM_CLASSES))
+
+    @property
+    def std_error(self) -> float:
+        """Worst-case standard error of one combo matchup (0 for an exact table)."""
+        return 0.0 if self.exact else 0.5 / np.sqrt(self.samples)
+
+    def combo_vs_combo(self, hand: Sequence, other: Sequence) -> float:
+        """Equity of one two-card hand against another."""
+        first, second = _hole_cards(hand), _hole_cards(other)
+        if set(first) & set(second):
+            raise ValueError("Hands share a card")
+        return float(self.combos[COMBO_INDEX[first[0], first[1]],
+                                 COMBO_INDEX[second[0], second[1]]]) / EQUITY_SCALE
+
+    def class_vs_class(self, hand: str, other: str) -> float:
+        """Equity of one hand class ('AKs') against another ('QQ')."""
+        return float(self.classes[CLASS_INDEX[hand], CLASS_INDEX[other]])
+
+    def hand_vs_range(self, hand: Sequence,
+                      opponent_range: Optional[Dict[str, float]] = None) -> float:
+        """Equity of a two-card hand against a weighted range.
+
+        The hand's row of the combo matrix is dotted with the range's
+        weights after removing combos that share a card with the hand.
+        """
+        cards = _hole_cards(hand)
+        combos, weights = expand_range(opponent_range, cards)
+        if not weights.sum():
+            raise ValueError("Opponent range has no combos left after card removal")
+        row = self.combos[COMBO_INDEX[cards[0], cards[1]]]
+        return float(row[COMBO_INDEX[combos[:, 0], combos[:, 1]]] @ weights
+                     / (weights.sum() * EQUITY_SCALE))
+
+    def class_vs_range(self, hand: str,
+                       opponent_range: Optional[Dict[str, float]] = None) -> float:
+        """Equity of every combo of a hand class against a weighted range."""
+        combos, weights = expand_range(opponent_range)
+        range_weights = np.zeros(NUM_COMBOS)
+        range_weights[COMBO_INDEX[combos[:, 0], combos[:, 1]]] = weights
+        rows = np.flatnonzero(COMBO_CLASS == CLASS_INDEX[hand])
+        live = (COMBO_MASKS[rows, None] & COMBO_MASKS[None, :]) == 0
+        live_weights = live * range_weights
+        total = live_weights.sum()
+        if not total:
+            raise ValueError("Opponent range has no combos left after card removal")
+        return float((self.combos[rows] * live_weights).sum() / (total * EQUITY_SCALE))
+
+
+@lru_cache(maxsize=4)
+def load_preflop_table(path: str = DEFAULT_TABLE_PATH) -> Optional[PreflopEquityTable]:
+    """Open the preflop equity table at `path`, or return None if it was never built."""
+    if not os.path.exists(path):
+        return None
+    return PreflopEquityTable(path)
+
+
+def canonical_matchups() -> Tuple[np.ndarray, np.ndarray]:
+    """Group every unordered pair of disjoint combos by suit isomorphism.
+
+    Returns:
+        Tuple of (pairs, groups): an (N, 2) array of combo indices i < j and
+        for each pair the index of its suit-isomorphism class.
+    """
+    first, second = np.triu_indices(NUM_COMBOS, k=1)
+    disjoint = (COMBO_MASKS[first] & COMBO_MASKS[second]) == 0
+    pairs = np.stack([first[disjoint], second[disjoint]], axis=1)
+    cards = ALL_COMBOS[pairs].reshape(len(pairs), 4).astype(np.int64)
+
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        permuted = (cards & ~3) | np.asarray(perm)[cards & 3]
+        # Each hand is unordered, so sort its two cards before packing
+        hero = np.sort(permuted[:, :2], axis=1)
+        villain = np.sort(permuted[:, 2:], axis=1)
+        code = ((hero[:, 1] * 52 + hero[:, 0]) * 52 + villain[:, 1]) * 52 + villain[:, 0]
+        best = code if best is None else np.minimum(best, code)
+    _, groups = np.unique(best, return_inverse=True)
+    return pairs, groups
+
+
+def _score_pair(boards: np.ndarray, cards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Hero and villain strengths for (N, 4) hole-card rows on N boards, sharing each board."""
+    evaluator = fast_evaluator.BoardEvaluator(boards)
+    board_idx = np.arange(len(boards))
+    return evaluator.evaluate(cards[:, :2], board_idx), evaluator.evaluate(cards[:, 2:], board_idx)
+
+
+def _exact_equities(matchups: np.ndarray,
+                    progress: Optional[Callable[[int, int], None]]) -> np.ndarray:
+    """Enumerate all C(48, 5) boards for each (4,) row of hero and villain cards."""
+    board_positions = np.array(list(combinations(range(48), 5)), dtype=np.int64)
+    equities = np.empty(len(matchups))
+    for idx, cards in enumerate(matchups):
+        deck = np.setdiff1d(np.arange(52), cards)
+        boards = deck[board_positions]
+        hero, villain = _score_pair(boards, np.broadcast_to(cards, (len(boards), 4)))
+        equities[idx] = (np.count_nonzero(hero > villain)
+                         + np.count_nonzero(hero == villain) / 2) / len(boards)
+        if progress is not None:
+            progress(idx + 1, len(matchups))
+    return equities
+
+
+def _sampled_equities(matchups: np.ndarray, samples: int, rng: np.random.Generator,
+                      progress: Optional[Callable[[int, int], None]]) -> np.ndarray:
+    """Estimate each matchup from `samples` random boards, many matchups per pass."""
+    per_chunk = max(1, _BUILD_CHUNK // samples)
+    equities = np.empty(len(matchups))
+    for start in range(0, len(matchups), per_chunk):
+        chunk = np.repeat(matchups[start:start + per_chunk], samples, axis=0)
+        # Random sort keys over the deck with the four hole cards pushed last
+        keys = rng.random((len(chunk), 52))
+        keys[np.arange(len(chunk))[:, None], chunk] = 2.0
+        boards = np.argpartition(keys, 4, axis=1)[:, :5]
+        hero, villain = _score_pair(boards, chunk)
+        score = (hero > villain) + (hero == villain) / 2
+        equities[start:start + per_chunk] = score.reshape(-1, samples).mean(axis=1)
+        if progress is not None:
+            progress(min(start + per_chunk, len(matchups)), len(matchups))
+    return equities
+
+
+def build_preflop_table(path: str = DEFAULT_TABLE_PATH, samples: Optional[int] = None,
+                        seed: Optional[int] = None,
+                        progress: Optional[Callable[[int, int], None]] = None) -> PreflopEquityTable:
+    """Compute the combo and class equity matrices and write them to `path`.
+
+    Only one matchup per suit-isomorphism class is evaluated and the rest
+    are filled by symmetry. With `samples` unset every board is enumerated
+    (exact, but hours of CPU); otherwise each matchup is estimated from
+    that many random boards.
+    """
+    pairs, groups = canonical_matchups()
+    representatives = np.zeros(groups.max() + 1, dtype=np.int64)
+    representatives[groups] = np.arange(len(pairs))
+    matchups = ALL_COMBOS[pairs[representatives]].reshape(-1, 4).astype(np.int64)
+
+    if samples is None:
+        equities = _exact_equities(matchups, progress)
+    else:
+        if samples < 1:
+            raise ValueError("samples must be positive")
+        equities = _sampled_equities(matchups, samples, np.random.default_rng(seed), progress)
+
+    combo_matrix = np.zeros((NUM_COMBOS, NUM_COMBOS))
+    combo_matrix[pairs[:, 0], pairs[:, 1]] = equities[groups]
+    combo_matrix[pairs[:, 1], pairs[:, 0]] = 1.0 - equities[groups]
+
+    # Class equity averages every non-conflicting combo matchup equally
+    live = (COMBO_MASKS[:, None] & COMBO_MASKS[None, :]) == 0
+    onehot = np.eye(NUM_CLASSES)[COMBO_CLASS]
+    class_totals = onehot.T @ combo_matrix @ onehot
+    class_counts = onehot.T @ live.astype(np.float64) @ onehot
+    class_matrix = np.divide(class_totals, class_counts, out=np.zeros_like(class_totals),
+                             where=class_counts > 0)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, int(samples is None), samples or 0))
+        f.write(np.round(combo_matrix * EQUITY_SCALE).astype('<u2').tobytes())
+        f.write(class_matrix.astype('<f4').tobytes())
+    load_preflop_table.cache_clear()
+    return PreflopEquityTable(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the preflop equity table")
+    parser.add_argument('--output', default=DEFAULT_TABLE_PATH)
+    parser.add_argument('--samples', type=int, default=None,
+                        help="Random boards per matchup (default: enumerate every board)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    def report(done: int, total: int) -> None:
+        print(f"\r{done}/{total} matchups", end='', flush=True)
+
+    build_preflop_table(args.output, args.samples, args.seed, report)
+    print()
@@ -0,0 +1,201 @@
+from typing import Dict, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+from .cards import encode_cards, parse_cards
+from .ranges import COMBO_MASKS, hand_class
+from .preflop_table import (COMBO_CLASS, DEFAULT_TABLE_PATH, HAND_CLASSES, NUM_CLASSES,
+                            CLASS_INDEX, load_preflop_table)
+
+PREFLOP_ORDER = ('UTG', 'MP', 'CO', 'BTN', 'SB', 'BB')
+BLINDS = {'SB': 0.5, 'BB': 1.0}
+MAX_PUSH_FOLD_STACK = 20  # Deepest effective stack, in big blinds, where push/fold applies
+ITERATIONS = 2000
+
+
+@dataclass
+class PushFoldSolution:
+    """Shove and call frequencies for each of the 169 hand classes.
+
+    `shove[position]` is the frequency a class shoves when everyone before
+    `position` folded; `call[(caller, shover)]` is how often a class calls
+    that shove when everyone between them folded. EVs are in big blinds
+    relative to the stack before posting.
+    """
+    stack: float
+    positions: Tuple[str, ...]
+    ante: float
+    shove: Dict[str, np.ndarray]
+    call: Dict[Tuple[str, str], np.ndarray]
+    shove_ev: Dict[str, np.ndarray]
+    call_ev: Dict[Tuple[str, str], np.ndarray]
+    exploitability: float  # Largest gain in big blinds per hand dealt, when reached, from deviating
+
+    def shove_range(self, position: str) -> Dict[str, float]:
+        return _as_range(self.shove[position])
+
+    def call_range(self, caller: str, shover: str) -> Dict[str, float]:
+        return _as_range(self.call[(caller, shover)])
+
+    def shove_frequency(self, position: str, hand) -> float:
+        return float(self.shove[position][_class_index(hand)])
+
+    def call_frequency(self, caller: str, shover: str, hand) -> float:
+        return float(self.call[(caller, shover)][_class_index(hand)])
+
+    def posted(self, position: str) -> float:
+        """Blind plus ante a seat has in the pot before acting."""
+        return min(self.ante + BLINDS.get(position, 0.0), self.stack)
+
+    def decide(self, position: str, hand, shover: Optional[str] = None) -> Tuple[str, float, float]:
+        """Most frequent action for a hand, with its frequency and EV in big blinds.
+
+        With no `shover` the seat is first in and picks between all-in and
+        fold; otherwise it picks between call and fold against that shove.
+        """
+        idx = _class_index(hand)
+        if shover is None:
+            frequency, ev, action = self.shove[position][idx], self.shove_ev[position][idx], 'all-in'
+        else:
+            key = (position, shover)
+            frequency, ev, action = self.call[key][idx], self.call_ev[key][idx], 'call'
+        if frequency >= 0.5:
+            return action, float(frequency), float(ev)
+        return 'fold', float(1 - frequency), -self.posted(position)
+
+    def range_share(self, frequencies: np.ndarray) -> float:
+        """Share of all 1,326 combos a class frequency vector plays."""
+        return float(frequencies @ _CLASS_COMBOS / _CLASS_COMBOS.sum())
+
+
+_CLASS_COMBOS = np.bincount(COMBO_CLASS, minlength=NUM_CLASSES).astype(np.float64)
+
+
+def _as_range(frequencies: np.ndarray) -> Dict[str, float]:
+    return {HAND_CLASSES[idx]: round(float(frequencies[idx]), 3)
+            for idx in np.flatnonzero(frequencies >= 0.0005)}
+
+
+def _class_index(hand) -> int:
+    """Class index of a hand class name ('AKs') or two hole cards."""
+    if isinstance(hand, str) and hand in CLASS_INDEX:
+        return CLASS_INDEX[hand]
+    cards = parse_cards(hand) if isinstance(hand, str) else encode_cards(hand)
+    if len(cards) != 2 or cards[0] == cards[1]:
+        raise ValueError("A poker hand must contain exactly 2 cards")
+    return CLASS_INDEX[hand_class(cards[0], cards[1])]
+
+
+@lru_cache(maxsize=1)
+def _class_pairs() -> np.ndarray:
+    """(169, 169) count of non-conflicting deals of class i to one player and class j to another."""
+    onehot = np.zeros((len(COMBO_CLASS), NUM_CLASSES))
+    onehot[np.arange(len(COMBO_CLASS)), COMBO_CLASS] = 1.0
+    live = ((COMBO_MASKS[:, None] & COMBO_MASKS[None, :]) == 0).astype(np.float64)
+    return onehot.T @ live @ onehot
+
+
+def _solve_shover(equity: np.ndarray, stack: float, dead: float, post: float,
+                  caller_posts: Sequence[float], iterations: int):
+    """Fictitious play between one first-in shover and the players left behind them.
+
+    Every later player either calls or folds in turn, and the first call
+    ends the action, so each all-in is heads-up and priced by the class
+    equity table. Card removal is exact between the shover and each
+    caller and ignored between callers.
+    """
+    pairs = _class_pairs()
+    chance = pairs / pairs.sum(axis=1, keepdims=True)  # Caller class j given shover class i
+    pots = [2 * stack + dead - post - caller_post for caller_post in caller_posts]
+    # All-in results for the shover (rows), weighted by the chance of each
+    # caller class, and for each caller (columns), weighted by how often the
+    # pair is dealt so that the shover's class sizes carry over
+    shover_payoffs = [chance * (equity * pot - stack) for pot in pots]
+    caller_payoffs = [pairs * ((1 - equity) * pot - stack) for pot in pots]
+
+    def shove_values(calls):
+        # Shover class i: reach each caller only if everyone before them folded
+        values = np.zeros(NUM_CLASSES)
+        reach = np.ones(NUM_CLASSES)
+        for call, payoffs in zip(calls, shover_payoffs):
+            values += reach * (payoffs @ call)
+            reach = reach * (1 - chance @ call)
+        return values + reach * (dead - post)
+
+    def call_values(shove):
+        # Caller class j against the shover's range, weighted by card removal
+        totals = shove @ pairs
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return [np.where(totals > 0, (shove @ payoffs) / totals, -stack)
+                    for payoffs in caller_payoffs]
+
+    shove = np.ones(NUM_CLASSES)
+    calls = [np.ones(NUM_CLASSES) for _ in caller_posts]
+    for iteration in range(1, iterations + 1):
+        best_shove = (shove_values(calls) > -post).astype(np.float64)
+        best_calls = [(values > -caller_post).astype(np.float64)
+                      for values, caller_post in zip(call_values(shove), caller_posts)]
+        step = 1.0 / (iteration + 1)
+        shove += step * (best_shove - shove)
+        for call, best in zip(calls, best_calls):
+            call += step * (best - call)
+
+    # How much each side gains by best-responding to the averaged strategies
+    shove_ev, call_evs = shove_values(calls), call_values(shove)
+    base = _CLASS_COMBOS / _CLASS_COMBOS.sum()
+    gain = float(base @ (np.maximum(shove_ev, -post) - (shove * shove_ev + (1 - shove) * -post)))
+    for call, values, caller_post in zip(calls, call_evs, caller_posts):
+        gain = max(gain, float(base @ (np.maximum(values, -caller_post)
+                                       - (call * values + (1 - call) * -caller_post))))
+    return shove, calls, shove_ev, call_evs, gain
+
+
+def _check_positions(positions: Sequence[str]) -> Tuple[str, ...]:
+    positions = tuple(positions)
+    if len(positions) < 2 or positions[-2:] != ('SB', 'BB') or len(set(positions)) != len(positions) \
+            or not set(positions) <= set(PREFLOP_ORDER) \
+            or list(positions) != sorted(positions, key=PREFLOP_ORDER.index):
+        raise ValueError(f"Positions must be distinct seats from {PREFLOP_ORDER} in order, "
+                         "ending with SB and BB")
+    return positions
+
+
+def solve_push_fold(stack: float, positions: Sequence[str] = ('SB', 'BB'), ante: float = 0.0,
+                    table_path: str = DEFAULT_TABLE_PATH,
+                    iterations: int = ITERATIONS) -> PushFoldSolution:
+    """Push/fold equilibrium for equal effective stacks, cached per spot.
+
+    Args:
+        stack: Effective stack in big blinds, blinds and antes included.
+        positions: Seats still to act, in order, ending with SB and BB.
+        ante: Ante per player in big blinds.
+        table_path: Preflop equity table built by preflop_table.
+    """
+    return _solve_push_fold(float(stack), _check_positions(positions), float(ante),
+                            table_path, iterations)
+
+
+@lru_cache(maxsize=256)
+def _solve_push_fold(stack: float, positions: Tuple[str, ...], ante: float,
+                     table_path: str, iterations: int) -> PushFoldSolution:
+    if stack <= 0 or ante < 0:
+        raise ValueError("Stack must be positive and ante non-negative")
+    table = load_preflop_table(table_path)
+    if table is None:
+        raise ValueError(f"No preflop equity table at {table_path}; build it with preflop_table")
+    equity = np.asarray(table.classes, dtype=np.float64)
+    posts = {seat: min(ante + BLINDS.get(seat, 0.0), stack) for seat in positions}
+    dead = sum(posts.values())
+
+    shove, call, shove_ev, call_ev, gain = {}, {}, {}, {}, 0.0
+    for idx, shover in enumerate(positions[:-1]):
+        callers = positions[idx + 1:]
+        result = _solve_shover(equity, stack, dead, posts[shover],
+                               [posts[seat] for seat in callers], iterations)
+        shove[shover], calls, shove_ev[shover], call_evs, shover_gain = result
+        gain = max(gain, shover_gain)
+        for seat, frequencies, values in zip(callers, calls, call_evs):
+            call[(seat, shover)] = frequencies
+            call_ev[(seat, shover)] = values
+    return PushFoldSolution(stack=stack, positions=positions, ante=ante, shove=shove, call=call,
+                            shove_ev=shove_ev, call_ev=call_ev, exploitability=gain)
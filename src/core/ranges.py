@@ -0,0 +1,184 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+import re
+import numpy as np
+from .cards import RANKS, IntCard, encode_card, parse_cards
+
+# Every two-card combo as (higher card id, lower card id), 1326 rows
+ALL_COMBOS = np.array([(high, low) for low, high in combinations(range(52), 2)], dtype=np.int8)
+
+# COMBO_INDEX[a, b] is the row of combo {a, b} in ALL_COMBOS
+COMBO_INDEX = np.full((52, 52), -1, dtype=np.int16)
+COMBO_INDEX[ALL_COMBOS[:, 0], ALL_COMBOS[:, 1]] = np.arange(len(ALL_COMBOS))
+COMBO_INDEX[ALL_COMBOS[:, 1], ALL_COMBOS[:, 0]] = np.arange(len(ALL_COMBOS))
+
+# Bit mask of each combo's two cards, for card-removal checks
+COMBO_MASKS = (np.int64(1) << ALL_COMBOS[:, 0].astype(np.int64)) | \
+              (np.int64(1) << ALL_COMBOS[:, 1].astype(np.int64))
+
+RANDOM_RANGE = 'random'  # Any two cards at equal weight; None means the same
+
+_HAND_CLASS_PATTERN = re.compile(r'^([2-9TJQKA])([2-9TJQKA])([so]?)$')
+
+
+def _match_hand_class(notation: str) -> Optional[re.Match]:
+    """Match hand-class notation case-insensitively ('aks' -> 'AKs')."""
+    return _HAND_CLASS_PATTERN.match(notation.strip().upper().replace('S', 's').replace('O', 'o'))
+
+
+def expand_hand_class(notation: str) -> List[Tuple[IntCard, IntCard]]:
+    """Expand hand-class notation into concrete combos.
+
+    Supports pairs ('99'), suited ('AKs'), offsuit ('AKo') and unsuffixed
+    ('AK', all 16 combos) classes as well as explicit combos ('AhKs').
+    """
+    match = _match_hand_class(notation)
+    if not match:
+        cards = parse_cards(notation)
+        if len(cards) != 2 or cards[0] == cards[1]:
+            raise ValueError(f"Invalid hand class: {notation!r}")
+        return [(max(cards), min(cards))]
+
+    first, second, kind = match.groups()
+    high, low = sorted((RANKS.index(first), RANKS.index(second)), reverse=True)
+    if high == low:
+        if kind:
+            raise ValueError(f"Pairs cannot be suited or offsuit: {notation!r}")
+        return [(IntCard(high * 4 + s2), IntCard(high * 4 + s1))
+                for s1, s2 in combinations(range(4), 2)]
+
+    combos = []
+    for high_suit in range(4):
+        for low_suit in range(4):
+            suited = high_suit == low_suit
+            if (kind == 's' and not suited) or (kind == 'o' and suited):
+                continue
+            combos.append((IntCard(high * 4 + high_suit), IntCard(low * 4 + low_suit)))
+    return combos
+
+
+def is_random_range(opponent_range) -> bool:
+    """True for the any-two-cards range, None or RANDOM_RANGE.
+
+    Anything else must be a non-empty dict of hand notation to weight, so
+    an empty range is an error rather than a silent any-two-cards range.
+    """
+    if opponent_range is None or opponent_range == RANDOM_RANGE:
+        return True
+    if isinstance(opponent_range, dict) and opponent_range:
+        return False
+    raise ValueError(f"A range must be a non-empty dict of hands to weights, None or "
+                     f"'{RANDOM_RANGE}', got {opponent_range!r}")
+
+
+def is_suit_symmetric(opponent_range: Optional[Dict[str, float]]) -> bool:
+    """True when a range uses only hand-class notation (no explicit combos)."""
+    if is_random_range(opponent_range):
+        return True
+    return all(_match_hand_class(notation) for notation in opponent_range)
+
+
+def hand_class(card1: int, card2: int) -> str:
+    """Return the hand-class notation ('AKs', 'QJo', '77') of two cards."""
+    high, low = max(card1, card2), min(card1, card2)
+    if high >> 2 == low >> 2:
+        return RANKS[high >> 2] * 2
+    suffix = 's' if high & 3 == low & 3 else 'o'
+    return RANKS[high >> 2] + RANKS[low >> 2] + suffix
+
+
+def expand_range(opponent_range: Optional[Dict[str, float]],
+                 dead_cards: Iterable = ()) -> Tuple[np.ndarray, np.ndarray]:
+    """Expand a weighted range into live combos and their weights.
+
+    None or RANDOM_RANGE means every combo at weight 1; an empty or
+    non-dict range raises ValueError. Combos that share a card with
+    `dead_cards` are removed and combos listed under several classes keep
+    their highest weight.
+
+    Returns:
+        Tuple of (combos, weights): an (M, 2) int8 array of card ids and a
+        float64 array of M weights.
+    """
+    dead_mask = 0
+    for card in dead_cards:
+        dead_mask |= 1 << encode_card(card)
+
+    weights = np.zeros(len(ALL_COMBOS))
+    if is_random_range(opponent_range):
+        weights[:] = 1.0
+    else:
+        for notation, weight in opponent_range.items():
+            for card1, card2 in expand_hand_class(notation):
+                idx = COMBO_INDEX[card1, card2]
+                weights[idx] = max(weights[idx], float(weight))
+
+    live = (weights > 0) & ((COMBO_MASKS & np.int64(dead_mask)) == 0)
+    return ALL_COMBOS[live], weights[live]
+
+
+class AliasTable:
+    """Vose alias table for O(1) weighted sampling of indices."""
+
+    def __init__(self, weights: np.ndarray):
+        weights = np.asarray(weights, dtype=np.float64)
+        if not len(weights) or weights.sum() <= 0:
+            raise ValueError("Alias table needs at least one positive weight")
+        count = len(weights)
+        scaled = weights * count / weights.sum()
+        self.probability = np.ones(count)
+        self.alias = np.arange(count)
+
+        small = [idx for idx in range(count) if scaled[idx] < 1.0]
+        large = [idx for idx in range(count) if scaled[idx] >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.probability[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Draw `size` indices with probability proportional to their weights."""
+        columns = rng.integers(len(self.probability), size=size)
+        accept = rng.random(size) < self.probability[columns]
+        return np.where(accept, columns, self.alias[columns])
+
+
+@dataclass
+class WeightedRange:
+    """A range expanded to live combos with a prebuilt alias sampler."""
+    combos: np.ndarray
+    weights: np.ndarray
+    sampler: AliasTable
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Draw `size` combos by weight as a (size, 2) array of card ids."""
+        return self.combos[self.sampler.sample(rng, size)]
+
+
+def weighted_range(opponent_range: Optional[Dict[str, float]],
+                   dead_cards: Iterable = ()) -> WeightedRange:
+    """Expand a range against dead cards, reusing tables built for the same inputs."""
+    if is_random_range(opponent_range):
+        range_key = ()
+    else:
+        range_key = tuple(sorted((notation, float(weight))
+                                 for notation, weight in opponent_range.items()))
+    dead_mask = 0
+    for card in dead_cards:
+        dead_mask |= 1 << encode_card(card)
+    return _build_weighted_range(range_key, dead_mask)
+
+
+@lru_cache(maxsize=512)
+def _build_weighted_range(range_key: Tuple[Tuple[str, float], ...],
+                          dead_mask: int) -> WeightedRange:
+    """Build (and memoize) the weighted range for a hashable range key."""
+    dead_cards = [card for card in range(52) if dead_mask >> card & 1]
+    combos, weights = expand_range(dict(range_key) or None, dead_cards)
+    if not len(combos):
+        raise ValueError("Opponent range has no combos left after card removal")
+    return WeightedRange(combos, weights, AliasTable(weights))
@@ -0,0 +1,348 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+import numpy as np
+from .cards import encode_cards, parse_cards
+from .game_tree import CHANCE, RIVER, BetSizing, GameTree, build_tree
+from .ranges import ALL_COMBOS, COMBO_INDEX, expand_range
+from . import fast_evaluator
+
+ALGORITHMS = ('dcfr', 'cfr+')
+DEFAULT_BET_SIZES = (0.5, 1.0)  # Opening bets as fractions of the pot
+DEFAULT_RAISE_SIZES = (1.0,)    # Raises as fractions of the pot after calling
+CHECK_EVERY = 25                # Iterations between exploitability checks
+
+# Discounted CFR weights from Brown & Sandholm: positive regrets decay by
+# t^a / (t^a + 1), negative regrets by t^b / (t^b + 1) and the average
+# strategy is weighted by (t / (t + 1))^g
+DCFR_ALPHA, DCFR_BETA, DCFR_GAMMA = 1.5, 0.0, 2.0
+
+
+def build_river_tree(pot: float, stack: float, bet_sizes: Sequence[float] = DEFAULT_BET_SIZES,
+                     raise_sizes: Sequence[float] = DEFAULT_RAISE_SIZES,
+                     max_raises: int = 2) -> GameTree:
+    """River betting tree with an all-in option at every bet and raise, see game_tree.build_tree."""
+    sizing = BetSizing(bet_sizes=tuple(bet_sizes), raise_sizes=tuple(raise_sizes), max_raises=max_raises)
+    return build_tree(pot, stack, sizing, street=RIVER)
+
+
+@dataclass
+class RiverSolution:
+    """Average strategies of a solved river for both players' ranges."""
+    tree: GameTree
+    combos: Tuple[np.ndarray, np.ndarray]    # (M0, 2) and (M1, 2) card ids
+    weights: Tuple[np.ndarray, np.ndarray]
+    strategies: Dict[int, np.ndarray]       # Decision node -> (actions, combos) frequencies
+    values: Tuple[np.ndarray, np.ndarray]    # (nodes, combos) EV at every node, in chips
+    exploitability: float                   # Average best-response gain, as a share of the pot
+    iterations: int
+
+    def node(self, history: Sequence[str] = ()) -> int:
+        """Decision node reached by a sequence of action labels from the root."""
+        node = self._walk(history)
+        if self.tree.player[node] < 0:
+            raise ValueError("History ends at a terminal node")
+        return node
+
+    def actions(self, history: Sequence[str] = ()) -> List[str]:
+        node = self.node(history)
+        return self.tree.actions(node)
+
+    def strategy(self, hand, history: Sequence[str] = ()) -> Dict[str, float]:
+        """Action frequencies of one hand at the node reached by `history`."""
+        node = self.node(history)
+        column = self._column(self.tree.player[node], hand)
+        return {action: float(frequency) for action, frequency in
+                zip(self.actions(history), self.strategies[node][:, column])}
+
+    def ev(self, hand, player: int, history: Sequence[str] = ()) -> float:
+        """Equilibrium EV in chips of one of `player`'s hands after `history`.
+
+        With an empty history this is the EV at the start of the river; a
+        history ending in one of the player's actions gives that action's EV.
+        """
+        return float(self.values[player][self._walk(history), self._column(player, hand)])
+
+    def _walk(self, history: Sequence[str]) -> int:
+        node = 0
+        for action in history:
+            node = self.tree.child(node, action)
+        return node
+
+    def _column(self, player: int, hand) -> int:
+        cards = parse_cards(hand) if isinstance(hand, str) else encode_cards(hand)
+        if len(cards) != 2:
+            raise ValueError("A poker hand must contain exactly 2 cards")
+        matches = np.flatnonzero(COMBO_INDEX[self.combos[player][:, 0], self.combos[player][:, 1]]
+                                 == COMBO_INDEX[cards[0], cards[1]])
+        if not len(matches):
+            raise ValueError(f"{hand} is not in player {player}'s range on this board")
+        return int(matches[0])
+
+
+class RiverSolver:
+    """Counterfactual regret minimization over whole ranges on a fixed river.
+
+    Regrets and strategies are (actions, combos) arrays, one row per tree
+    edge, so an iteration is a top-down pass of reach vectors and a
+    bottom-up pass of counterfactual values, one tree level at a time.
+    Players alternate by level, so each level is acted on by one player.
+    Terminal values come from strength-sorted prefix sums (see
+    _Showdown), so no (M0, M1) matrix is ever built.
+    """
+
+    def __init__(self, board, oop_range: Optional[Dict[str, float]],
+                 ip_range: Optional[Dict[str, float]], tree: GameTree):
+        board_cards = parse_cards(board) if isinstance(board, str) else encode_cards(board)
+        if len(board_cards) != 5:
+            raise ValueError("A river board must contain exactly 5 cards")
+        if len(set(board_cards)) != 5:
+            raise ValueError("Board cards must be distinct")
+        if tree.street != RIVER or (tree.kind == CHANCE).any():
+            raise ValueError("The river solver needs a river-only game tree")
+        self.tree = tree
+        self.combos, self.weights = zip(*(expand_range(player_range, board_cards)
+                                          for player_range in (oop_range, ip_range)))
+        if not all(len(combos) for combos in self.combos):
+            raise ValueError("Range has no combos left after card removal")
+
+        evaluator = fast_evaluator.BoardEvaluator(board_cards)
+        strengths = [evaluator.evaluate(combos) for combos in self.combos]
+        self.showdowns = [_Showdown(self.combos[player], strengths[player],
+                                    self.combos[1 - player], strengths[1 - player])
+                          for player in (0, 1)]
+        # Opponent weight each combo does not block
+        self.blockers = [self.showdowns[player].live(self.weights[1 - player][:, None])[:, 0]
+                         for player in (0, 1)]
+        self.pairs = float(self.weights[0] @ self.blockers[0])
+        if self.pairs <= 0:
+            raise ValueError("Ranges have no compatible combos on this board")
+        self._index_tree()
+
+    def _index_tree(self) -> None:
+        """Flat index arrays for the level-by-level passes."""
+        tree = self.tree
+        parent = tree.parent.astype(np.int64)
+        depth = np.zeros(len(tree), dtype=np.int64)
+        for node in range(1, len(tree)):
+            depth[node] = depth[parent[node]] + 1
+        self.terminals = np.flatnonzero(tree.player < 0)
+        contributions = tree.invested[self.terminals]
+        self.folders = tree.folder[self.terminals]
+        self.called = contributions[:, 0]  # Both players' river chips at a showdown
+        self.folded = contributions.T      # Each player's river chips, read at folds
+        # Edges are named by their child node; the tree is breadth first, so
+        # each player's edges are already grouped by parent and are the rows
+        # of that player's regret and strategy arrays
+        self.edges = []
+        self.levels = []
+        for player in (0, 1):
+            self.edges.append(np.flatnonzero(tree.player[parent[1:]] == player) + 1)
+        for level in range(1, depth.max() + 1):
+            player = (level - 1) % 2
+            rows = np.flatnonzero(depth[self.edges[player]] == level)
+            children = self.edges[player][rows]
+            starts = np.flatnonzero(np.r_[True, parent[children][1:] != parent[children][:-1]])
+            self.levels.append((player, rows, children, parent[children], starts))
+        for player in (0, 1):
+            starts = np.flatnonzero(np.r_[True, np.diff(parent[self.edges[player]]) != 0])
+            self.edges[player] = (self.edges[player], parent[self.edges[player]], starts)
+
+    def solve(self, iterations: int = 500, target_exploitability: float = 0.005,
+              algorithm: str = 'dcfr') -> RiverSolution:
+        """Iterate until the average strategy is within `target_exploitability` of the pot.
+
+        Exploitability is checked every CHECK_EVERY iterations and after the
+        last one.
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Algorithm must be one of {ALGORITHMS}, got {algorithm!r}")
+        if iterations < 1:
+            raise ValueError("Iterations must be positive")
+        regrets = [np.zeros((len(self.edges[player][0]), len(self.weights[player])))
+                   for player in (0, 1)]
+        totals = [np.zeros_like(regret) for regret in regrets]
+
+        iteration = 0
+        while iteration < iterations:
+            iteration += 1
+            if algorithm == 'dcfr':
+                positive = iteration ** DCFR_ALPHA / (iteration ** DCFR_ALPHA + 1)
+                negative = iteration ** DCFR_BETA / (iteration ** DCFR_BETA + 1)
+                average = (iteration / (iteration + 1)) ** DCFR_GAMMA
+            # Alternating updates: player 1 already responds to player 0's new regrets
+            strategies = [self._normalize(np.maximum(regrets[seat], 0), seat) for seat in (0, 1)]
+            for player in (0, 1):
+                if player:
+                    strategies[0] = self._normalize(np.maximum(regrets[0], 0), 0)
+                reach = self._reach(strategies)
+                values = self._values(player, reach[1 - player], strategies[player])
+                children, parents, _ = self.edges[player]
+                gain = values[children] - values[parents]
+                contribution = reach[player][parents] * strategies[player]
+                if algorithm == 'dcfr':
+                    regrets[player] *= np.where(regrets[player] > 0, positive, negative)
+                    regrets[player] += gain
+                    totals[player] = totals[player] * average + contribution
+                else:
+                    np.maximum(regrets[player] + gain, 0, out=regrets[player])
+                    totals[player] += iteration * contribution
+            if iteration % CHECK_EVERY == 0 or iteration == iterations:
+                average_strategies = [self._normalize(totals[player], player) for player in (0, 1)]
+                exploitability = self.exploitability(average_strategies)
+                if exploitability <= target_exploitability:
+                    break
+
+        reach = self._reach(average_strategies)
+        values = tuple(self._node_values(player, reach[1 - player], average_strategies[player])
+                       for player in (0, 1))
+        by_node = {}
+        for player in (0, 1):
+            children, parents, starts = self.edges[player]
+            for start, stop in zip(starts, np.r_[starts[1:], len(children)]):
+                by_node[int(parents[start])] = average_strategies[player][start:stop]
+        return RiverSolution(tree=self.tree, combos=self.combos, weights=self.weights,
+                             strategies=by_node, values=values,
+                             exploitability=exploitability, iterations=iteration)
+
+    def exploitability(self, strategies: List[np.ndarray]) -> float:
+        """Mean best-response gain against per-player edge strategies, as a share of the pot."""
+        reach = self._reach(strategies)
+        best = [float(self.weights[player] @ self._values(player, reach[1 - player])[0]) / self.pairs
+                for player in (0, 1)]
+        return max(0.0, (best[0] + best[1] - self.tree.pot) / 2 / self.tree.pot)
+
+    def _node_values(self, player: int, opponent_reach: np.ndarray,
+                     strategy: np.ndarray) -> np.ndarray:
+        """(nodes, combos) EV of `player`'s combos, zero where no live opponent combo arrives."""
+        # Counterfactual values are weighted by the opponent's reach; dividing
+        # by the live part of it leaves chips per hand
+        live = self.showdowns[player].live(opponent_reach.T).T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(live > 0, self._values(player, opponent_reach, strategy) / live, 0.0)
+
+    def _normalize(self, weights: np.ndarray, player: int) -> np.ndarray:
+        """Scale each node's rows to sum to one, uniform where a node's rows are all zero."""
+        _, parents, starts = self.edges[player]
+        counts = np.diff(np.r_[starts, len(parents)])
+        totals = np.repeat(np.add.reduceat(weights, starts, axis=0), counts, axis=0)
+        uniform = np.repeat(1.0 / counts, counts)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(totals > 0, weights / totals, uniform)
+
+    def _reach(self, strategies: List[np.ndarray]) -> List[np.ndarray]:
+        """(nodes, combos) reach of each player at every node."""
+        reach = [np.zeros((len(self.tree), len(weights))) for weights in self.weights]
+        for player in (0, 1):
+            reach[player][0] = self.weights[player]
+        for acting, rows, children, parents, _ in self.levels:
+            reach[acting][children] = reach[acting][parents] * strategies[acting][rows]
+            reach[1 - acting][children] = reach[1 - acting][parents]
+        return reach
+
+    def _values(self, player: int, opponent_reach: np.ndarray,
+                strategy: Optional[np.ndarray] = None) -> np.ndarray:
+        """(nodes, combos) counterfactual values of `player` at every node.
+
+        Without a `strategy` the player best-responds, taking the best
+        action for each combo at their own nodes.
+        """
+        tree = self.tree
+        values = np.zeros((len(tree), len(self.weights[player])))
+        showdown, weights = self.showdowns[player], opponent_reach[self.terminals].T
+        live = showdown.live(weights)
+        folds = self.folders >= 0
+        values[self.terminals[folds]] = (np.where(self.folders[folds] == player, -self.folded[player][folds],
+                                                  tree.pot + self.folded[1 - player][folds])
+                                         * live[:, folds]).T
+        ahead = showdown.ahead(weights[:, ~folds], live[:, ~folds])
+        values[self.terminals[~folds]] = (self.called[~folds] * ahead +
+                                          tree.pot / 2 * (live[:, ~folds] + ahead)).T
+
+        for acting, rows, children, parents, starts in reversed(self.levels):
+            heads = parents[starts]
+            if acting != player:
+                values[heads] = np.add.reduceat(values[children], starts, axis=0)
+            elif strategy is None:
+                values[heads] = np.maximum.reduceat(values[children], starts, axis=0)
+            else:
+                values[heads] = np.add.reduceat(values[children] * strategy[rows], starts, axis=0)
+        return values
+
+
+class _Showdown:
+    """Opponent weight each combo beats, ties and could face, for many weight columns.
+
+    Sorting opponent combos by strength turns "weight below my strength"
+    into a prefix sum. Card removal is the same prefix sum over the
+    opponent combos holding each of my two cards, subtracted; only the
+    identical combo holds both, and it ties, so it is added back once.
+    Every lookup position is fixed by the board, so each call is a few
+    cumulative sums and gathers.
+    """
+
+    def __init__(self, combos: np.ndarray, strengths: np.ndarray,
+                 opponents: np.ndarray, opponent_strengths: np.ndarray):
+        self.order = np.argsort(opponent_strengths, kind='stable')
+        ordered = opponent_strengths[self.order]
+        self.below = np.searchsorted(ordered, strengths, 'left')
+        self.through = np.searchsorted(ordered, strengths, 'right')
+
+        # Opponent combos listed once under each of their cards, keyed by
+        # card then strength
+        span = np.int64(1) << 24
+        cards = np.concatenate([opponents[:, 0], opponents[:, 1]]).astype(np.int64)
+        keys = cards * span + np.tile(opponent_strengths, 2)
+        entry_order = np.argsort(keys, kind='stable')
+        self.entries = np.tile(np.arange(len(opponents)), 2)[entry_order]
+        keys = keys[entry_order]
+        held = combos.astype(np.int64).T * span  # (2, M) key base of my two cards
+        self.card_start = np.searchsorted(keys, held, 'left')
+        self.card_end = np.searchsorted(keys, held + span, 'left')
+        self.card_below = np.searchsorted(keys, held + strengths, 'left')
+        self.card_through = np.searchsorted(keys, held + strengths, 'right')
+
+        combo_ids = COMBO_INDEX[opponents[:, 0], opponents[:, 1]]
+        position = np.full(len(ALL_COMBOS), -1)
+        position[combo_ids] = np.arange(len(opponents))
+        self.same = position[COMBO_INDEX[combos[:, 0], combos[:, 1]]]
+
+    def live(self, weights: np.ndarray) -> np.ndarray:
+        """For (M_opponent, T) weights, the (M, T) opponent weight each combo does not block."""
+        by_card = self._by_card(weights)
+        return weights.sum(axis=0) - (by_card[self.card_end] - by_card[self.card_start]).sum(axis=0) + \
+            self._same(weights)
+
+    def ahead(self, weights: np.ndarray, live: np.ndarray) -> np.ndarray:
+        """Live opponent weight each combo beats minus the weight that beats it."""
+        zeros = np.zeros((1, weights.shape[1]))
+        total = np.concatenate([zeros, np.cumsum(weights[self.order], axis=0)])
+        by_card = self._by_card(weights)
+        blocked = by_card[self.card_below] + by_card[self.card_through] - 2 * by_card[self.card_start]
+        # Beaten plus not-beaten-by (through) leaves beaten minus ahead after removing live
+        return total[self.below] + total[self.through] - blocked.sum(axis=0) + \
+            self._same(weights) - live
+
+    def _by_card(self, weights: np.ndarray) -> np.ndarray:
+        return np.concatenate([np.zeros((1, weights.shape[1])), np.cumsum(weights[self.entries], axis=0)])
+
+    def _same(self, weights: np.ndarray) -> np.ndarray:
+        return np.where(self.same[:, None] >= 0, weights[self.same], 0.0)
+
+
+def solve_river(board, oop_range: Optional[Dict[str, float]], ip_range: Optional[Dict[str, float]],
+                pot: float, stack: float, bet_sizes: Sequence[float] = DEFAULT_BET_SIZES,
+                raise_sizes: Sequence[float] = DEFAULT_RAISE_SIZES, max_raises: int = 2,
+                iterations: int = 500, target_exploitability: float = 0.005,
+                algorithm: str = 'dcfr') -> RiverSolution:
+    """Solve a river spot between an out-of-position and an in-position range.
+
+    Args:
+        board: Five board cards as a string or card list.
+        oop_range, ip_range: Weighted hand-class ranges; None means any two cards.
+        pot: Chips in the middle before the river.
+        stack: Effective stack behind at the start of the river.
+        bet_sizes, raise_sizes, max_raises: Bet-size menu, see game_tree.BetSizing.
+    """
+    tree = build_river_tree(pot, stack, bet_sizes, raise_sizes, max_raises)
+    return RiverSolver(board, oop_range, ip_range, tree).solve(
+        iterations, target_exploitability, algorithm)
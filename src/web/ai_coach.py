@@ -3,6 +3,11 @@ import json
 import os
 import random
 
+try:
+    from core.flops import board_texture
+except ImportError:
+    board_texture = None
+
 class PokerCoach:
     def __init__(self):
         # Load poker knowledge base
@@ -258,9 +263,15 @@ class PokerCoach:
         """Generate flop advice"""
         # Analyze board texture
         board_cards = board.split()
-        is_paired = len(board_cards) >= 2 and any(board_cards[i][0] == board_cards[j][0] for i in range(len(board_cards)) for j in range(i+1, len(board_cards)))
-        is_connected = len(board_cards) >= 2 and self._is_connected(board_cards)
-        is_suited = len(board_cards) >= 2 and self._is_suited(board_cards)
+        texture = self._flop_texture(board_cards)
+        if texture is not None:
+            is_paired = texture.paired
+            is_connected = texture.straight_possible
+            is_suited = not texture.rainbow
+        else:
+            is_paired = len(board_cards) >= 2 and any(board_cards[i][0] == board_cards[j][0] for i in range(len(board_cards)) for j in range(i+1, len(board_cards)))
+            is_connected = len(board_cards) >= 2 and self._is_connected(board_cards)
+            is_suited = len(board_cards) >= 2 and self._is_suited(board_cards)
         
         board_texture = "dry"
         if is_paired:
@@ -318,6 +329,15 @@ class PokerCoach:
         
         return advice
     
+    def _flop_texture(self, cards: List[str]):
+        """Look up a three-card board in the flop index, if it is available and parses"""
+        if board_texture is None or len(cards) != 3:
+            return None
+        try:
+            return board_texture(cards)
+        except ValueError:
+            return None
+    
     def _is_connected(self, cards: List[str]) -> bool:
         """Check if cards are connected (potential straight draws)"""
         ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash, Response, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
@@ -10,6 +10,7 @@ import random
 # Import local modules - using absolute imports
 try:
     from core.equity_calculator import EquityCalculator
+    from core import fast_evaluator
     from core.gto_solver import GtoSolver, GameState, Position, Action
     from knowledge.poker_knowledge import PokerKnowledge
     from personalization.user_profile import UserProfile
@@ -18,6 +19,7 @@ try:
 except ImportError:
     # Mock objects for when modules can't be imported
     EquityCalculator = None
+    fast_evaluator = None
     GtoSolver, GameState, Position, Action = None, None, None, None
     PokerKnowledge = None
     UserProfile = None
@@ -191,6 +193,9 @@ if hasattr(UserProfile, 'set_profiles_file'):
 
 # Initialize EquityCalculator
 equity_calculator = EquityCalculator(os.path.join(data_dir, 'equity_cache'))
+if fast_evaluator is not None:
+    # Build the evaluator tables up front so the first streamed estimate is quick
+    fast_evaluator.get_array_tables()
 
 # Initialize other components
 gto_solver = GtoSolver(os.path.join(data_dir, 'gto_solutions.json'))
@@ -818,25 +823,94 @@ def analyze():
     # Get optimal action
     action, frequency, ev = gto_solver.get_action(game_state)
     
-    # Calculate equity
-    equity_result = equity_calculator.calculate_equity(
-        hand=hand,
-        opponent_range=gto_solver.get_range(position, stack_size),
-        board=board
-    )
-    
     # Generate explanation (without NLP)
     explanation = f"Based on GTO analysis, you should {action} in this spot."
     
-    return jsonify({
+    result = {
         'action': action,
         'frequency': frequency,
         'ev': ev,
-        'equity': equity_result.equity,
-        'outs': equity_result.outs,
-        'hand_type': equity_result.hand_type,
         'explanation': explanation
-    })
+    }
+    
+    # Clients streaming equity from /api/equity/stream skip the blocking calculation
+    if not data.get('stream_equity'):
+        equity_result = equity_calculator.calculate_equity(
+            hand=hand,
+            opponent_range=gto_solver.get_range(position, stack_size) or None,
+            board=board
+        )
+        result.update({
+            'equity': equity_result.equity,
+            'outs': [str(card) for card in equity_result.outs],
+            'hand_type': equity_result.hand_type
+        })
+    
+    return jsonify(result)
+
+@app.route('/api/equity/stream')
+@login_required
+def stream_equity():
+    """Stream equity estimates as Server-Sent Events until they converge.
+    
+    Each 'estimate' event carries the equity, its standard error and the
+    samples done so far; a final 'result' event adds outs and hand type.
+    Errors found while streaming arrive as a 'failure' event, since
+    EventSource reserves 'error' for connection errors.
+    Sampling defaults to Sobol-indexed combos, which reaches the target
+    standard error in fewer samples on flop and turn spots.
+    """
+    hand = request.args.get('hand', '')
+    board = request.args.get('board', '')
+    position = request.args.get('position', '')
+    sampling = request.args.get('sampling', 'sobol')
+    try:
+        stack_size = int(request.args.get('stack_size', 100))
+        target_stderr = float(request.args.get('target_stderr', 0.002))
+        max_time_ms = float(request.args.get('max_time_ms', 5000))
+    except ValueError:
+        return jsonify({'error': 'Invalid numeric parameter'}), 400
+    if stack_size <= 0 or not target_stderr > 0 or not max_time_ms > 0 \
+            or sampling not in getattr(equity_calculator, 'SAMPLINGS', [sampling]):
+        return jsonify({'error': 'Invalid request data'}), 400
+    # Positions without a range are played against any two cards
+    opponent_range = gto_solver.get_range(position, stack_size) or None
+    
+    def event(name, payload):
+        return f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+    
+    def generate():
+        try:
+            final = None
+            for estimate in equity_calculator.stream_equity(hand, opponent_range, board,
+                                                            target_stderr=target_stderr,
+                                                            max_time_ms=max_time_ms,
+                                                            sampling=sampling):
+                final = estimate
+                yield event('estimate', {
+                    'equity': estimate.equity,
+                    'std_error': estimate.std_error,
+                    'samples': estimate.samples,
+                    'variance': estimate.variance,
+                    'exact': estimate.exact
+                })
+            if final is None:
+                yield event('failure', {'error': 'No equity estimate was produced'})
+                return
+            yield event('result', {
+                'equity': final.equity,
+                'std_error': final.std_error,
+                'samples': final.samples,
+                'variance': final.variance,
+                'exact': final.exact,
+                'outs': [str(card) for card in final.outs],
+                'hand_type': final.hand_type
+            })
+        except ValueError as e:
+            yield event('failure', {'error': str(e)})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/learn')
 def learn():
@@ -1306,36 +1380,46 @@ def handle_practice_action():
             'handInProgress': True
         }
 
+        # Cards already out can't be dealt again
+        dealt = new_game_state['playerCards'] + new_game_state['communityCards']
+        
         # If it's preflop and all players have acted, deal flop
         if new_game_state['phase'] == 'preflop' and len(bot_actions) == 2:
             new_game_state['phase'] = 'flop'
-            new_game_state['communityCards'] = deal_cards(3)
+            new_game_state['communityCards'] = deal_cards(3, exclude=dealt)
         # If it's flop and all players have acted, deal turn
         elif new_game_state['phase'] == 'flop' and len(bot_actions) == 2:
             new_game_state['phase'] = 'turn'
-            new_game_state['communityCards'].append(deal_cards(1)[0])
+            new_game_state['communityCards'].append(deal_cards(1, exclude=dealt)[0])
         # If it's turn and all players have acted, deal river
         elif new_game_state['phase'] == 'turn' and len(bot_actions) == 2:
             new_game_state['phase'] = 'river'
-            new_game_state['communityCards'].append(deal_cards(1)[0])
+            new_game_state['communityCards'].append(deal_cards(1, exclude=dealt)[0])
         # If it's river and all players have acted, evaluate hands
         elif new_game_state['phase'] == 'river' and len(bot_actions) == 2:
             # Evaluate hands and determine winner
             player_full_hand = player_hand + [string_to_card(c) for c in new_game_state['communityCards']]
             player_hand_value = hand_evaluator.evaluate_hand(player_full_hand)
             
-            # Simulate bot hands (simplified for demo)
-            bot1_hand = deal_cards(2)
+            # Deal both bot hands from the cards left in this hand's deck
+            bot_cards = deal_cards(4, exclude=dealt)
+            bot1_hand, bot2_hand = bot_cards[:2], bot_cards[2:]
             bot1_full_hand = [string_to_card(c) for c in bot1_hand] + [string_to_card(c) for c in new_game_state['communityCards']]
             bot1_hand_value = hand_evaluator.evaluate_hand(bot1_full_hand)
             
-            bot2_hand = deal_cards(2)
             bot2_full_hand = [string_to_card(c) for c in bot2_hand] + [string_to_card(c) for c in new_game_state['communityCards']]
             bot2_hand_value = hand_evaluator.evaluate_hand(bot2_full_hand)
             
-            # Determine winner
-            is_winner = player_hand_value.rank.value > max(bot1_hand_value.rank.value, bot2_hand_value.rank.value)
-            profit = new_game_state['pot'] if is_winner else -amount
+            # Determine winners by comparing lookup strengths; tied hands split the pot
+            strengths = [player_hand_value.strength, bot1_hand_value.strength, bot2_hand_value.strength]
+            winners = [strength == max(strengths) for strength in strengths]
+            is_winner = winners[0]
+            is_split = is_winner and sum(winners) > 1
+            profit = new_game_state['pot'] / sum(winners) if is_winner else -amount
+            
+            # How the player's equity against a random hand moved street by street
+            trajectory = equity_calculator.calculate_equity_trajectory(
+                player_hand, None, [string_to_card(c) for c in new_game_state['communityCards']])
             
             # Show bot cards in the final result
             new_game_state['bot1Cards'] = bot1_hand
@@ -1348,10 +1432,12 @@ def handle_practice_action():
                 'handComplete': True,
                 'result': {
                     'isWinner': is_winner,
+                    'isSplit': is_split,
                     'profit': profit,
                     'playerHandValue': str(player_hand_value.rank.name),
                     'bot1HandValue': str(bot1_hand_value.rank.name),
                     'bot2HandValue': str(bot2_hand_value.rank.name),
+                    'equityTrajectory': dict(zip(trajectory.streets, trajectory.equities)),
                     'gtoAnalysis': f"Your play was {'optimal' if is_winner else 'suboptimal'}. {advice['explanation']}"
                 }
             })
@@ -1368,12 +1454,14 @@ def handle_practice_action():
         print(f"Error in handle_practice_action: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-def deal_cards(num_cards):
-    """Helper function to deal random cards"""
+def deal_cards(num_cards, exclude=()):
+    """Helper function to deal random cards, skipping cards already in play"""
+    taken = {(card['rank'], card['suit']) for card in exclude}
     deck = []
     for suit in ['♠', '♥', '♦', '♣']:
         for rank in ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']:
-            deck.append({'rank': rank, 'suit': suit})
+            if (rank, suit) not in taken:
+                deck.append({'rank': rank, 'suit': suit})
     random.shuffle(deck)
     return deck[:num_cards]
 
@@ -1480,8 +1568,9 @@ def get_gto_advice():
             stack=stack
         )
 
-        # Calculate additional metrics
-        equity = gto_solver.calculate_equity(player_hand, comm_cards)
+        # Calculate additional metrics; the practice table seats two bots
+        equity = equity_calculator.calculate_multiway_equity(player_hand, [None, None],
+                                                             comm_cards).equity
         odds = gto_solver.calculate_odds(player_hand, comm_cards)
 
         return jsonify({
@@ -1618,8 +1707,12 @@ if Card is None or Suit is None or Rank is None or HandEvaluator is None or Hand
         def __init__(self, rank, cards):
             self.rank = rank
             self.cards = cards
+            self.strength = rank.value
     
     class HandEvaluator:
+        def __init__(self, mode='classic'):
+            self.mode = mode
+
         @staticmethod
         def evaluate_hand(cards):
             # Simple mock implementation
@@ -1635,7 +1728,7 @@ if Card is None or Suit is None or Rank is None or HandEvaluator is None or Hand
             return HandValue(random.choice(ranks), cards)
 
 # Create a global reference to the hand evaluator
-hand_evaluator = HandEvaluator()
+hand_evaluator = HandEvaluator(mode='lookup')
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5001) 
\ No newline at end of file
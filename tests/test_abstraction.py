@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from src.core.abstraction import (build_buckets, kmeans, load_buckets, situation_codes,
+                                  strength_distribution)
+from src.core.cards import parse_cards
+
+def test_river_distribution_is_a_point_mass():
+    """Test that a complete board has a single runout and EHS² equals EHS squared."""
+    distribution = strength_distribution('AsAd', 'AcKd2h5s9c')
+    assert distribution.exact and distribution.runouts == 1
+    assert distribution.histogram.sum() == pytest.approx(1.0)
+    assert distribution.ehs2 == pytest.approx(distribution.ehs ** 2)
+
+def test_draw_has_potential():
+    """Test that a flush draw's volatile strength lifts EHS² above EHS squared."""
+    draw = strength_distribution('AhKh', 'Qh7h2c')
+    assert draw.exact and draw.runouts == 1081
+    assert draw.ehs2 > draw.ehs ** 2 + 0.05
+    assert 0.0 < draw.ehs < 1.0
+
+def test_distribution_against_range():
+    """Test strength against a weighted range and rejection of shared cards."""
+    assert strength_distribution('KsKd', 'Kh7c2d3s', {'AA': 1.0}).ehs > 0.9
+    with pytest.raises(ValueError):
+        strength_distribution('AhKh', 'AhQd2c')
+
+def test_situation_codes_are_suit_isomorphic():
+    """Test that suit relabellings and card order share a code."""
+    first = parse_cards('AhKh') + parse_cards('Qh7h2c')
+    second = parse_cards('KsAs') + parse_cards('2d7sQs')
+    other = parse_cards('AhKh') + parse_cards('Qc7h2c')
+    codes = situation_codes(np.array([first, second, other]))
+    assert codes[0] == codes[1] != codes[2]
+
+def test_kmeans_separates_clusters():
+    """Test that k-means splits two well separated blobs."""
+    rng = np.random.default_rng(0)
+    points = np.vstack([rng.normal(0, 0.1, (50, 2)), rng.normal(5, 0.1, (50, 2))])
+    _, labels = kmeans(points, 2, rng)
+    assert len(set(labels[:50])) == 1 and len(set(labels[50:])) == 1
+    assert labels[0] != labels[-1]
+
+def test_build_and_lookup_buckets(tmp_path):
+    """Test building a sampled river table and looking up stored and unseen situations."""
+    path = str(tmp_path / 'buckets_river.npz')
+    table = build_buckets('river', 4, path, num_situations=40, seed=1)
+    assert table.num_buckets == 4 and len(table.codes) <= 40
+    assert load_buckets('river', path).street == 'river'
+
+    # Unpack a stored code back into cards; it must map to its stored bucket
+    code, cards = int(table.codes[0]), []
+    for _ in range(7):
+        code, card = divmod(code, 52)
+        cards.insert(0, card)
+    assert table.bucket(cards[:2], cards[2:]) == table.buckets[0]
+
+    # Situations outside the build fall back to the nearest centroid
+    assert 0 <= table.bucket('AsKs', 'QsJsTs2d3c') < 4
+    with pytest.raises(ValueError):
+        table.bucket('AsKs', 'QsJsTs')
@@ -0,0 +1,55 @@
+import pytest
+from src.core.cache import AppendOnlyStore, LRUCache, SQLiteStore
+
+@pytest.fixture(params=['sqlite', 'append_only'])
+def make_store(request, tmp_path):
+    """Factory for each persistent store, reopening the same file."""
+    def make():
+        if request.param == 'sqlite':
+            return SQLiteStore(str(tmp_path / "cache.sqlite3"))
+        return AppendOnlyStore(str(tmp_path / "cache.jsonl"))
+    return make
+
+def test_lru_eviction_and_counters():
+    """Test that the least recently used entry is evicted and counted."""
+    cache = LRUCache(max_entries=2)
+    cache.put("a", {"value": 1})
+    cache.put("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+    cache.put("c", {"value": 3})
+    assert cache.get("b") is None
+    assert list(cache) == ["a", "c"]
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (1, 1, 1)
+    assert cache.stats.hit_rate == 0.5
+    with pytest.raises(ValueError):
+        LRUCache(max_entries=0)
+
+def test_batched_flush(make_store):
+    """Test that writes reach the store only once a batch fills."""
+    store = make_store()
+    cache = LRUCache(store, flush_every=3)
+    cache.put("a", {"value": 1})
+    cache.put("b", {"value": 2})
+    assert len(store) == 0
+    cache.put("c", {"value": 3})
+    assert len(store) == 3
+    assert cache.stats.flushes == 1
+    cache.close()
+
+def test_warm_load_and_fall_through(make_store):
+    """Test that a reopened cache warm loads recent entries and reads the rest from the store."""
+    cache = LRUCache(make_store())
+    for idx in range(5):
+        cache.put(f"key{idx}", {"value": idx})
+    cache.put("key0", {"value": 10})
+    cache.close()
+
+    reopened = LRUCache(make_store(), max_entries=2)
+    assert list(reopened) == ["key4", "key0"]
+    assert reopened.get("key0") == {"value": 10}
+    assert reopened.get("key1") == {"value": 1}
+    assert reopened.get("missing") is None
+    assert (reopened.stats.hits, reopened.stats.misses) == (2, 1)
+    reopened.clear()
+    assert "key1" not in reopened
+    reopened.close()
@@ -0,0 +1,53 @@
+import pytest
+from src.core.cards import (
+    IntCard, FULL_DECK, encode_card, encode_cards, parse_cards,
+    cards_to_mask, mask_to_cards, cards_to_string
+)
+from src.core import poker
+from src.core import hand_evaluator
+
+def test_string_round_trip():
+    """Test that every card survives a string round trip."""
+    assert len(FULL_DECK) == 52
+    for card in FULL_DECK:
+        assert IntCard.from_string(str(card)) == card
+    assert str(IntCard.from_string('As')) == 'As'
+    assert IntCard.from_string('10d') == IntCard.from_string('Td')
+
+def test_cards_are_interned():
+    """Test that equal cards are the same object."""
+    assert IntCard(51) is IntCard.from_string('As')
+    assert encode_card('Kh') is IntCard.from_string('Kh')
+    with pytest.raises(ValueError):
+        IntCard(52)
+
+def test_rank_and_suit():
+    """Test rank and suit indices of encoded cards."""
+    ace = IntCard.from_string('As')
+    deuce = IntCard.from_string('2c')
+    assert (ace.rank, ace.suit) == (12, 3)
+    assert (deuce.rank, deuce.suit) == (0, 0)
+    assert ace > deuce
+
+def test_convert_existing_cards():
+    """Test conversion from both Card classes and web dicts."""
+    expected = IntCard.from_string('Th')
+    assert encode_card(poker.Card(poker.Rank.TEN, poker.Suit.HEARTS)) == expected
+    assert encode_card(hand_evaluator.Card('♥', '10')) == expected
+    assert encode_card({'rank': '10', 'suit': '♥'}) == expected
+    assert str(poker.Card.from_int(expected)) == 'Th'
+    assert hand_evaluator.Card.from_int(expected).to_int() == expected
+    with pytest.raises(ValueError):
+        encode_card({'rank': 'X', 'suit': '♥'})
+
+def test_parse_and_masks():
+    """Test parsing card strings and converting to and from masks."""
+    cards = parse_cards('AhKs')
+    assert cards == parse_cards('Ah Ks') == encode_cards(['Ah', 'Ks'])
+    assert parse_cards('') == []
+    with pytest.raises(ValueError):
+        parse_cards('AhK')
+    mask = cards_to_mask(cards)
+    assert bin(mask).count('1') == 2
+    assert sorted(mask_to_cards(mask)) == sorted(cards)
+    assert cards_to_string(cards) == 'Ah Ks'
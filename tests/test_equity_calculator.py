@@ -2,6 +2,8 @@ import pytest
 import os
 from src.core.equity_calculator import EquityCalculator, EquityResult
 from src.core.poker import Card, Hand, Board, Suit, Rank
+from src.core.cards import IntCard, parse_cards
+import numpy as np
 
 @pytest.fixture
 def setup_test_data(tmp_path):
@@ -160,4 +162,266 @@ def test_equity_edge_cases(equity_calculator):
     
     # Test with invalid hand
     with pytest.raises(ValueError):
-        equity_calculator.calculate_equity(None, "random", board) 
\ No newline at end of file
+        equity_calculator.calculate_equity(None, "random", board) 
+
+def test_exact_equity_on_turn(equity_calculator):
+    """Test exact enumeration of every river against a narrow range."""
+    result = equity_calculator.calculate_equity("Ah Ad", {"KK": 1.0}, "Kc 7d 2s 3h")
+    assert result.exact
+    assert result.samples == 3 * 44  # three live KK combos, 44 rivers
+    assert result.equity == pytest.approx(2 / 44)
+
+def test_exact_equity_on_river(equity_calculator):
+    """Test that river equity is exact and noise-free."""
+    result = equity_calculator.calculate_equity("As Ks", "random", "Qs Js Ts 2c 3d")
+    assert result.exact
+    assert result.equity == 1.0
+    assert result.hand_type == "royal_flush"
+
+def test_hand_type_follows_the_made_hand(equity_calculator):
+    """Test that results name the hand made so far rather than a fixed label."""
+    def hand_type(hand, board):
+        return equity_calculator._get_hand_type(parse_cards(hand), parse_cards(board))
+    assert hand_type("Ah As", "") == "pair"
+    assert hand_type("Ah As", "Kd Kc") == "two_pair"
+    assert hand_type("Ah As", "Kd Kc Ad") == "full_house"
+    assert hand_type("Ah Kh", "Qh 7h 2c") == "high_card"
+    assert hand_type("9h 8h", "Th 7c 6d") == "straight"
+    assert hand_type("Ah Kh", "Qh 7h 2h 3c") == "flush"
+    assert equity_calculator.calculate_equity("Ah Ad", {"KK": 1.0}, "Kc 7d 2s 3h").hand_type == "pair"
+
+def test_auto_mode_respects_budget(setup_test_data):
+    """Test that auto mode samples once enumeration exceeds the budget."""
+    calculator = EquityCalculator(str(setup_test_data / "budget.json"),
+                                  iterations=500, max_enumerations=1000)
+    turn = calculator.calculate_equity("Ah Kh", "random", "Qh 7c 2d 9s")
+    assert not turn.exact
+    assert turn.samples == 500
+    exact = calculator.calculate_equity("Ah Kh", "random", "Qh 7c 2d 9s 3c", mode='exact')
+    assert exact.exact
+    with pytest.raises(ValueError):
+        calculator.calculate_equity("Ah Kh", "random", "Qh 7c 2d", mode='unknown')
+
+def test_monte_carlo_statistics(equity_calculator):
+    """Test the vectorized sampler's equity, tie rate and standard error."""
+    result = equity_calculator.calculate_equity("Ah Ad", {"KK": 1.0}, mode='monte_carlo', seed=1)
+    assert not result.exact
+    assert result.samples == equity_calculator.iterations
+    assert 0 < result.std_error < 0.01
+    assert abs(result.equity - 0.82) < 5 * result.std_error
+    assert 0 <= result.tie_rate < 0.02
+
+def test_monte_carlo_is_seeded(setup_test_data):
+    """Test that the same seed reproduces the same estimate."""
+    results = []
+    for name in ("first.json", "second.json"):
+        calculator = EquityCalculator(str(setup_test_data / name), iterations=2000)
+        results.append(calculator.calculate_equity("7h 2c", "random", "Ks 9d 4c",
+                                                   mode='monte_carlo', seed=42))
+    assert results[0].equity == results[1].equity
+
+def test_sharded_simulation_is_worker_independent(setup_test_data):
+    """Test that seeded results are bit-identical for any worker count."""
+    equities = []
+    for workers in (None, 2):
+        # Separate caches, so the second run is not answered by the first
+        calculator = EquityCalculator(str(setup_test_data / f"sharded{workers}.json"), iterations=3000)
+        calculator.SHARD_SIZE = 1000
+        try:
+            result = calculator.calculate_equity("Ks Qs", {"JJ": 1.0, "AJs": 0.5}, "Js 8h 2s",
+                                                 mode='monte_carlo', seed=11, workers=workers)
+            assert result.samples == 3000
+            equities.append(result.equity)
+        finally:
+            calculator.shutdown()
+    assert equities[0] == equities[1]
+
+def test_multiway_and_range_workers_match_serial(setup_test_data):
+    """Test that multiway and range equity give identical results on a process pool."""
+    calculator = EquityCalculator(str(setup_test_data / "workers.json"), iterations=3000)
+    calculator.SHARD_SIZE = 1000
+    try:
+        multiway = [calculator.calculate_multiway_equity("Ah Kd", [None, {"QQ": 1.0}], "Qs 8h 2s",
+                                                         seed=7, workers=workers)
+                    for workers in (None, 2)]
+        ranges = [calculator.calculate_range_equity({"AA": 1.0, "AKs": 1.0}, {"KK": 1.0, "QJs": 1.0},
+                                                    "Ks 9d 4c", workers=workers)
+                  for workers in (None, 2)]
+    finally:
+        calculator.shutdown()
+    assert multiway[0].equities == multiway[1].equities
+    assert ranges[0].equity == ranges[1].equity
+    assert np.array_equal(ranges[0].matrix, ranges[1].matrix, equal_nan=True)
+
+@pytest.mark.parametrize("sampling", EquityCalculator.SAMPLINGS)
+def test_variance_reduced_sampling(setup_test_data, sampling):
+    """Test that every sampling strategy is unbiased and reports its variance."""
+    calculator = EquityCalculator(str(setup_test_data / f"{sampling}.json"), iterations=8192)
+    villain = {"QQ": 1.0, "77": 1.0, "AQs": 1.0, "KQs": 1.0, "JTs": 1.0}
+    exact = calculator.calculate_equity("Ah Kh", villain, "Qh 7h 2c", mode='exact').equity
+    result = calculator.calculate_equity("Ah Kh", villain, "Qh 7h 2c", mode='monte_carlo',
+                                         seed=5, sampling=sampling)
+    assert 0 < result.std_error < 0.01
+    assert abs(result.equity - exact) < 5 * result.std_error
+    assert result.variance == pytest.approx(result.std_error ** 2 * result.samples)
+
+    # Adaptive runs stop on the strategy's own standard error
+    adaptive = calculator.calculate_equity("Ah Kh", villain, "Qh 7h 2c", mode='monte_carlo',
+                                           seed=5, target_stderr=0.01, sampling=sampling)
+    assert adaptive.std_error <= 0.01
+
+def test_sobol_sampling_beats_uniform_on_turn(setup_test_data):
+    """Test that quasi-random combos need fewer samples than uniform draws on a turn."""
+    calculator = EquityCalculator(str(setup_test_data / "turn.json"), iterations=4096)
+    variances = {}
+    for sampling in ('uniform', 'sobol'):
+        variances[sampling] = calculator.calculate_equity(
+            "5c 5d", "random", "Kh 9s 4d 8c", mode='monte_carlo', seed=2, sampling=sampling).variance
+    assert variances['sobol'] < variances['uniform'] / 2
+    with pytest.raises(ValueError):
+        calculator.calculate_equity("5c 5d", "random", "Kh 9s 4d", sampling='latin')
+
+def test_adaptive_precision_stops_early(equity_calculator):
+    """Test that a loose precision target stops well before the fixed iteration count."""
+    result = equity_calculator.calculate_equity("Ah Ad", "random", mode='monte_carlo',
+                                                seed=3, target_stderr=0.02)
+    assert result.std_error <= 0.02
+    assert result.samples < equity_calculator.iterations
+
+    # A tighter target than the cached result recomputes instead of reusing it
+    tighter = equity_calculator.calculate_equity("Ah Ad", "random", mode='monte_carlo',
+                                                 seed=3, target_stderr=0.005)
+    assert tighter.std_error <= 0.005
+    assert tighter.samples > result.samples
+
+def test_adaptive_time_budget(setup_test_data):
+    """Test that a time budget bounds the run and reports the precision reached."""
+    calculator = EquityCalculator(str(setup_test_data / "timed.json"), max_samples=5000)
+    result = calculator.calculate_equity("Ks Qs", "random", mode='monte_carlo', max_time_ms=1000)
+    assert 0 < result.samples <= 5000
+    assert result.std_error > 0
+
+def test_equity_cache_is_suit_isomorphic(equity_calculator):
+    """Test that a suit-permuted spot is served from the cache."""
+    first = equity_calculator.calculate_equity("Ah Kh", {"QQ": 1.0, "AKs": 1.0}, "Qh 7h 2c")
+    second = equity_calculator.calculate_equity("As Ks", {"AKs": 1.0, "QQ": 1.0}, "Qs 7s 2d")
+    assert len(equity_calculator.cache) == 1
+    assert equity_calculator.cache.stats.hits == 1
+    assert second.equity == first.equity
+
+def test_cache_keeps_estimates_apart_from_exact_results(setup_test_data):
+    """Test that cached estimates never answer exact requests or other seeds."""
+    calculator = EquityCalculator(str(setup_test_data / "estimates.json"), iterations=300,
+                                  max_enumerations=0)
+    estimate = calculator.calculate_equity("Ah Kh", "random", "Qh 7h 2c", seed=1)
+    assert not estimate.exact and estimate.samples == 300
+    assert calculator.calculate_equity("Ah Kh", "random", "Qh 7h 2c", seed=1) == estimate
+    assert calculator.calculate_equity("Ah Kh", "random", "Qh 7h 2c", seed=2).equity != estimate.equity
+    exact = calculator.calculate_equity("Ah Kh", "random", "Qh 7h 2c", mode='exact')
+    assert exact.exact and exact.std_error == 0
+    # Once known exactly, the spot answers auto requests without sampling
+    assert calculator.calculate_equity("Ah Kh", "random", "Qh 7h 2c", seed=3) == exact
+    assert not calculator.calculate_equity("Ah Kh", "random", "Qh 7h 2c", mode='monte_carlo').exact
+
+def test_equity_cache_persists_across_instances(setup_test_data):
+    """Test that flushed results are warm loaded by a new calculator."""
+    path = str(setup_test_data / "persisted.json")
+    first = EquityCalculator(path)
+    result = first.calculate_equity("Ah Ad", {"KK": 1.0}, "Kc 7d 2s 3h")
+    first.shutdown()
+    second = EquityCalculator(path)
+    assert len(second.cache) == 1
+    assert second.calculate_equity("Ah Ad", {"KK": 1.0}, "Kc 7d 2s 3h").equity == result.equity
+    assert second.cache.stats.hits == 1 and second.cache.stats.misses == 0
+
+def test_stream_equity_converges(setup_test_data):
+    """Test that streamed estimates grow in samples and end with a cached final result."""
+    calculator = EquityCalculator(str(setup_test_data / "stream.json"), preflop_table_path=None)
+    estimates = list(calculator.stream_equity("Ah Kh", "random", "Qh 7h 2c",
+                                              seed=4, target_stderr=0.005))
+    assert len(estimates) > 1
+    assert [e.samples for e in estimates] == sorted(e.samples for e in estimates)
+    assert estimates[0].samples == calculator.MIN_ADAPTIVE_SAMPLES
+    final = estimates[-1]
+    assert final.std_error <= 0.005 and final.outs
+    assert list(calculator.stream_equity("Ah Kh", "random", "Qh 7h 2c",
+                                         seed=4, target_stderr=0.005)) == [final]
+
+    # Spots small enough to enumerate yield one exact result
+    exact = list(calculator.stream_equity("Ah Ad", {"KK": 1.0}, "Kc 7d 2s 3h"))
+    assert len(exact) == 1 and exact[0].exact
+
+def test_multiway_equity(setup_test_data):
+    """Test multiway equities against known values, heads-up results and split pots."""
+    calculator = EquityCalculator(str(setup_test_data / "multiway.json"), iterations=20000)
+    three_way = calculator.calculate_multiway_equity("Ah Ad", [None, None], seed=1)
+    assert abs(three_way.equity - 0.735) < 4 * three_way.std_error
+    assert abs(sum(three_way.equities) - 1.0) < 1e-9
+    assert len(three_way.equities) == 3
+
+    heads_up = calculator.calculate_multiway_equity("Ah Ad", [{"KK": 1.0}], "Kc 7d 2s 3h", seed=1)
+    assert abs(heads_up.equity - 2 / 44) < 4 * heads_up.std_error
+
+    # A royal flush on board splits the pot between every player
+    split = calculator.calculate_multiway_equity("2c 3d", [None, {"QQ": 1.0}, None],
+                                                 "As Ks Qs Js Ts", iterations=500, seed=1)
+    assert split.equities == [0.25] * 4 and split.tie_rate == 1.0
+
+    # Opponent equities come back in the order the ranges were given
+    ordered = calculator.calculate_multiway_equity("7h 2c", [None, {"AA": 1.0}], seed=2)
+    assert ordered.equities[2] > ordered.equities[1]
+
+def test_multiway_equity_rejects_bad_input(equity_calculator):
+    """Test the opponent count limit and ranges that cannot be dealt together."""
+    with pytest.raises(ValueError):
+        equity_calculator.calculate_multiway_equity("Ah Ad", [None] * 9)
+    with pytest.raises(ValueError):
+        equity_calculator.calculate_multiway_equity("Ah Ad", [{"KhKd": 1.0}, {"KhKs": 1.0}])
+
+def test_equity_trajectory(setup_test_data):
+    """Test that one pass reproduces each street's exact equity and the turn distribution."""
+    calculator = EquityCalculator(str(setup_test_data / "trajectory.json"))
+    villain = {"QQ": 1.0, "77": 1.0, "AQs": 1.0, "KQs": 1.0, "JTs": 1.0}
+    trajectory = calculator.calculate_equity_trajectory("Ah Kh", villain, "Qh 7h 2c 3d 5h")
+    assert trajectory.exact and trajectory.streets == ['flop', 'turn', 'river']
+    for cards, equity in zip(("Qh 7h 2c", "Qh 7h 2c 3d", "Qh 7h 2c 3d 5h"), trajectory.equities):
+        assert equity == pytest.approx(
+            calculator.calculate_equity("Ah Kh", villain, cards, mode='exact').equity)
+    assert len(trajectory.turn_cards) == 47
+    assert trajectory.turn_probabilities.sum() == pytest.approx(1.0)
+    assert trajectory.turn_probabilities @ trajectory.turn_equities == \
+        pytest.approx(trajectory.equities[0])
+
+    # Random opponents exceed the enumeration budget, so the pass is sampled
+    sampled = calculator.calculate_equity_trajectory("Ah Kh", None, "Qh 7h 2c", seed=1)
+    assert not sampled.exact and sampled.streets == ['flop']
+    assert abs(sampled.equities[0] - 0.7268) < 5 * sampled.std_error
+    with pytest.raises(ValueError):
+        calculator.calculate_equity_trajectory("Ah Kh", None, "")
+
+def test_range_equity_matrix(setup_test_data):
+    """Test range-vs-range matrices against single-hand equities and card removal."""
+    calculator = EquityCalculator(str(setup_test_data / "ranges.json"), preflop_table_path=None)
+    result = calculator.calculate_range_equity({"AA": 1.0, "AKs": 0.5}, {"KK": 1.0, "QJs": 1.0},
+                                               "Kc 7d 2s 3h")
+    assert result.exact and result.runouts == 48
+    assert result.matrix.shape == (len(result.combos), len(result.opponent_combos))
+    assert abs(result.equity + result.opponent_equity - 1.0) < 1e-12
+
+    # Each row's equity matches calculate_equity for that combo against the opponent range
+    for idx in (0, len(result.combos) - 1):
+        hand = " ".join(str(IntCard(int(card))) for card in result.combos[idx])
+        single = calculator.calculate_equity(hand, {"KK": 1.0, "QJs": 1.0}, "Kc 7d 2s 3h")
+        assert abs(result.combo_equities[idx] - single.equity) < 1e-9
+
+    # Combos sharing a card have no matchup
+    shared = [(i, j) for i, hero in enumerate(result.combos)
+              for j, villain in enumerate(result.opponent_combos) if set(hero) & set(villain)]
+    assert shared and all(np.isnan(result.matrix[i, j]) for i, j in shared)
+
+def test_range_equity_sampled_preflop(setup_test_data):
+    """Test that boardless ranges without a preflop table fall back to sampled runouts."""
+    calculator = EquityCalculator(str(setup_test_data / "ranges.json"), preflop_table_path=None)
+    result = calculator.calculate_range_equity({"AA": 1.0}, {"KK": 1.0}, max_runouts=3000, seed=2)
+    assert not result.exact and result.runouts == 3000
+    assert abs(result.equity - 0.82) < 0.02
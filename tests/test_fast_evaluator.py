@@ -0,0 +1,97 @@
+import itertools
+import random
+import pytest
+from src.core import fast_evaluator
+from src.core.cards import parse_cards
+from src.core.hand_evaluator import HandEvaluator, HandRank, Card
+
+def strength(text):
+    return fast_evaluator.evaluate_cards(parse_cards(text))
+
+def test_category_order():
+    """Test that hands of each category outrank the category below."""
+    hands = [
+        'As Kd 9c 7h 4s 3d 2c',  # high card
+        'As Ad 9c 7h 4s 3d 2c',  # pair
+        'As Ad 9c 9h 4s 3d 2c',  # two pair
+        'As Ad Ac 7h 4s 3d 2c',  # trips
+        'As Kd Qc Jh Ts 3d 2c',  # straight
+        'As Ks 9s 7s 4s 3d 2c',  # flush
+        'As Ad Ac 7h 7s 3d 2c',  # full house
+        'As Ad Ac Ah 4s 3d 2c',  # quads
+        'As 2s 3s 4s 5s Kd Qc',  # straight flush
+    ]
+    strengths = [strength(hand) for hand in hands]
+    assert strengths == sorted(strengths)
+    assert [fast_evaluator.strength_category(s) for s in strengths] == list(range(9))
+
+def test_kickers_and_ties():
+    """Test kicker ordering, the wheel and board-played ties."""
+    assert strength('As Ad Kc 7h 4s') > strength('Ah Ac Qc 7d 4c')
+    assert strength('6s 5d 4c 3h 2s') > strength('As 2d 3c 4h 5s')
+    assert strength('2c 3d As Ks Qs Js Ts') == strength('4c 5d As Ks Qs Js Ts')
+
+def test_matches_best_five_card_subset():
+    """Test 7-card scores against the best of their 5-card subsets."""
+    rng = random.Random(7)
+    for _ in range(300):
+        cards = rng.sample(range(52), 7)
+        best = max(fast_evaluator.evaluate_cards(combo)
+                   for combo in itertools.combinations(cards, 5))
+        assert fast_evaluator.evaluate_cards(cards) == best
+
+def test_invalid_card_count():
+    """Test that too few cards are rejected."""
+    with pytest.raises(ValueError):
+        fast_evaluator.evaluate_cards(parse_cards('As Kd'))
+
+def test_lookup_mode_decodes_hand():
+    """Test that lookup mode still returns Hand objects."""
+    evaluator = HandEvaluator(mode='lookup')
+    cards = [Card.from_int(card) for card in parse_cards('Ah Ad Kc Kd 2s 3s 9h')]
+    hand = evaluator.evaluate_hand(cards)
+    assert hand.rank == HandRank.TWO_PAIR
+    assert [str(card) for card in hand.cards] == ['A♥', 'A♦', 'K♣', 'K♦']
+    assert [str(card) for card in hand.kickers] == ['9♥']
+    assert hand.strength == evaluator.evaluate_strength(cards)
+
+    royal = [Card.from_int(card) for card in parse_cards('As Ks Qs Js Ts 2c 2d')]
+    assert evaluator.evaluate_hand(royal).rank == HandRank.ROYAL_FLUSH
+    assert evaluator.compare_hands(evaluator.evaluate_hand(royal), hand) == 1
+
+    with pytest.raises(ValueError):
+        HandEvaluator(mode='unknown')
+
+def test_evaluate_batch_matches_scalar():
+    """Test that batched scores equal per-hand scores for 5-7 card rows."""
+    np = pytest.importorskip('numpy')
+    rng = np.random.default_rng(3)
+    evaluator = HandEvaluator()
+    for size in (5, 6, 7):
+        cards = np.argsort(rng.random((2000, 52)), axis=1)[:, :size]
+        batch = evaluator.evaluate_batch(cards)
+        expected = [fast_evaluator.evaluate_cards(row) for row in cards.tolist()]
+        assert batch.tolist() == expected
+    with pytest.raises(ValueError):
+        evaluator.evaluate_batch(np.zeros((3, 4), dtype=np.int64))
+
+def test_board_evaluator_matches_batch():
+    """Test that board-prefix scores equal full-row scores on 3-5 card boards."""
+    np = pytest.importorskip('numpy')
+    rng = np.random.default_rng(5)
+    for size in (3, 4, 5):
+        boards = np.argsort(rng.random((100, 52)), axis=1)[:, :size]
+        evaluator = fast_evaluator.BoardEvaluator(boards)
+        board_idx = rng.integers(0, len(boards), 3000)
+        # Hole cards drawn from the cards left after each row's board
+        keys = rng.random((3000, 52))
+        keys[np.arange(3000)[:, None], boards[board_idx]] = 2.0
+        holes = np.argpartition(keys, 1, axis=1)[:, :2]
+        expected = fast_evaluator.evaluate_batch(np.hstack([holes, boards[board_idx]]))
+        assert evaluator.evaluate(holes, board_idx).tolist() == expected.tolist()
+    single = fast_evaluator.BoardEvaluator(parse_cards('AhKhQh'))
+    assert single.evaluate(np.array([parse_cards('JhTh')]))[0] == strength('AhKhQhJhTh')
+    with pytest.raises(ValueError):
+        fast_evaluator.BoardEvaluator(np.zeros((2, 2), dtype=np.int64))
+    with pytest.raises(ValueError):
+        single.evaluate(np.zeros(4, dtype=np.int64))
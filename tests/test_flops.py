@@ -0,0 +1,41 @@
+import pytest
+from src.core.flops import (FLOP_COUNTS, FLOP_ID, NUM_FLOPS, board_texture, flop_id,
+                            flop_texture, range_advantage)
+from src.core.cards import parse_cards
+
+def test_index_covers_every_flop():
+    """Test that 1,755 classes cover all 22,100 flops and ids ignore order and suit labels."""
+    assert NUM_FLOPS == 1755
+    assert FLOP_COUNTS.sum() == 22100
+    assert (FLOP_ID >= 0).sum() == 22100 * 6
+    assert flop_id('AsKd2c') == flop_id('2hKcAd') != flop_id('AsKs2c')
+    with pytest.raises(ValueError):
+        flop_id('AsAs2c')
+    with pytest.raises(ValueError):
+        flop_texture(NUM_FLOPS)
+
+def test_texture_features():
+    """Test paired, suit and straight features of representative flops."""
+    dry = board_texture('AsKd2c')
+    assert dry.rainbow and not dry.paired and dry.high_card == 12
+    assert not dry.straight_possible and dry.frequency == 24
+    wet = board_texture(parse_cards('8h 9h Th'))
+    assert wet.monotone and wet.connectedness == 3 and wet.wet
+    assert board_texture('7c7d7h').trips
+    assert board_texture('KdKs4c').paired and not board_texture('KdKs4c').trips
+    assert board_texture('Ah2h3s').two_tone and board_texture('Ah2h3s').connectedness == 1
+
+def test_range_advantage():
+    """Test that a premium range leads a random range on high and low flops."""
+    premium = {'AA': 1.0, 'KK': 1.0, 'QQ': 1.0, 'AKs': 1.0, 'AKo': 1.0}
+    high = range_advantage('AsKd2c', premium)
+    assert high.equity > 0.85 and high.strong_share > high.opponent_strong_share
+    low = range_advantage('7c6d5h', premium)
+    assert low.overpair_share == pytest.approx(18 / 34)
+    assert range_advantage('7c6d5h', None, None).equity == pytest.approx(0.5)
+
+def test_range_advantage_card_removal():
+    """Test suited-combo ranges on the actual flop and fully blocked ranges."""
+    assert range_advantage('7c6d5h', {'AsAh': 1.0}).overpair_share == 1.0
+    with pytest.raises(ValueError):
+        range_advantage('AcAdAh', {'AA': 1.0})
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from src.core.game_tree import (CHANCE, DECISION, FLOP, FOLD, RIVER, SHOWDOWN, TURN, BetSizing,
+                                build_tree, estimate_tree, tree_for_state)
+from src.core.gto_solver import GameState
+
+def test_river_tree_layout():
+    """Test that river trees are breadth first with contiguous children and matched showdowns."""
+    tree = build_tree(10, 50, BetSizing(bet_sizes=(0.5, 1.0), max_raises=2), street=RIVER)
+    assert len(tree) == tree.size.nodes == 45
+    assert (tree.parent[1:] < np.arange(1, len(tree))).all()
+    for node in range(len(tree)):
+        assert all(tree.parent[child] == node for child in tree.children(node))
+    showdowns = tree.kind == SHOWDOWN
+    assert (tree.invested[showdowns, 0] == tree.invested[showdowns, 1]).all()
+    assert (tree.folder[tree.kind == FOLD] >= 0).all()
+    assert (tree.stacks >= 0).all()
+    assert tree.pots[0] == 10 and tree.pots.max() == 110
+    assert tree.size.decision_nodes == int((tree.kind == DECISION).sum())
+
+def test_multi_street_tree_counts():
+    """Test that chance nodes start the next street and dealt-out counts multiply by the cards left."""
+    sizing = BetSizing(bet_sizes=(0.5,), all_in=False, max_raises=1)
+    tree = build_tree(10, 200, sizing, street=TURN, last_street=RIVER)
+    chance = np.flatnonzero(tree.kind == CHANCE)
+    assert len(chance) == tree.size.chance_nodes > 0
+    for node in chance:
+        (child,) = tree.children(node)
+        assert tree.node_street[child] == RIVER and tree.player[child] == 0
+    river = estimate_tree(10, 200, sizing, street=RIVER)
+    turn_only = estimate_tree(10, 200, sizing, street=TURN)
+    # Each turn line ending in a call or check-check deals one of 48 rivers
+    assert tree.size.nodes == turn_only.nodes + len(chance) * river.nodes
+    assert tree.size.expanded_nodes == turn_only.nodes + len(chance) * 48 * river.nodes
+
+def test_oversized_trees_rejected():
+    """Test that trees over the node or memory budget are rejected before building."""
+    size = estimate_tree(6.5, 96.75, BetSizing(), street=FLOP, last_street=RIVER)
+    assert size.expanded_nodes > 1_000_000
+    with pytest.raises(ValueError):
+        build_tree(6.5, 96.75, BetSizing(), street=FLOP, last_street=RIVER)
+    with pytest.raises(ValueError):
+        build_tree(6.5, 96.75, BetSizing(), street=RIVER, max_bytes=1 << 10)
+    with pytest.raises(ValueError):
+        build_tree(6.5, 96.75, street=0)
+
+def test_tree_for_game_state():
+    """Test that a GameState's board and sized history set the street, pot and stack."""
+    state = GameState(hand='As Ac', position='BTN', opponents=['BB'],
+                      action_history=[('BTN', 'raise', 2.5), ('BB', 'call', 2.5)],
+                      effective_stack=100, board='Ad 9d 5c 3h', tournament=False)
+    tree = tree_for_state(state)
+    assert tree.street == tree.last_street == TURN
+    assert tree.pot == 5.0 and tree.stack == 97.5
+    with pytest.raises(ValueError):
+        tree_for_state(state, all_streets=True)
+    small = BetSizing(bet_sizes=(0.75,), max_raises=1)
+    assert tree_for_state(state, small, all_streets=True).last_street == RIVER
+    with pytest.raises(ValueError):
+        tree_for_state(GameState(hand='As Ac', position='BTN', opponents=[], action_history=[],
+                                 effective_stack=100, board=[], tournament=False))
@@ -2,12 +2,13 @@ import pytest
 import os
 from src.core.gto_solver import GtoSolver, GameState
 from src.core.poker import Card, Hand, Board, Suit, Rank
+from src.core.cards import parse_cards
+from src.core.hand_evaluator import Card as EvaluatorCard
 
 @pytest.fixture
-def gto_solver():
+def gto_solver(tmp_path):
     """Create a test GTO solver instance."""
-    test_data_path = os.path.join(os.path.dirname(__file__), 'data')
-    solver = GtoSolver(os.path.join(test_data_path, 'gto_solutions.json'))
+    solver = GtoSolver(str(tmp_path / 'gto_solutions.json'))
     return solver
 
 def test_get_action_preflop(gto_solver):
@@ -138,4 +139,38 @@ def test_tournament_vs_cash(gto_solver):
     action_cash, freq_cash, ev_cash = gto_solver.get_action(game_state_cash)
     
     # Solutions should be different for tournament vs cash
-    assert (action_tournament, freq_tournament) != (action_cash, freq_cash) 
\ No newline at end of file
+    assert (action_tournament, freq_tournament) != (action_cash, freq_cash) 
+
+def test_straight_possible(gto_solver):
+    """Test straight detection on flops, turns and wheel boards."""
+    assert gto_solver._is_straight_possible(parse_cards('8h 9d Tc'))
+    assert gto_solver._is_straight_possible(parse_cards('Ah 2d 4c'))
+    assert not gto_solver._is_straight_possible(parse_cards('Ah 7d 2c'))
+    assert not gto_solver._is_straight_possible(parse_cards('Kh 8d 3c 2s'))
+
+def test_postflop_advice_uses_flop_index(gto_solver):
+    """Test that postflop advice reports range advantage on the flop."""
+    hand = [EvaluatorCard.from_int(card) for card in parse_cards('Ah Kd')]
+    board = [EvaluatorCard.from_int(card) for card in parse_cards('As Kc 2d')]
+    advice = gto_solver.get_advice('BTN', hand, board, 10, 100)
+    assert 'favors your BTN range' in advice['explanation']
+    assert advice['actions']
+
+def test_solution_store_is_lazy_and_batched(tmp_path):
+    """Test that solutions persist in batches and reopening loads nothing up front."""
+    path = str(tmp_path / 'solutions.json')
+    solver = GtoSolver(path)
+    states = [GameState(hand='As Kh', position='BTN', opponents=['BB'], action_history=[],
+                        effective_stack=stack, board='Qh 7h 2c', tournament=False)
+              for stack in range(40, 80)]
+    answers = [solver.get_action(state) for state in states]
+    assert len({solver._get_solution_key(state) for state in states}) == len(states)
+    reader = GtoSolver(path)
+    assert len(reader.solutions) == 0
+    # The first full batch reached the store; the rest wait for a flush
+    assert reader.solutions.get(solver._get_solution_key(states[0])) is not None
+    assert reader.solutions.get(solver._get_solution_key(states[-1])) is None
+    solver.flush()
+    assert [reader.get_action(state) for state in states] == answers
+    assert reader.solutions.stats.misses == 1
+    assert not os.path.exists(path) and os.path.exists(str(tmp_path / 'solutions.sqlite3'))
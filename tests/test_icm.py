@@ -0,0 +1,57 @@
+import itertools
+import numpy as np
+import pytest
+from src.core import icm
+from src.core.icm import MAX_EXACT_PLAYERS, icm_equities, icm_equity, _simulated
+
+def harville(stacks, payouts):
+    """Malmuth-Harville equity by enumerating every finishing order."""
+    equity = np.zeros(len(stacks))
+    for order in itertools.permutations(range(len(stacks))):
+        chance, left = 1.0, sum(stacks)
+        for place, player in enumerate(order):
+            chance *= stacks[player] / left if left else 1 / (len(stacks) - place)
+            left -= stacks[player]
+        for place, player in enumerate(order[:len(payouts)]):
+            equity[player] += chance * payouts[place]
+    return equity
+
+def test_exact_matches_enumeration():
+    """Test that the subset recursion matches enumerated finishing orders, busted players included."""
+    for stacks in ([5000, 3000, 2000, 1500], [10, 0, 10, 30, 5], [0, 0, 10]):
+        assert np.allclose(icm_equity(stacks, [50, 30, 20]), harville(stacks, [50, 30, 20]))
+    assert np.allclose(icm_equity([1, 1, 1, 1], [40, 30, 20, 10, 5]), 25)
+    assert icm_equity([0, 100], [70, 30]).tolist() == [30, 70]
+
+def test_batch_matches_single(monkeypatch):
+    """Test that batches agree with single configurations and conserve the prize pool."""
+    rng = np.random.default_rng(3)
+    stacks = rng.integers(1, 100, (50, 7)).astype(float)
+    equities = icm_equities(stacks, [50, 30, 20])
+    assert equities.shape == stacks.shape
+    assert np.allclose(equities.sum(axis=1), 100)
+    assert np.allclose(equities[7], icm_equity(stacks[7], [50, 30, 20]))
+    # Batches split into chunks of a few configurations give the same equities
+    monkeypatch.setattr(icm, '_CHUNK', 3 << 7)
+    assert np.allclose(icm_equities(stacks, [50, 30, 20]), equities)
+    # The chip leader's share of the prize pool is below their share of the chips
+    leader = stacks.argmax(axis=1)
+    rows = np.arange(len(stacks))
+    assert (equities[rows, leader] / 100 < stacks[rows, leader] / stacks.sum(axis=1)).all()
+    with pytest.raises(ValueError):
+        icm_equities([[10, -1]], [1])
+    with pytest.raises(ValueError):
+        icm_equity([10, 20], [])
+
+def test_large_fields_simulated():
+    """Test that simulated finishing orders converge to the exact equity and large fields use them."""
+    stacks = np.array([40, 25, 15, 10, 5, 5, 0], dtype=float)
+    payouts = np.array([50, 30, 20, 0, 0, 0, 0], dtype=float)
+    simulated = _simulated(stacks[None], payouts, 100000, np.random.default_rng(1))[0]
+    assert np.allclose(simulated, icm_equity(stacks, payouts), atol=0.3)
+    assert simulated[6] == 0
+    field = np.full(MAX_EXACT_PLAYERS + 5, 10.0)
+    equity = icm_equity(field, [50, 30, 20], samples=2000, seed=2)
+    assert equity.sum() == pytest.approx(100)
+    assert np.allclose(equity, 100 / len(field), atol=1.5)
+    assert equity.tolist() == icm_equity(field, [50, 30, 20], samples=2000, seed=2).tolist()
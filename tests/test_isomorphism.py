@@ -0,0 +1,47 @@
+from src.core.cards import parse_cards
+from src.core.isomorphism import (
+    SUIT_PERMUTATIONS, canonical_form, canonical_key, invert_permutation,
+    permute_cards, range_digest, spot_key
+)
+from src.core.gto_solver import GtoSolver, GameState
+
+def test_suit_permutations_share_a_key():
+    """Test that spots differing only by suits map to one canonical key."""
+    first = canonical_key([parse_cards('Ah Kh'), parse_cards('Qh 7h 2c')])
+    second = canonical_key([parse_cards('As Ks'), parse_cards('Qs 7s 2d')])
+    third = canonical_key([parse_cards('Ks As'), parse_cards('2d 7s Qs')])
+    assert first == second == third
+    assert first != canonical_key([parse_cards('Ah Kh'), parse_cards('Qc 7h 2c')])
+
+def test_canonical_form_suit_map():
+    """Test that the returned suit map sends the cards to the canonical form."""
+    hand, board = parse_cards('Td 9d'), parse_cards('8d 2c 3h')
+    groups, suit_map = canonical_form([hand, board])
+    assert tuple(sorted(permute_cards(hand, suit_map), reverse=True)) == groups[0]
+    assert permute_cards(permute_cards(board, suit_map), invert_permutation(suit_map)) == board
+    assert len(SUIT_PERMUTATIONS) == 24
+
+def test_range_digest():
+    """Test that range hashes are compact and order independent."""
+    assert range_digest({'AA': 1.0, 'KK': 0.5}) == range_digest({'KK': 0.5, 'AA': 1.0})
+    assert range_digest({'AA': 1.0}) != range_digest({'AA': 0.5})
+    assert range_digest(None) == range_digest("random") == "random"
+    assert len(range_digest({'AA': 1.0})) == 16
+
+def test_explicit_combos_keep_suits():
+    """Test that ranges with explicit combos are not canonicalized."""
+    groups = [parse_cards('Ah Kh'), parse_cards('Qh 7h 2c')]
+    swapped = [parse_cards('As Ks'), parse_cards('Qs 7s 2d')]
+    assert spot_key(groups, {'QhJh': 1.0})[0] != spot_key(swapped, {'QhJh': 1.0})[0]
+    assert spot_key(groups, {'QJs': 1.0})[0] == spot_key(swapped, {'QJs': 1.0})[0]
+
+def test_solution_key_is_suit_isomorphic(tmp_path):
+    """Test that solver keys ignore suit permutations but keep street order."""
+    solver = GtoSolver(str(tmp_path / "solutions.json"))
+    def key(hand, board):
+        return solver._get_solution_key(GameState(hand=hand, position='BTN', opponents=[],
+                                                  action_history=[], effective_stack=100,
+                                                  board=board, tournament=False))
+    assert key(('Ah', 'Kh'), ['Qh', '7h', '2c']) == key(('As', 'Ks'), ['Qs', '7s', '2d'])
+    assert key('AhKs', 'As7h2dAdAc') == key(('Ah', 'Ks'), ['As', '7h', '2d', 'Ad', 'Ac'])
+    assert key(('Ah', 'Kh'), ['Qh', '7h', '2c', '3d']) != key(('Ah', 'Kh'), ['Qh', '7h', '3d', '2c'])
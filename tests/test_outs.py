@@ -0,0 +1,49 @@
+from src.core.cards import parse_cards
+from src.core.outs import calculate_outs
+from src.core.gto_solver import GtoSolver
+from src.core.hand_evaluator import Card
+
+def names(cards):
+    return sorted(str(card) for card in cards)
+
+def test_flush_draw_against_sets():
+    """Test that flush cards are clean outs and board-pairing flush cards are not outs."""
+    result = calculate_outs(parse_cards('Ah Kh'), parse_cards('Qh 7h 2c'), {'QQ': 1.0, '77': 1.0})
+    assert names(result.clean_outs) == names(parse_cards('3h 4h 5h 6h 8h 9h Th Jh'))
+    assert result.tainted_outs == []
+    assert result.current_share == 0.0
+    assert result.unseen == 47
+    assert result.next_card_probability == 8 / 47
+    assert abs(result.by_river_probability - (1 - 39 * 38 / (47 * 46))) < 1e-12
+
+def test_tainted_straight_outs():
+    """Test that a straight card giving a bigger straight to part of the range is tainted."""
+    result = calculate_outs(parse_cards('8s 9s'), parse_cards('Ts Jd 2c 3h'))
+    assert set(names(parse_cards('7c 7d 7h 7s'))) <= set(names(result.clean_outs))
+    assert set(names(parse_cards('Qc Qd Qh'))) <= set(names(result.tainted_outs))
+    assert result.next_card_probability == result.by_river_probability
+
+def test_board_pairing_cards_are_not_outs():
+    """Test that cards improving the board rather than the hole cards are not outs."""
+    overcards = calculate_outs(parse_cards('Ah Kd'), parse_cards('Qh 7h 2c'))
+    assert names(overcards.outs) == names(parse_cards('Ac Ad As Kc Kh Ks'))
+    connectors = calculate_outs(parse_cards('9h 8h'), parse_cards('Th 7c 2d'))
+    assert names(connectors.outs) == names(parse_cards('6c 6d 6h 6s Jc Jd Jh Js 9c 9d 9s 8c 8d 8s'))
+    draw = calculate_outs(parse_cards('Ah Kh'), parse_cards('Qh 7h 2c'))
+    assert names(draw.outs) == names(parse_cards('2h 3h 4h 5h 6h 8h 9h Th Jh Ac Ad As Kc Kd Ks'))
+
+def test_no_outs_without_next_street():
+    """Test that preflop and river spots have no outs and made nuts draw to nothing better."""
+    assert calculate_outs(parse_cards('Ah Kh'), []).outs == []
+    assert calculate_outs(parse_cards('Ah Kh'), parse_cards('Qh 7h 2c 3d 4s')).outs == []
+    assert calculate_outs(parse_cards('As Ad'), parse_cards('Ac Ks 2d')).current_share == 1.0
+
+def test_solver_odds_are_deterministic(tmp_path):
+    """Test that GtoSolver.calculate_odds reports engine outs instead of random ones."""
+    solver = GtoSolver(str(tmp_path / "solutions.json"))
+    hand = [Card.from_int(card) for card in parse_cards('Ah Kh')]
+    board = [Card.from_int(card) for card in parse_cards('Qh 7h 2c')]
+    odds = solver.calculate_odds(hand, board)
+    assert odds == solver.calculate_odds(hand, board)
+    assert odds['outs'] == len(odds['clean_outs']) + len(odds['tainted_outs'])
+    assert odds['pot_odds'] == odds['by_river_probability'] * 100
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from src.core import preflop_table
+from src.core.equity_calculator import EquityCalculator
+from src.core.ranges import COMBO_INDEX
+from src.core.cards import parse_cards
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    """Build a small sampled table once for the module."""
+    path = tmp_path_factory.mktemp("preflop") / "preflop_equity.bin"
+    return preflop_table.build_preflop_table(str(path), samples=16, seed=5)
+
+def combo(text):
+    first, second = parse_cards(text)
+    return COMBO_INDEX[first, second]
+
+def test_hand_classes():
+    """Test the 169-class grid and the combo counts per class."""
+    assert len(set(preflop_table.HAND_CLASSES)) == 169
+    assert preflop_table.HAND_CLASSES[:3] == ['AA', 'AKs', 'AQs']
+    assert preflop_table.HAND_CLASSES[13] == 'AKo'
+    counts = np.bincount(preflop_table.COMBO_CLASS, minlength=169)
+    assert counts[preflop_table.CLASS_INDEX['AA']] == 6
+    assert counts[preflop_table.CLASS_INDEX['AKs']] == 4
+    assert counts[preflop_table.CLASS_INDEX['AKo']] == 12
+
+def test_table_symmetry(table):
+    """Test that matchups sum to one both ways and isomorphic matchups agree."""
+    matrix = table.combos
+    first, second = combo('Ah Kd'), combo('Qs Qc')
+    assert abs(int(matrix[first, second]) + int(matrix[second, first]) - 65535) <= 1
+    assert matrix[first, second] == matrix[combo('As Kc'), combo('Qh Qd')]
+    assert matrix[first, first] == 0
+    assert not table.exact and table.std_error > 0
+
+def test_lookups(table):
+    """Test hand, class and range lookups against each other."""
+    assert table.class_vs_class('AA', 'KK') > 0.7
+    assert table.combo_vs_combo('Ah Ad', 'Kc Ks') == table.hand_vs_range('Ah Ad', {'KcKs': 1.0})
+    assert abs(table.class_vs_class('AKs', 'QQ') - table.class_vs_range('AKs', {'QQ': 1.0})) < 1e-4
+    assert table.hand_vs_range('Ah Ad') > table.hand_vs_range('7h 2c')
+    with pytest.raises(ValueError):
+        table.hand_vs_range('Ah Ad', {'AhAs': 1.0})
+    with pytest.raises(ValueError):
+        table.combo_vs_combo('Ah Ad', 'Ah Kd')
+
+def test_calculator_uses_table(table, tmp_path):
+    """Test that boardless spots are answered from the table unless sampling or exactness is forced."""
+    calculator = EquityCalculator(str(tmp_path / "cache.json"), iterations=500,
+                                  preflop_table_path=table.path)
+    result = calculator.calculate_equity("Ah Ad", {"KK": 1.0})
+    assert result.equity == table.hand_vs_range("Ah Ad", {"KK": 1.0})
+    assert result.samples == 0 and len(calculator.cache) == 0
+    sampled = calculator.calculate_equity("Ah Ad", {"KK": 1.0}, mode='monte_carlo', seed=1)
+    assert sampled.samples == 500
+    # A sampled table cannot answer exact requests
+    exact = calculator.calculate_equity("Ah Ad", {"KhKd": 1.0}, mode='exact')
+    assert exact.exact and exact.std_error == 0 and exact.samples == 1712304
+    assert preflop_table.load_preflop_table(str(tmp_path / "missing.bin")) is None
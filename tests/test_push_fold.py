@@ -0,0 +1,70 @@
+import pytest
+from src.core import preflop_table
+from src.core.gto_solver import GtoSolver, GameState
+from src.core.preflop_table import CLASS_INDEX
+from src.core.push_fold import solve_push_fold
+
+@pytest.fixture(scope="module")
+def table_path(tmp_path_factory):
+    """Build a small sampled table once for the module."""
+    path = tmp_path_factory.mktemp("preflop") / "preflop_equity.bin"
+    preflop_table.build_preflop_table(str(path), samples=16, seed=5)
+    return str(path)
+
+def test_heads_up_ranges(table_path):
+    """Test that shove ranges keep premiums, drop trash and tighten as stacks deepen."""
+    shallow = solve_push_fold(10, table_path=table_path)
+    deep = solve_push_fold(20, table_path=table_path)
+    for solution in (shallow, deep):
+        assert solution.shove_frequency('SB', 'AA') == 1.0
+        assert solution.call_frequency('BB', 'SB', 'As Ad') == 1.0
+        assert solution.exploitability < 0.02
+    assert deep.shove_frequency('SB', '72o') < 0.05
+    assert deep.range_share(deep.shove['SB']) < shallow.range_share(shallow.shove['SB'])
+    assert deep.range_share(deep.call[('BB', 'SB')]) < shallow.range_share(shallow.call[('BB', 'SB')])
+    assert solve_push_fold(1, table_path=table_path).range_share(
+        solve_push_fold(1, table_path=table_path).shove['SB']) > 0.99
+
+def test_heads_up_matches_known_equilibrium(table_path):
+    """Test the 10bb heads-up ranges against the published Nash push/fold (58.0% / 37.6%)."""
+    solution = solve_push_fold(10, table_path=table_path)
+    # The module's table is sampled, so allow for its noise
+    assert solution.range_share(solution.shove['SB']) == pytest.approx(0.580, abs=0.015)
+    assert solution.range_share(solution.call[('BB', 'SB')]) == pytest.approx(0.376, abs=0.008)
+
+def test_multiway_spots_cached(table_path):
+    """Test that multiway solutions cover every shover and caller pair and are cached."""
+    solution = solve_push_fold(10, ('BTN', 'SB', 'BB'), ante=0.1, table_path=table_path)
+    assert set(solution.shove) == {'BTN', 'SB'}
+    assert set(solution.call) == {('SB', 'BTN'), ('BB', 'BTN'), ('BB', 'SB')}
+    # Later seats shove wider once fewer players are left to wake up with a hand
+    assert solution.range_share(solution.shove['SB']) > solution.range_share(solution.shove['BTN'])
+    action, frequency, ev = solution.decide('BTN', 'Kh Kd')
+    assert action == 'all-in' and frequency == 1.0 and ev == solution.shove_ev['BTN'][CLASS_INDEX['KK']]
+    action, frequency, ev = solution.decide('SB', '7c 2d', 'BTN')
+    assert action == 'fold' and frequency > 0.99 and ev == pytest.approx(-0.6)
+    assert solve_push_fold(10.0, ['BTN', 'SB', 'BB'], 0.1, table_path) is solution
+    with pytest.raises(ValueError):
+        solve_push_fold(10, ('BB', 'SB'), table_path=table_path)
+    with pytest.raises(ValueError):
+        solve_push_fold(10, table_path=str(table_path) + '.missing')
+
+def test_gto_solver_push_fold(table_path, tmp_path):
+    """Test that short-stacked tournament preflop spots use the push/fold equilibrium."""
+    solver = GtoSolver(str(tmp_path / 'solutions.json'))
+    solver.preflop_table_path = table_path
+    solver.preflop_table = preflop_table.load_preflop_table(table_path)
+    state = GameState(hand='As Ac', position='CO', opponents=['BTN', 'SB', 'BB'], action_history=[],
+                      effective_stack=12, board=[], tournament=True)
+    action, frequency, ev = solver._calculate_solution(state)
+    assert action == 'all-in' and frequency == 1.0 and ev > 0
+    state.hand, state.position, state.action_history = '7c 2d', 'BB', [('SB', 'all-in', 12)]
+    action, frequency, ev = solver._calculate_solution(state)
+    assert action == 'fold' and ev == -1.0
+    state.action_history = [('SB', 'raise', 12)]
+    assert solver._calculate_solution(state)[0] == 'fold'
+    # A min-raise is not a shove, so the spot falls back to the defaults
+    state.action_history = [('SB', 'raise', 2.5)]
+    assert solver._calculate_solution(state) == ('raise', 1.0, 0.95)
+    state.action_history = []
+    assert solver._calculate_solution(state) == ('raise', 1.0, 0.95)
@@ -0,0 +1,58 @@
+import pytest
+from src.core.cards import parse_cards
+from src.core.ranges import ALL_COMBOS, COMBO_INDEX, expand_hand_class, expand_range, hand_class
+
+def test_all_combos():
+    """Test the combo table covers every two-card hand once."""
+    assert len(ALL_COMBOS) == 1326
+    assert (ALL_COMBOS[:, 0] > ALL_COMBOS[:, 1]).all()
+    ace, king = parse_cards('As Kd')
+    assert tuple(ALL_COMBOS[COMBO_INDEX[ace, king]]) == (ace, king)
+
+def test_expand_hand_class():
+    """Test expanding hand-class notation into combos."""
+    assert len(expand_hand_class('99')) == 6
+    assert len(expand_hand_class('AKs')) == 4
+    assert len(expand_hand_class('AKo')) == 12
+    assert len(expand_hand_class('KA')) == 16
+    assert expand_hand_class('AhKs') == [tuple(parse_cards('Ah Ks'))]
+    assert all(hand_class(*combo) == 'AKs' for combo in expand_hand_class('AKs'))
+    with pytest.raises(ValueError):
+        expand_hand_class('99s')
+    with pytest.raises(ValueError):
+        expand_hand_class('XYZ')
+
+def test_expand_range_card_removal():
+    """Test that dead cards remove combos and weights carry through."""
+    combos, weights = expand_range({'AA': 1.0, 'AKs': 0.5}, parse_cards('Ah 7c'))
+    assert len(combos) == 3 + 3
+    assert sorted(weights.tolist()) == [0.5] * 3 + [1.0] * 3
+    combos, weights = expand_range("random", parse_cards('Ah Kd'))
+    assert len(combos) == 1225
+    assert (weights == 1.0).all()
+    assert len(expand_range(None)[0]) == 1326
+    # Empty or malformed ranges are errors, not any two cards
+    for bad in ({}, [], 'AKs'):
+        with pytest.raises(ValueError):
+            expand_range(bad)
+
+def test_alias_table_matches_weights():
+    """Test that alias sampling follows the weights, including zeros."""
+    np = pytest.importorskip('numpy')
+    from src.core.ranges import AliasTable
+    weights = np.array([1.0, 2.0, 3.0, 0.0])
+    draws = AliasTable(weights).sample(np.random.default_rng(5), 200000)
+    frequencies = np.bincount(draws, minlength=4) / len(draws)
+    assert frequencies == pytest.approx(weights / weights.sum(), abs=0.01)
+    with pytest.raises(ValueError):
+        AliasTable(np.zeros(3))
+
+def test_weighted_range_is_reused():
+    """Test that the same range and dead cards share one prebuilt table."""
+    from src.core.ranges import weighted_range
+    dead = parse_cards('Ah 7c')
+    first = weighted_range({'AA': 1.0, 'KK': 0.25}, dead)
+    assert weighted_range({'KK': 0.25, 'AA': 1.0}, list(reversed(dead))) is first
+    assert len(first.combos) == 3 + 6
+    with pytest.raises(ValueError):
+        weighted_range({'AA': 1.0}, parse_cards('Ah Ad Ac'))
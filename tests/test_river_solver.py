@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from src.core.cards import parse_cards
+from src.core.fast_evaluator import BoardEvaluator
+from src.core.gto_solver import GtoSolver, GameState
+from src.core.river_solver import RiverSolver, build_river_tree, solve_river, _Showdown
+from src.core.ranges import expand_range
+
+def test_tree_menu_and_raise_cap():
+    """Test that the tree offers the bet menu, all-in and capped raises."""
+    tree = build_river_tree(10, 50, bet_sizes=(0.5, 1.0), raise_sizes=(1.0,), max_raises=1)
+    assert tree.actions(0) == ['check', 'bet 5', 'bet 10', 'all-in']
+    facing = tree.child(tree.child(0, 'check'), 'bet 5')
+    assert tree.actions(facing) == ['fold', 'call', 'raise 25', 'all-in']
+    assert tree.actions(tree.child(facing, 'raise 25')) == ['fold', 'call']
+    with pytest.raises(ValueError):
+        build_river_tree(0, 50)
+
+def test_showdown_sums_match_pairwise():
+    """Test that sorted prefix sums equal explicit pairwise card-removal sums."""
+    board = parse_cards('Kh Td 7c 4s 2h')
+    combos, _ = expand_range(None, board)
+    rng = np.random.default_rng(1)
+    hero, villain = combos[rng.choice(len(combos), 200, replace=False)], \
+        combos[rng.choice(len(combos), 300, replace=False)]
+    evaluator = BoardEvaluator(board)
+    hero_scores, villain_scores = evaluator.evaluate(hero), evaluator.evaluate(villain)
+    showdown = _Showdown(hero, hero_scores, villain, villain_scores)
+    weights = rng.random((len(villain), 3))
+    masks = [(np.int64(1) << cards.astype(np.int64)).sum(axis=1) for cards in (hero, villain)]
+    compatible = (masks[0][:, None] & masks[1][None, :]) == 0
+    sign = np.sign(hero_scores[:, None] - villain_scores[None, :]) * compatible
+    live = showdown.live(weights)
+    assert np.allclose(live, compatible @ weights)
+    assert np.allclose(showdown.ahead(weights, live), sign @ weights)
+
+def test_polarized_river_equilibrium():
+    """Test that a polarized bettor bluffs one third of pot bets and the bluff-catcher calls half."""
+    solution = solve_river('Kh Td 7c 4s 2h', {'QQ': 1.0}, {'KK': 1.0, '65s': 1.0}, pot=10, stack=10,
+                           bet_sizes=(1.0,), max_raises=0, iterations=2000,
+                           target_exploitability=0.001)
+    assert solution.exploitability <= 0.001
+    assert solution.strategy('Qc Qd')['check'] > 0.99
+    assert solution.strategy('Kc Kd', ['check'])['all-in'] > 0.99
+    bluffs = np.mean([solution.strategy(hand, ['check'])['all-in']
+                      for hand in ('6c 5c', '6d 5d', '6h 5h', '6s 5s')])
+    assert abs(4 * bluffs / (4 * bluffs + 3) - 1 / 3) < 0.02
+    assert abs(solution.strategy('Qs Qh', ['check', 'all-in'])['call'] - 0.5) < 0.02
+    assert solution.ev('Qc Qd', 0) > 0
+    with pytest.raises(ValueError):
+        solution.strategy('Ac Ad')
+
+def test_cfr_plus_converges():
+    """Test that both algorithms reach the exploitability target on wide ranges."""
+    tree = build_river_tree(6.5, 40)
+    solver = RiverSolver('Ks 9d 5c 3h 2s', None, {'AA': 1.0, 'KQs': 1.0, 'JTs': 1.0, '87s': 1.0}, tree)
+    for algorithm in ('dcfr', 'cfr+'):
+        solution = solver.solve(1000, 0.005, algorithm)
+        assert solution.exploitability <= 0.005
+        assert solution.iterations < 1000
+    with pytest.raises(ValueError):
+        solver.solve(algorithm='cfr')
+    with pytest.raises(ValueError):
+        RiverSolver('Ks 9d 5c 3h', None, None, tree)
+
+def test_gto_solver_solves_river_spots(tmp_path):
+    """Test that river spots are answered by the river solver."""
+    solver = GtoSolver(str(tmp_path / 'solutions.json'))
+    state = GameState(hand='As Ac', position='BTN', opponents=['CO'],
+                      action_history=[('CO', 'bet', 5.0)], effective_stack=100,
+                      board='Ad 9d 5c 3h 2s', tournament=False)
+    action, frequency, ev = solver._calculate_solution(state)
+    assert action in ('fold', 'call', 'raise', 'all-in')
+    assert action != 'fold'
+    assert 0 < frequency <= 1
+    assert ev > 0
+
+def test_gto_solver_follows_the_river_line(tmp_path):
+    """Test that an out-of-position hero who checked answers the bet behind it."""
+    solver = GtoSolver(str(tmp_path / 'solutions.json'))
+    state = GameState(hand='As Ac', position='BB', opponents=['BTN'],
+                      action_history=[('BTN', 'raise', 2.5), ('BB', 'call', 1.5),
+                                      ('BB', 'check', 0), ('BTN', 'bet', 5.0)],
+                      effective_stack=100, board='Ad 9d 5c 3h 2s', tournament=False)
+    action, frequency, ev = solver._calculate_solution(state)
+    assert action in ('fold', 'call', 'raise', 'all-in')
+    assert action != 'fold'
+    assert ev > 0
+
+    # A line the tree cannot follow falls back to the default answer
+    state.action_history = [('BTN', 'bet', 5.0), ('BTN', 'bet', 5.0)]
+    assert solver._calculate_solution(state) == ('bet', 0.9, 1.05)
+
+def test_gto_solver_skips_solving_when_hero_is_not_to_act(tmp_path, monkeypatch):
+    """Test that spots where the opponent acts next fall back to the defaults without a solve."""
+    solver = GtoSolver(str(tmp_path / 'solutions.json'))
+    monkeypatch.setattr(RiverSolver, 'solve', lambda *args, **kwargs: pytest.fail("solved"))
+    state = GameState(hand='As Ac', position='BTN', opponents=['BB'], action_history=[],
+                      effective_stack=100, board='Ad 9d 5c 3h 2s', tournament=False)
+    assert solver._calculate_solution(state) == ('bet', 0.8, 0.95)
+
+    # The blinds have ranges of their own rather than any two cards
+    for position in ('SB', 'BB'):
+        assert 'AA' in solver.get_range(position, 100) and '72o' not in solver.get_range(position, 100)
@@ -1,6 +1,6 @@
 import pytest
 from flask import Flask
-from src.web.app import app
+from src.web.app import app, equity_calculator
 import json
 from datetime import datetime
 from src.core.poker import Card, Hand, Board, Suit, Rank
@@ -268,4 +268,36 @@ def test_error_handling(client):
     response = client.post('/api/learn/progress', json=data)
     assert response.status_code == 404
     result = response.get_json()
-    assert 'error' in result 
\ No newline at end of file
+    assert 'error' in result 
+
+def test_stream_equity(client, monkeypatch):
+    """Test that equity streams as estimate events ending in a result, and bad arguments are rejected."""
+    monkeypatch.setitem(app.config, 'LOGIN_DISABLED', True)
+    
+    response = client.get('/api/equity/stream?hand=AhKh&board=Qh7h2c&position=BTN'
+                          '&target_stderr=0.01&sampling=uniform')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = []
+    for block in response.get_data(as_text=True).strip().split('\n\n'):
+        name, data = block.split('\n')
+        events.append((name[len('event: '):], json.loads(data[len('data: '):])))
+    names = [name for name, _ in events]
+    assert names[-1] == 'result' and set(names[:-1]) == {'estimate'}
+    result = events[-1][1]
+    assert 0 < result['equity'] < 1 and result['samples'] > 0
+    assert 'outs' in result and 'hand_type' in result
+    
+    response = client.get('/api/equity/stream?hand=AhKh&position=BTN&stack_size=abc')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+    
+    response = client.get('/api/equity/stream?hand=AhAh&position=BTN')
+    assert [line for line in response.get_data(as_text=True).split('\n')
+            if line.startswith('event:')] == ['event: failure']
+    
+    # A stream that ends without any estimate reports a failure instead of breaking off
+    monkeypatch.setattr(equity_calculator, 'stream_equity', lambda *args, **kwargs: iter(()))
+    response = client.get('/api/equity/stream?hand=AhKh&position=BTN')
+    assert [line for line in response.get_data(as_text=True).split('\n')
+            if line.startswith('event:')] == ['event: failure']